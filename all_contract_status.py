@@ -1,5 +1,6 @@
 import duckdb
-import json
+
+from field_values import query_fields
 
 
 def get_all_contract_statuses(parquet_file_path):
@@ -12,20 +13,8 @@ def get_all_contract_statuses(parquet_file_path):
     conn = duckdb.connect(database=":memory:")
 
     try:
-        query = f"SELECT * FROM '{parquet_file_path}'"
-        df = conn.execute(query).fetchdf()
-
-        def get_contract_status(field_values):
-            try:
-                values = json.loads(field_values)
-                for item in values:
-                    if isinstance(item, dict) and item.get("key") == "contract_status":
-                        return item.get("value")
-            except json.JSONDecodeError:
-                pass
-            return None
-
-        df["contract_status"] = df["field_values"].apply(get_contract_status)
+        # Only the status is extracted, inside DuckDB
+        df = query_fields(parquet_file_path, ["contract_status"], by="key", columns=(), conn=conn)
 
         # Get unique contract statuses
         unique_statuses = df["contract_status"].dropna().unique().tolist()
@@ -0,0 +1,1891 @@
+"""
+Offline benchmarks for the pipeline.
+
+Everything here runs without network access or credentials: a stub OpenToClose server
+serves synthetic properties built from the `tc_daily_update/field_values.json` template.
+
+Usage:
+    python benchmark.py fetch --records 5000 --latency 0.05 --workers 8 --failure-rate 0.05
+    python benchmark.py scan --records 5000 --page-size 50
+    python benchmark.py extract --records 500
+    python benchmark.py duckdb --records 5000
+    python benchmark.py flattened --records 5000 --change-rate 0.01
+    python benchmark.py extracts --records 5000
+    python benchmark.py flags --rows 10000 100000 1000000
+    python benchmark.py periods --rows 1500
+    python benchmark.py payroll --rows 10000 100000 1000000
+    python benchmark.py ledger --records 5000 --change-rate 0.01
+    python benchmark.py staging --rows 500000
+    python benchmark.py agentaccounts --records 5000 --change-rate 0.01
+    python benchmark.py stagingstore --records 5000 --months 24
+    python benchmark.py schemas --runs 100
+    python benchmark.py sheets --rows 50000 --latency 0.2 --memory
+    python benchmark.py sheetsync --rows 20000 --change-rate 0.01
+    python benchmark.py quota --requests 300 --per-minute 60 --other-load 30
+    python benchmark.py clients --reports 12 --token-latency 0.2
+    python benchmark.py orchestrator --records 5000
+"""
+import argparse
+import bisect
+import contextlib
+import copy
+import importlib.util
+import glob
+import gzip
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+import urllib.parse
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tests.fakes import FakeClientRegistry, FakeDriveService, FakeHttpError, FakeSheetsService
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIELD_VALUES_TEMPLATE = os.path.join(BASE_DIR, 'tc_daily_update', 'field_values.json')
+
+CONTRACT_STATUSES = [
+    'CTC - Pending', 'CTC - Closed - PAID', 'CTC - Withdrawn', 'CTC - Terminated - No Charge',
+    'CTC - Preferred - Pending', 'CTC - Preferred - Closed - Ready to BILL',
+    'Listing - Pre-Listing', 'Listing - PAID', 'Compliance', 'Compliance - PAID',
+]
+TEAMS = ['Team Christianna Velazquez', 'Team Kimberly Lewis', 'Team Stephanie Kleinman', 'Team Molly Kelley']
+TC_NAMES = ['Christianna Velazquez', 'Kimberly Lewis', 'Stephanie Kleinman', 'Molly Kelley', 'Jenn McKinley']
+
+
+def generate_properties(count, seed=0, start_id=1):
+    """
+    Builds `count` synthetic property records shaped like the /v1/properties payload.
+
+    :param count: Number of records.
+    :param seed: Random seed, so fixtures are reproducible.
+    :param start_id: First property id.
+    :return: List of property dictionaries.
+    """
+    rng = random.Random(seed)
+    with open(FIELD_VALUES_TEMPLATE) as file:
+        template = json.load(file)
+
+    base_date = datetime(datetime.now().year, 1, 1)
+    properties = []
+    for i in range(count):
+        field_values = copy.deepcopy(template)
+        for item in field_values:
+            if item['type'] == 'date' and rng.random() < 0.3:
+                item['value'] = (base_date + timedelta(days=rng.randint(-60, 420))).strftime('%Y-%m-%d')
+            elif item['type'] in ('decimal', 'number') and rng.random() < 0.2:
+                item['value'] = str(rng.choice([0, 40, 50, 99, 150, 300, 350, 400]))
+        values = {item['label']: item for item in field_values}
+        values['Contract Title']['value'] = f"{rng.randint(1, 9999)} Synthetic Street {i}"
+        values['Contract Status']['value'] = rng.choice(CONTRACT_STATUSES)
+        values['Contract Client Type']['value'] = rng.choice(['Buyer', 'Seller', 'Dual'])
+        values['Empower TC Name']['value'] = rng.choice(TC_NAMES)
+        properties.append({
+            'id': start_id + i,
+            'created': (base_date + timedelta(days=rng.randint(-400, 300))).strftime('%Y-%m-%d %H:%M:%S'),
+            'timezone': 'America/Chicago',
+            'field_values': field_values,
+            'team_id': 1,
+            'team_name': rng.choice(TEAMS),
+            'team_user_id': 1,
+            'team_user_name': 'Synthetic User',
+            'agent_id': rng.randint(1, 500),
+            'agent_name': f"Agent {rng.randint(1, 500)}",
+            'brokerage': 'Synthetic Realty',
+            'api_data': None,
+            'inbound_email_address': f"property{start_id + i}@example.com",
+        })
+    return properties
+
+
+class StubOTCServer:
+    """
+    Local stand-in for the OpenToClose API serving `/v1/properties` with limit/offset paging.
+
+    Use as a context manager; `base_url` points at the properties endpoint and `latency`
+    simulates the per-request round trip of the real API. A `failure_rate` share of requests
+    is answered with 429/503 (with Retry-After) to exercise client retries; responses are
+    gzip-compressed when the client asks for it.
+    """
+
+    def __init__(self, properties, latency=0.0, failure_rate=0.0, retry_after=0, seed=0):
+        # Serialize once up front so the stub's own JSON encoding does not compete with
+        # the client for the GIL and distort the measurement
+        self.encoded = [json.dumps(record) for record in properties]
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.request_count = 0
+        self.failure_count = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1/properties"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                params = urllib.parse.parse_qs(parsed.query)
+                with stub.lock:
+                    stub.request_count += 1
+                    fail = stub.rng.random() < stub.failure_rate
+                    if fail:
+                        stub.failure_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if parsed.path != '/v1/properties':
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if fail:
+                    self.send_response(stub.rng.choice([429, 503]))
+                    self.send_header('Retry-After', str(stub.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                limit = int(params.get('limit', ['50'])[0])
+                offset = int(params.get('offset', ['0'])[0])
+                body = ('[' + ','.join(stub.encoded[offset:offset + limit]) + ']').encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body, compresslevel=1)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def load_script_module(relative_path, name):
+    """Imports one of the report scripts (e.g. 'tc_payroll/main.py') as a module."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BASE_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def properties_frame(records, seed=0):
+    """Synthetic properties as the DataFrame the reports get from `SELECT * FROM read_parquet(...)`."""
+    from property_store import records_to_table
+    return records_to_table(generate_properties(records, seed=seed)).to_pandas()
+
+
+def read_schema_file(path):
+    import csv
+    with open(os.path.join(BASE_DIR, path)) as file:
+        return [row[0] for row in csv.reader(file)]
+
+
+def in_scratch_dir(func):
+    """
+    Runs `func` inside a throwaway working directory containing an empty ./datas, with the
+    process-wide schema registry looking for column lists there first.
+    """
+    def wrapper(*args, **kwargs):
+        previous_dir = os.getcwd()
+        scratch_dir = tempfile.mkdtemp(prefix='otc_bench_')
+        from schemas import BASE_DIR as SCHEMA_DIR, SchemaRegistry, set_registry
+        # Column lists written to the scratch directory take precedence over the repository's
+        previous_registry = set_registry(SchemaRegistry([scratch_dir, SCHEMA_DIR]))
+        try:
+            os.chdir(scratch_dir)
+            os.makedirs('datas')
+            return func(*args, **kwargs)
+        finally:
+            os.chdir(previous_dir)
+            set_registry(previous_registry)
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+    return wrapper
+
+
+def benchmark_fetch(records, latency, workers, max_rps, failure_rate):
+    from fetch_properties import fetch_and_save, fetch_and_save_concurrent
+    from otc_client import OTCClient
+
+    properties = generate_properties(records)
+
+    @in_scratch_dir
+    def run(label, fetch):
+        client = OTCClient(pool_size=workers, backoff_base=0.05, backoff_max=0.5)
+        with StubOTCServer(properties, latency=latency, failure_rate=failure_rate) as stub:
+            start_time = time.time()
+            fetch(stub.base_url, client)
+            elapsed = time.time() - start_time
+        saved = len(os.listdir('datas'))
+        print(f"{label}: {elapsed:.2f} seconds, {stub.request_count} requests "
+              f"({stub.failure_count} injected failures), {saved} files; client: {client.metrics}")
+        return elapsed
+
+    serial = run('serial', lambda url, client: fetch_and_save('stub', base_url=url, client=client))
+    concurrent = run(
+        f"concurrent (workers={workers}, max_rps={max_rps})",
+        lambda url, client: fetch_and_save_concurrent(
+            'stub', max_workers=workers, max_rps=max_rps, base_url=url, client=client
+        ),
+    )
+    print(f"speedup: {serial / concurrent:.1f}x")
+
+
+def time_call(func, repeat=3):
+    """Best-of-`repeat` wall time of `func()` in seconds, plus its last result."""
+    best = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+@in_scratch_dir
+def benchmark_scan(records, page_size, row_group_size):
+    import duckdb
+    from property_store import compact_dataset, dataset_files, records_to_table, new_dataset_filename
+    import pyarrow.parquet as pq
+
+    properties = generate_properties(records)
+    for offset in range(0, records, page_size):
+        # The page-per-file layout left behind by the old fetcher
+        pq.write_table(records_to_table(properties[offset:offset + page_size]), new_dataset_filename(), compression='snappy')
+
+    queries = {
+        'full scan to pandas': "SELECT * FROM read_parquet('datas/all_properties_*.parquet')",
+        'projected filter': "SELECT count(*) FROM read_parquet('datas/all_properties_*.parquet') WHERE team_name = 'Team Molly Kelley'",
+    }
+
+    def run_queries(layout):
+        conn = duckdb.connect(database=':memory:')
+        for label, query in queries.items():
+            elapsed, _ = time_call(lambda: conn.execute(query).fetchdf())
+            print(f"{layout} ({len(dataset_files())} files) - {label}: {elapsed:.3f} seconds")
+        conn.close()
+
+    run_queries('page files')
+    start_time = time.perf_counter()
+    compact_dataset(row_group_size=row_group_size)
+    print(f"compaction: {time.perf_counter() - start_time:.2f} seconds")
+    run_queries('compacted')
+
+
+def legacy_extract_field_values(field_values, field):
+    """The previous per-field extraction of the report scripts, kept for benchmark_extract."""
+    try:
+        values = json.loads(field_values)
+        for item in values:
+            if isinstance(item, dict) and item.get("label") == field:
+                return item.get("value")
+    except json.JSONDecodeError:
+        pass
+    return None
+
+
+def benchmark_extract(records):
+    from field_values import extract_fields, orjson
+    import pandas as pd
+
+    schema = read_schema_file('tc_daily_update/Columns_Transaction_Source.csv')
+    df = properties_frame(records)
+
+    def per_field():
+        # The previous extraction: one json.loads per document per field
+        result = pd.DataFrame()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+            for field in schema:
+                result[field] = df['field_values'].apply(lambda x: legacy_extract_field_values(x, field))
+        return result
+
+    baseline_time, _ = time_call(per_field, repeat=1)
+    single_pass_time, _ = time_call(lambda: extract_fields(df['field_values'], schema), repeat=1)
+    print(f"{len(df)} rows x {len(set(schema))} fields (json backend: {'orjson' if orjson else 'json'})")
+    print(f"per-field apply: {baseline_time:.2f} seconds, {len(df) / baseline_time:,.0f} rows/sec")
+    print(f"single pass:     {single_pass_time:.2f} seconds, {len(df) / single_pass_time:,.0f} rows/sec")
+    print(f"speedup: {baseline_time / single_pass_time:.1f}x")
+
+
+@in_scratch_dir
+def benchmark_duckdb(records):
+    import duckdb
+    import pandas as pd
+    from field_values import extract_fields, query_fields
+    from property_store import DatasetWriter
+
+    with DatasetWriter() as writer:
+        writer.write_records(generate_properties(records))
+    source = writer.path
+    schema = read_schema_file('tc_daily_update/Columns_Transaction_Source.csv')
+    year = datetime.now().year
+    window = (datetime(year, 1, 1), datetime(year, 6, 30, 23, 59, 59))
+    cases = {
+        'all schema fields': dict(fields=schema),
+        'status + team + closing window': dict(
+            fields=['Contract Status', 'Closing'],
+            date_fields=['Closing'],
+            columns=['id', 'team_name'],
+            equals={'Contract Status': ['CTC - Pending', 'CTC - Closed - PAID'], 'team_name': TEAMS[0]},
+            date_range=('Closing',) + window,
+        ),
+    }
+
+    def python_path(fields, date_fields=(), columns=('id',), equals=None, date_range=None):
+        # Load everything, parse in Python, then filter in pandas
+        conn = duckdb.connect(database=':memory:')
+        df = conn.execute(f"SELECT * FROM read_parquet('{source}')").fetchdf()
+        conn.close()
+        result = pd.concat([df[list(columns)], extract_fields(df['field_values'], fields)], axis=1)
+        for field in date_fields:
+            result[field] = pd.to_datetime(result[field], errors='coerce')
+        for name, value in (equals or {}).items():
+            result = result[result[name].isin(value if isinstance(value, (list, tuple, set)) else [value])]
+        if date_range:
+            name, start, end = date_range
+            result = result[(result[name] >= start) & (result[name] <= end)]
+        return result.reset_index(drop=True)
+
+    for label, case in cases.items():
+        python_time, _ = time_call(lambda: python_path(**case), repeat=1)
+        duckdb_time, actual = time_call(lambda: query_fields(source, **case), repeat=1)
+        print(f"{label} ({len(actual)} of {records} rows): python {python_time:.2f}s, "
+              f"duckdb {duckdb_time:.2f}s, {python_time / duckdb_time:.1f}x")
+
+
+@in_scratch_dir
+def benchmark_flattened(records, change_rate):
+    import pyarrow.parquet as pq
+    from field_values import FLATTENED_FILE, update_flattened_dataset, write_flattened_dataset
+    from property_store import DatasetWriter, records_to_table, replace_dataset
+    from daily_contract_count.summary_dataset import SummaryDataset
+    from daily_contract_count.summary_engine import SUMMARY_SPECS, compute_summaries
+
+    properties = generate_properties(records)
+    with DatasetWriter() as writer:
+        writer.write_records(properties)
+    source = 'datas/all_properties_*.parquet'
+
+    def quiet(func):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return func()
+
+    full_time, _ = time_call(lambda: quiet(write_flattened_dataset), repeat=1)
+    raw = pq.read_table(writer.path).to_pandas()
+    columns = len(pq.read_schema(os.path.join('datas', FLATTENED_FILE)).names)
+    print(f"{records} properties: full flatten {full_time:.2f}s, {columns} columns")
+
+    # The daily contract count, from the field_values JSON and from the flattened table
+    today = datetime.now()
+    json_time, _ = time_call(lambda: quiet(lambda: compute_summaries(SummaryDataset(raw).frame(), SUMMARY_SPECS,
+                                                                     today)), repeat=1)
+    flat_time, _ = time_call(lambda: quiet(lambda: compute_summaries(SummaryDataset(source).frame(), SUMMARY_SPECS,
+                                                                     today)), repeat=1)
+    print(f"daily contract count: field_values {json_time:.2f}s, flattened table {flat_time:.2f}s, "
+          f"{json_time / flat_time:.1f}x")
+
+    # An incremental sync changing a share of the properties
+    rng = random.Random(1)
+    changed = rng.sample(properties, max(1, int(records * change_rate)))
+    for record in changed:
+        record['team_name'] = rng.choice(TEAMS)
+        record['field_values'][1]['value'] = 'changed'
+    pq.write_table(records_to_table(changed), 'datas/_staging.parquet')
+    replace_dataset('datas/_staging.parquet', keep_existing=True, exclude_ids={record['id'] for record in changed})
+    update_time, _ = time_call(lambda: quiet(lambda: update_flattened_dataset({record['id'] for record in changed})),
+                               repeat=1)
+    rebuild_time, _ = time_call(lambda: quiet(write_flattened_dataset), repeat=1)
+    print(f"{len(changed)} changed properties: update {update_time:.2f}s, full rebuild {rebuild_time:.2f}s, "
+          f"{rebuild_time / update_time:.1f}x")
+
+
+def legacy_extract(source, spec, today):
+    """
+    The previous extract scripts (closing_data_*, close_paid_data, data_last_month_*, future_closing_*),
+    each loading the whole dataset and json-parsing every document once per key, kept as the reference
+    for report_extracts.
+    """
+    import duckdb
+    import pandas as pd
+    from schemas import get_registry
+
+    conn = duckdb.connect(database=':memory:')
+    df = conn.execute(f"SELECT * FROM '{source}'").fetchdf()
+    conn.close()
+
+    def get_value(key):
+        def get(field_values):
+            try:
+                for item in json.loads(field_values):
+                    if isinstance(item, dict) and item.get('key') == key:
+                        return item.get('value')
+            except json.JSONDecodeError:
+                pass
+            return None
+        return get
+
+    df[spec.date_key] = pd.to_datetime(df['field_values'].apply(get_value(spec.date_key)), errors='coerce')
+    if spec.client_type is not None:
+        df['contract_client_type'] = df['field_values'].apply(get_value('contract_client_type'))
+    for column, status in spec.flags:
+        df[column] = df['field_values'].apply(get_value('contract_status')) == status
+
+    first_day_of_current_month = today.replace(day=1)
+    first_day_of_next_month = (first_day_of_current_month + timedelta(days=32)).replace(day=1)
+    start, end = {
+        'last_month': ((first_day_of_current_month - timedelta(days=1)).replace(day=1),
+                       first_day_of_current_month - timedelta(days=1)),
+        'current_month': (first_day_of_current_month, first_day_of_next_month - timedelta(days=1)),
+        'next_month': (first_day_of_next_month,
+                       (first_day_of_next_month + timedelta(days=32)).replace(day=1) - timedelta(days=1)),
+        'future': (first_day_of_next_month, None),
+    }[spec.window]
+    selected = df[spec.date_key] >= start
+    if end is not None:
+        selected &= df[spec.date_key] <= end
+    if spec.teams is not None:
+        selected &= df['team_name'].isin(get_registry().columns(spec.teams))
+    if spec.statuses is not None:
+        selected &= df['field_values'].apply(get_value('contract_status')).isin(spec.statuses)
+    if spec.client_type is not None:
+        selected &= df['contract_client_type'] == spec.client_type
+
+    filtered_df = df[selected].drop(columns=['field_values'])
+    for col in filtered_df.select_dtypes(include=['datetime64']).columns:
+        filtered_df[col] = filtered_df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+    return filtered_df
+
+
+@in_scratch_dir
+def benchmark_report_extracts(records):
+    import google_clients
+    from property_store import DatasetWriter
+    from report_dataset import PropertyDataset
+    from report_extracts import EXTRACT_SPECS, extract_reports, run_extract_reports
+
+    with DatasetWriter() as writer:
+        writer.write_records(generate_properties(records))
+    source = writer.path
+    # The scripts compared days at the time of day they ran; at midnight both agree on whole days
+    now = datetime.now()
+    today = datetime(now.year, now.month, now.day)
+
+    def batch():
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return extract_reports(EXTRACT_SPECS, PropertyDataset(source), today)
+
+    legacy_time, _ = time_call(lambda: {spec.name: legacy_extract(source, spec, today) for spec in EXTRACT_SPECS},
+                               repeat=1)
+    batch_time, extracted = time_call(batch, repeat=1)
+    for spec in EXTRACT_SPECS:
+        print(f"{spec.name:<45} {len(extracted[spec.name]):>6} rows")
+    print(f"{records} properties, {len(EXTRACT_SPECS)} sheets")
+    print(f"one load + parse per script: {legacy_time:.2f} seconds")
+    print(f"one load + parse in all:     {batch_time:.2f} seconds")
+    print(f"speedup: {legacy_time / batch_time:.1f}x")
+
+    # The whole batch through the scripts' sheet writers, on fake Google services
+    registry = FakeClientRegistry()
+    previous = google_clients.set_registry(registry)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            results = run_extract_reports(parquet_file_path=source)
+    finally:
+        google_clients.set_registry(previous)
+    # A script returns None by design when its extract has no rows
+    failed = [name for name, result in results.items()
+              if (result is None or result == (None, None)) and len(extracted[name])]
+    assert not failed, failed
+    print(f"batch run: {len(registry.sheets.spreadsheets_data)} spreadsheets written, "
+          f"{len(registry.drive.parents)} moved to the OTC folder")
+
+
+MAIN_SOURCE_DATE_COLUMNS = [
+    'CTC Started with Empower', 'Closing', 'Listing Started with Empower', 'Listing PAID Date',
+    'Compliance Started with Empower', 'Offer Started with Empower', 'Onboard Call Complete Date',
+    '1st Transaction Date',
+]
+
+
+def main_source_frame(rows, seed=0):
+    """
+    Synthetic tc_daily_update main data source (the `extract_fields` output) with `rows` rows.
+
+    Built column-wise with numpy so a million rows takes seconds; dates are ISO strings, '' or
+    None, like the raw field values.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    base_date = np.datetime64(f"{datetime.now().year}-01-01")
+    date_pool = np.array([str(base_date + np.timedelta64(day, 'D')) for day in range(-400, 420)] + ['', None],
+                         dtype=object)
+    statuses = CONTRACT_STATUSES + ['CTC - PAID', 'CTC - Preferred - Closed - PAID', 'CTC - Preferred - Withdrawn', None]
+    columns = {
+        'Empower TC Name': rng.choice(np.array(TC_NAMES, dtype=object), rows),
+        'Contract Status': rng.choice(np.array(statuses, dtype=object), rows),
+        'Live on MLS Date': rng.choice(date_pool, rows),
+        'Onboarding Status': rng.choice(np.array(['1st Transaction', 'Onboarded', '', None], dtype=object), rows),
+        'Transaction Coordinator': rng.choice(np.array(TC_NAMES, dtype=object), rows),
+        'Agent Provided by': rng.choice(np.array(['TC', 'Empower', 'Other', '', None], dtype=object), rows),
+        'Other Status': rng.choice(np.array(['Lost - Reassigned', 'Return to Sales', 'Active', '', None],
+                                            dtype=object), rows),
+    }
+    for column in MAIN_SOURCE_DATE_COLUMNS:
+        # Most properties leave most dates unset
+        columns[column] = np.where(rng.random(rows) < 0.6, '', rng.choice(date_pool, rows))
+    return pd.DataFrame(columns)
+
+
+def rowwise_flags(df, periode_dim):
+    """The previous row-by-row flag computation, kept as the reference for `add_flags`."""
+    ctc_contract_status = (
+        'CTC - Closed - PAID', 'CTC - Pending', 'CTC - PAID',
+        'CTC - Terminated - No Charge', 'CTC - Withdrawn',
+        'CTC - Terminated - Compliance - PAID'
+    )
+    preferred_contract_status = (
+        'CTC - Preferred - Closed - PAID', 'CTC - Preferred - Pending',
+        'CTC - Preferred - PAID', 'CTC - Preferred - Terminated - No Change',
+        'CTC - Preferred - Withdrawn'
+    )
+    lost_agents_return_to_sales = (
+        'Lost  Reassigned', 'Lost  Left Empower', 'Return to Sales',
+        'Lost - Do Not Contact', 'Lost  Do Not Contact', 'Lost - Left Empower',
+        'Lost  Left Empower', 'Lost - Reassigned'
+    )
+    df['Total ACTIVE Files - CTC'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['current_periode'] and x['Contract Status'] in (ctc_contract_status) else 0, axis=1)
+    df['Total ACTIVE Files - CTC Preferred'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['current_periode'] and x['Contract Status'] in (preferred_contract_status) else 0, axis=1)
+    df['CTC Started for this month'] = df.apply(lambda x: 1 if x['CTC Started with Empower'] >= periode_dim['start_periode'] and x['CTC Started with Empower'] <= periode_dim['end_periode'] and x['Contract Status'] in (ctc_contract_status) else 0, axis=1)
+    df['CTC - Preferred Started'] = df.apply(lambda x: 1 if x['CTC Started with Empower'] >= periode_dim['start_periode'] and x['CTC Started with Empower'] <= periode_dim['end_periode'] and x['Contract Status'] in (preferred_contract_status) else 0, axis=1)
+    df['Closings for this month'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['start_periode'] and x['Closing'] <= periode_dim['end_periode'] and x['Contract Status'] in (ctc_contract_status) else 0, axis=1)
+    df['CTC - Preferred Closings'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['start_periode'] and x['Closing'] <= periode_dim['end_periode'] and x['Contract Status'] in (preferred_contract_status)else 0, axis=1)
+    df['CTC Pending for this month'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['start_periode'] and x['Closing'] <= periode_dim['end_periode'] and x['Contract Status'] == 'CTC - Pending' else 0, axis=1)
+    df['CTC - Preferred Pending for this month'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['start_periode'] and x['Closing'] <= periode_dim['end_periode'] and x['Contract Status'] == 'CTC - Preferred - Pending' else 0, axis=1)
+    df['CTC Pending for next month'] = df.apply(lambda x: 1 if x['Closing'] > periode_dim['start_periode_m1'] and x['Closing'] <= periode_dim['end_periode_m1'] and x['Contract Status'] == 'CTC - Pending' else 0, axis=1)
+    df['CTC - Preferred Pending for next month'] = df.apply(lambda x: 1 if x['Closing'] > periode_dim['start_periode_m1'] and x['Closing'] <= periode_dim['end_periode_m1'] and x['Contract Status'] == 'CTC - Preferred - Pending' else 0, axis=1)
+    df['CTC Pending for other months'] = df.apply(lambda x: 1 if x['Closing'] > periode_dim['end_periode_m1'] and x['Contract Status'] == 'CTC - Pending' else 0, axis=1)
+    df['CTC - Preferred Pending for other months'] = df.apply(lambda x: 1 if x['Closing'] > periode_dim['end_periode_m1'] and x['Contract Status'] == 'CTC - Preferred - Pending' else 0, axis=1)
+    df['Listing Started'] = df.apply(lambda x: 1 if x['Listing Started with Empower'] >= periode_dim['start_periode'] and x['Listing Started with Empower'] <= periode_dim['end_periode'] else 0, axis=1)
+    df['Listing PAID'] = df.apply(lambda x: 1 if x['Listing PAID Date'] >= periode_dim['start_periode'] and x['Listing PAID Date'] <= periode_dim['end_periode'] else 0, axis=1)
+    df['Offers Started this month'] = df.apply(lambda x: 1 if x['Offer Started with Empower'] >= periode_dim['start_periode'] and x['Offer Started with Empower'] <= periode_dim['end_periode'] else 0, axis=1)
+    df['Compliance Started this month'] = df.apply(lambda x: 1 if x['Compliance Started with Empower'] >= periode_dim['start_periode'] and x['Compliance Started with Empower'] <= periode_dim['end_periode'] else 0, axis=1)
+    df['TC Generated Agents'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Agent Provided by'] == 'TC' else 0, axis=1)
+    df['SALES Generated Agents'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Agent Provided by'] == 'Empower' else 0, axis=1)
+    df['TOTAL Agents'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Agent Provided by'] in ('Empower', 'TC') else 0, axis=1)
+    df['1st Transaction Agents'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Onboarding Status'] == '1st Transaction' else 0, axis=1)
+    df['Lost Agents/return to Sales'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Other Status'] in (lost_agents_return_to_sales) else 0, axis=1)
+    df['OB for This Month'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] >= periode_dim['start_periode'] and x['Onboard Call Complete Date'] <= periode_dim['end_periode'] else 0, axis=1)
+    df['1st Transactions for This Month'] = df.apply(lambda x: 1 if x['1st Transaction Date'] >= periode_dim['start_periode'] and x['1st Transaction Date'] <= periode_dim['end_periode'] else 0, axis=1)
+    return df
+
+
+def benchmark_flags(rows_list, legacy_max_rows):
+    import pandas as pd
+
+    tc_daily_update = load_script_module('tc_daily_update/main.py', 'tc_daily_update_main')
+    periode = datetime.now().strftime('%B %Y').upper()
+    periode_dim = tc_daily_update.expand_periode_dim(periode)
+
+    for rows in rows_list:
+        df = main_source_frame(rows)
+        for column in MAIN_SOURCE_DATE_COLUMNS:
+            df[column] = pd.to_datetime(df[column]).fillna(tc_daily_update.na_filler)
+
+        vectorized_time, _ = time_call(lambda: tc_daily_update.add_flags(df.copy(), periode_dim), repeat=1)
+        line = f"{rows:>9,} rows: vectorized {vectorized_time:.3f}s"
+        if rows <= legacy_max_rows:
+            rowwise_time, _ = time_call(lambda: rowwise_flags(df.copy(), periode_dim), repeat=1)
+            line += f", row-wise {rowwise_time:.2f}s, {rowwise_time / vectorized_time:.0f}x"
+        else:
+            line += ", row-wise skipped (see --legacy-max-rows)"
+        print(line)
+
+
+
+def legacy_periode_reports(tc_daily_update, df, periodes):
+    """
+    The previous generate_daily_update_report loop (transform_main_source and pivot tables per period),
+    kept as the reference for `build_periode_reports`.
+
+    :param df: Main data source with 'CTC Started with Empower' converted and filled, as the loop had it.
+    :return: List of report DataFrames, one per period.
+    """
+    import pandas as pd
+
+    specific_team = df['Empower TC Name'].unique().tolist()
+    dfs = list()
+    df_report_template = pd.DataFrame(
+        index=specific_team
+    )
+    # transform_main_source prints its progress once per period
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for periode in periodes:
+            enriched_df = tc_daily_update.transform_main_source(df.copy(), periode)
+            dateformat_periode = datetime.strptime(periode, '%B %Y')
+            report_df = df_report_template.copy()
+            selected_team_df = enriched_df[enriched_df["Empower TC Name"].isin(specific_team)].copy()
+
+            started_df = selected_team_df[selected_team_df["CTC Started with Empower Periode"] == periode].copy()
+            summary_started_df = started_df.pivot_table(
+                values=[
+                    'CTC Started for this month',
+                    'CTC - Preferred Started'],
+                index='Empower TC Name',
+                aggfunc='sum',
+                fill_value=0
+            )
+
+            closing_df = selected_team_df[selected_team_df["Closing Periode"] == periode].copy()
+            summary_closing_df = closing_df.pivot_table(
+                values=[
+                    'Total ACTIVE Files - CTC',
+                    'Total ACTIVE Files - CTC Preferred',
+                    'Closings for this month',
+                    'CTC - Preferred Closings',
+                    'CTC Pending for this month',
+                    'CTC - Preferred Pending for this month',
+                    'CTC Pending for next month',
+                    'CTC - Preferred Pending for next month',
+                    'CTC Pending for other months',
+                    'CTC - Preferred Pending for other months'
+                ],
+                index='Empower TC Name',
+                aggfunc='sum',
+                fill_value=0
+            )
+
+            listing_started_df = selected_team_df[selected_team_df["Listing Started Periode"] == periode].copy()
+            if listing_started_df.empty:
+                summary_listing_started_df = pd.DataFrame(
+                    index=pd.Index(specific_team, name='Empower TC Name'),
+                    data={'Listing Started': [0] * len(specific_team)}
+                )
+            else:
+                summary_listing_started_df = listing_started_df.pivot_table(
+                    values='Listing Started',
+                    index='Empower TC Name',
+                    aggfunc='sum',
+                    fill_value=0
+                )
+
+            listing_paid_df = selected_team_df[selected_team_df["Listing Paid Periode"] == periode].copy()
+            if listing_paid_df.empty:
+                summary_listing_paid_df = pd.DataFrame(
+                    index=pd.Index(specific_team, name='Empower TC Name'),
+                    data={'Listing PAID': [0] * len(specific_team)}
+                )
+            else:
+                summary_listing_paid_df = listing_paid_df.pivot_table(
+                    values='Listing PAID',
+                    index='Empower TC Name',
+                    aggfunc='sum',
+                    fill_value=0
+                )
+
+            offer_started_df = selected_team_df[selected_team_df["Offer Started Periode"] == periode].copy()
+            if offer_started_df.empty:
+                summary_offer_started_df = pd.DataFrame(
+                    index=pd.Index(specific_team, name='Empower TC Name'),
+                    data={'Offers Started this month': [0] * len(specific_team)}
+                )
+            else:
+                summary_offer_started_df = offer_started_df.pivot_table(
+                    values='Offers Started this month',
+                    index='Empower TC Name',
+                    aggfunc='sum',
+                    fill_value=0
+                )
+
+            compliance_started_df = selected_team_df[selected_team_df["Compliance Started Periode"] == periode].copy()
+            if compliance_started_df.empty:
+                summary_compliance_started_df = pd.DataFrame(
+                    index=pd.Index(specific_team, name='Empower TC Name'),
+                    data={'Compliance Started this month': [0] * len(specific_team)}
+                )
+            else:
+                summary_compliance_started_df = compliance_started_df.pivot_table(
+                    values='Compliance Started this month',
+                    index='Empower TC Name',
+                    aggfunc='sum',
+                    fill_value=0
+                )
+
+            onboard_call_complete_date_df = selected_team_df[selected_team_df["Onboard Periode Start"] <= dateformat_periode].copy()
+            if onboard_call_complete_date_df.empty:
+                summary_onboard_call_complete_date_df = pd.DataFrame(
+                    index=pd.Index(specific_team, name='Transaction Coordinator'),
+                    data={
+                        'TC Generated Agents': [0] * len(specific_team),
+                        'SALES Generated Agents': [0] * len(specific_team),
+                        'TOTAL Agents': [0] * len(specific_team),
+                        '1st Transaction Agents': [0] * len(specific_team),
+                        'Lost Agents/return to Sales': [0] * len(specific_team)
+                    }
+                )
+            else:
+                summary_onboard_call_complete_date_df = onboard_call_complete_date_df.pivot_table(
+                    values=[
+                        'TC Generated Agents', 'SALES Generated Agents', 'TOTAL Agents',
+                        '1st Transaction Agents', 'Lost Agents/return to Sales'
+                    ],
+                    index='Transaction Coordinator',
+                    aggfunc='sum',
+                    fill_value=0
+                )
+
+            ob_date_df = selected_team_df[selected_team_df["Onboard Periode"] == periode].copy()
+            if ob_date_df.empty:
+                summary_ob_date_df = pd.DataFrame(
+                    index=pd.Index(specific_team, name='Transaction Coordinator'),
+                    data={
+                        'OB for This Month': [0] * len(specific_team)
+                    }
+                )
+            else:
+                summary_ob_date_df = ob_date_df.pivot_table(
+                    values='OB for This Month',
+                    index='Transaction Coordinator',
+                    aggfunc='sum',
+                    fill_value=0
+                )
+
+            first_transaction_date_df = selected_team_df[selected_team_df["Onboard Periode"] == periode].copy()
+            if first_transaction_date_df.empty:
+                summary_first_transaction_date_df = pd.DataFrame(
+                    index=pd.Index(specific_team, name='Transaction Coordinator'),
+                    data={
+                        '1st Transactions for This Month': [0] * len(specific_team)
+                    }
+                )
+            else:
+                summary_first_transaction_date_df = ob_date_df.pivot_table(
+                    values='1st Transactions for This Month',
+                    index='Transaction Coordinator',
+                    aggfunc='sum',
+                    fill_value=0
+                )
+
+            report_df.reset_index(inplace=True, names='Empower TC Name')
+            report_df = report_df.merge(summary_started_df, how='left', on='Empower TC Name')
+            report_df = report_df.merge(summary_closing_df, how='left', on='Empower TC Name')
+            report_df = report_df.merge(summary_listing_started_df, how='left', on='Empower TC Name')
+            report_df = report_df.merge(summary_listing_paid_df, how='left', on='Empower TC Name')
+            report_df = report_df.merge(summary_offer_started_df, how='left', on='Empower TC Name')
+            report_df = report_df.merge(summary_compliance_started_df, how='left', on='Empower TC Name')
+            report_df = report_df.merge(summary_onboard_call_complete_date_df, how='left', left_on='Empower TC Name', right_on='Transaction Coordinator')
+            report_df = report_df.merge(summary_ob_date_df, how='left', left_on='Empower TC Name', right_on='Transaction Coordinator')
+            report_df = report_df.merge(summary_first_transaction_date_df, how='left', left_on='Empower TC Name', right_on='Transaction Coordinator')
+
+            report_df.fillna(0, inplace=True)
+            report_df = report_df.astype('int64', errors='ignore')
+
+            report_df = report_df[
+                [
+                    'Empower TC Name',
+                    'Total ACTIVE Files - CTC',
+                    'Total ACTIVE Files - CTC Preferred',
+                    'CTC Started for this month', 'CTC - Preferred Started',
+                    'Closings for this month', 'CTC - Preferred Closings',
+                    'CTC Pending for this month', 'CTC - Preferred Pending for this month',
+                    'CTC Pending for next month', 'CTC - Preferred Pending for next month',
+                    'CTC Pending for other months', 'CTC - Preferred Pending for other months',
+                    'Offers Started this month', 'Compliance Started this month',
+                    'Listing Started', 'Listing PAID', 'TC Generated Agents',
+                    'SALES Generated Agents', 'TOTAL Agents', '1st Transaction Agents',
+                    'Lost Agents/return to Sales', 'OB for This Month', '1st Transactions for This Month'
+                ]
+            ]
+
+            dfs.append(report_df.copy())
+    return dfs
+
+
+def benchmark_periods(rows):
+    import pandas as pd
+
+    tc_daily_update = load_script_module('tc_daily_update/main.py', 'tc_daily_update_main')
+    source = main_source_frame(rows)
+    year = datetime.now().year
+
+    df = source.copy()
+    for column in tc_daily_update.DATE_COLUMNS:
+        df[column] = pd.to_datetime(df[column]).fillna(tc_daily_update.na_filler)
+    periodes = tc_daily_update.select_periodes(df, year)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        one_pass_time, _ = time_call(lambda: tc_daily_update.build_periode_reports(df, periodes), repeat=1)
+        legacy = df[['Empower TC Name']].join(source.drop(columns=['Empower TC Name']))
+        legacy['CTC Started with Empower'] = df['CTC Started with Empower']
+        legacy_time, _ = time_call(lambda: legacy_periode_reports(tc_daily_update, legacy, periodes), repeat=1)
+    print(f"{rows:,} rows, {len(periodes)} periods of {year}: per-period {legacy_time:.2f}s, one pass "
+          f"{one_pass_time:.3f}s, {legacy_time / one_pass_time:.0f}x")
+
+
+PAYROLL_DATE_COLUMNS = [
+    'Closing', 'Listing PAID Date', 'CTC PAID Date', 'Offer Prep PAID Date', 'Compliance PAID Date',
+    'Listing Started with Empower', 'Offer Started with Empower', 'Compliance Started with Empower',
+]
+PAYROLL_AMOUNT_COLUMNS = ['Billing Amount', 'Listing PAID Amount', 'CTC PAID Amount', 'Offer Prep PAID Amount',
+                          'Compliance PAID Amount']
+
+
+def payroll_source_frame(rows, seed=0):
+    """
+    Synthetic tc_payroll transaction source (the `extract_fields` output) with `rows` rows.
+
+    Dates are ISO strings (some on the 15th/16th and in December), '' or None; amounts are
+    decimal strings, '' or None.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    base_date = np.datetime64(f"{datetime.now().year - 1}-01-01")
+    date_pool = np.array([str(base_date + np.timedelta64(day, 'D')) for day in range(0, 730)] + ['', None],
+                         dtype=object)
+    amount_pool = np.array([f"{amount:.2f}" for amount in rng.uniform(50, 900, 500)] + ['', None], dtype=object)
+    columns = {'Empower TC Name': rng.choice(np.array(TC_NAMES + ['Other TC', None], dtype=object), rows)}
+    for column in PAYROLL_DATE_COLUMNS:
+        columns[column] = np.where(rng.random(rows) < 0.4, '', rng.choice(date_pool, rows))
+    for column in PAYROLL_AMOUNT_COLUMNS:
+        columns[column] = rng.choice(amount_pool, rows)
+    return pd.DataFrame(columns)
+
+
+def rowwise_payroll(df, tc_payroll):
+    """The previous row-by-row tc_payroll transform, kept as the reference for `transform_transaction_source`."""
+    import pandas as pd
+
+    na_filler = tc_payroll.na_filler
+    get_period = tc_payroll.get_period
+    for column in PAYROLL_DATE_COLUMNS:
+        df[column] = pd.to_datetime(df[column]).fillna(na_filler)
+    df['TC Commission Rate'] = 0.5
+    df['Billing Amount'] = pd.to_numeric(df['Billing Amount'], errors='coerce', downcast='float')
+    df['TC Commission Amount'] = df['Billing Amount'] * df['TC Commission Rate']
+    for date_column, prefix in tc_payroll.PERIOD_COLUMNS:
+        df[f'{prefix}_period_start'] = df[date_column].apply(lambda x: get_period(x, mode='start'))
+        df[f'{prefix}_period_end'] = df[date_column].apply(lambda x: get_period(x, mode='end'))
+        df[f'{prefix}_periode'] = df.apply(lambda x: x[f'{prefix}_period_start'].strftime('%Y/%m/%d').upper() + ' - ' + x[f'{prefix}_period_end'].strftime('%Y/%m/%d').upper(), axis=1)
+
+    def in_window(x, date_column, prefix):
+        return (x[date_column] != na_filler) & (x[date_column] >= x[f'{prefix}_period_start']) & (x[date_column] <= x[f'{prefix}_period_end'])
+
+    for column, date_column, prefix in [('Listing PAID Amount', 'Listing PAID Date', 'listing'),
+                                        ('CTC PAID Amount', 'CTC PAID Date', 'ctc'),
+                                        ('Compliance PAID Amount', 'Compliance PAID Date', 'compliance'),
+                                        ('Offer Prep PAID Amount', 'Offer Prep PAID Date', 'offer_prep')]:
+        df.rename({column: column + '_1'}, axis=1, inplace=True)
+        df[column] = df.apply(lambda x: x[column + '_1'] if in_window(x, date_column, prefix) else 0, axis=1)
+        df.drop(columns=column + '_1', inplace=True)
+    df['CTC Projection'] = df['Closing'].apply(lambda x: 0 if x == na_filler else 1)
+    df['Listing Projection'] = df.apply(lambda x: 1 if in_window(x, 'Listing Started with Empower', 'listing') else 0, axis=1)
+    df['Offer Projection'] = df.apply(lambda x: 1 if in_window(x, 'Offer Started with Empower', 'offer_prep') else 0, axis=1)
+    df['Compliance Projection'] = df.apply(lambda x: 1 if in_window(x, 'Compliance Started with Empower', 'compliance') else 0, axis=1)
+    df['Projection Condition'] = df.apply(lambda x: 1 if (x['CTC Projection'] == 1 or x['Listing Projection'] == 1 or x['Offer Projection'] == 1 or x['Compliance Projection'] == 1) else 0, axis=1)
+    for column in PAYROLL_AMOUNT_COLUMNS[1:]:
+        df[column] = pd.to_numeric(df[column], errors='coerce', downcast='float')
+    df['TC Revenue'] = df[['Listing PAID Amount', 'CTC PAID Amount', 'Offer Prep PAID Amount', 'Compliance PAID Amount']].sum(axis=1)
+    df['Projected Amount'] = df.apply(lambda x: x['TC Commission Amount'] if in_window(x, 'Closing', 'closing') else 0, axis=1)
+    df['Actual Amount'] = df.apply(lambda x: x['TC Revenue'] * x['TC Commission Rate'] if in_window(x, 'CTC PAID Date', 'ctc') else 0, axis=1)
+    df['TC Revenue Amount'] = df.apply(lambda x: x['TC Revenue'] if in_window(x, 'CTC PAID Date', 'ctc') else 0, axis=1)
+    return df
+
+
+def benchmark_payroll(rows_list, legacy_max_rows):
+
+    tc_payroll = load_script_module('tc_payroll/main.py', 'tc_payroll_main')
+    for rows in rows_list:
+        df = payroll_source_frame(rows)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            vectorized_time, _ = time_call(lambda: tc_payroll.transform_transaction_source(df.copy()), repeat=1)
+        line = f"{rows:>9,} rows: vectorized {vectorized_time:.3f}s"
+        if rows <= legacy_max_rows:
+            rowwise_time, _ = time_call(lambda: rowwise_payroll(df.copy(), tc_payroll), repeat=1)
+            line += f", row-wise {rowwise_time:.2f}s, {rowwise_time / vectorized_time:.0f}x"
+        else:
+            line += ", row-wise skipped (see --legacy-max-rows)"
+        print(line)
+
+
+def edited_properties(df, change_rate, seed=0):
+    """
+    The next day's properties: `change_rate` of `df` with a new Closing date and Billing Amount,
+    as many removed and as many new ones.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    count = max(int(len(df) * change_rate), 1)
+    picked = rng.choice(len(df), count * 2, replace=False)
+    df = df.copy()
+    base_date = datetime(datetime.now().year, 1, 1)
+    for position in picked[:count]:
+        field_values = json.loads(df['field_values'].iat[position])
+        for item in field_values:
+            if item['label'] == 'Closing':
+                item['value'] = (base_date + timedelta(days=int(rng.integers(0, 365)))).strftime('%Y-%m-%d')
+            elif item['label'] == 'Billing Amount':
+                item['value'] = str(rng.choice([99, 350, 400]))
+        df.iloc[position, df.columns.get_loc('field_values')] = json.dumps(field_values)
+    df = df.drop(index=df.index[picked[count:]])
+    added = properties_frame(count, seed=seed + 1)
+    added['id'] = np.arange(count) + df['id'].max() + 1
+    return pd.concat([df, added], ignore_index=True)
+
+
+def benchmark_ledger(records, change_rate):
+    from field_values import extract_fields
+
+    tc_payroll = load_script_module('tc_payroll/main.py', 'tc_payroll_main')
+    schema = tc_payroll.read_transaction_schema()
+
+    def transform_all(df):
+        enriched = tc_payroll.transform_transaction_source(extract_fields(df['field_values'], schema))
+        return tc_payroll.build_payroll_reports(enriched)
+
+    def incremental(df):
+        ledger, _ = tc_payroll.update_payroll_ledger(df)
+        return tc_payroll.ledger_payroll_reports(ledger)
+
+    @in_scratch_dir
+    def run():
+        yesterday = properties_frame(records)
+        today = edited_properties(yesterday, change_rate)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            full_time, _ = time_call(lambda: tc_payroll.update_payroll_ledger(yesterday, full=True), repeat=1)
+            transform_time, _ = time_call(lambda: transform_all(today), repeat=1)
+            incremental_time, _ = time_call(lambda: incremental(today), repeat=1)
+        print(f"{records:,} properties, {change_rate:.1%} edited, removed and added: "
+              f"parse and transform everything {transform_time:.3f}s, incremental ledger {incremental_time:.3f}s "
+              f"({transform_time / incremental_time:.1f}x); first full ledger build {full_time:.3f}s")
+
+    run()
+
+
+def staged_transaction_frame(rows, seed=0):
+    """
+    Synthetic formatted transaction table of data_preparation.create_staging_layer (trx_order columns,
+    date columns filled with na_filler, amounts as strings, 0, '' or None), just before its filters.
+    """
+    import numpy as np
+    import pandas as pd
+    from data_preparation import na_filler
+
+    rng = np.random.default_rng(seed)
+    date_columns = read_schema_file('trx_date_columns.csv')
+    base_date = np.datetime64(f"{datetime.now().year}-01-01", 'ns')
+    titles = np.array(['Synthetic Street', 'TEST property', 'Training file', 'please delete', 'Testing Lane',
+                       'Main Street'], dtype=object)
+    amounts = np.array(['', None, 0, '150', '350', '0'], dtype=object)
+    statuses = CONTRACT_STATUSES + ['Compliance - Ready to BILL', 'CTC - Withdrawn', 'Listing - Pre-Listing']
+    columns = {}
+    for column in read_schema_file('trx_order.csv'):
+        if column in date_columns:
+            dates = base_date + rng.integers(-2500, 420, rows).astype('timedelta64[D]')
+            columns[column] = np.where(rng.random(rows) < 0.6, np.datetime64(na_filler, 'ns'), dates)
+        else:
+            columns[column] = rng.choice(np.array(['value', '', None], dtype=object), rows)
+    columns['Contract Title'] = rng.choice(titles, rows, p=[0.9, 0.02, 0.02, 0.02, 0.02, 0.02])
+    columns['Contract Title'] = columns['Contract Title'] + ' ' + np.arange(rows).astype(str).astype(object)
+    columns['Contract Status'] = rng.choice(np.array(statuses, dtype=object), rows)
+    columns['Billing Status'] = rng.choice(np.array(['none', 'none', 'none', 'Invoiced'], dtype=object), rows)
+    columns['Empower TC Name'] = rng.choice(np.array(TC_NAMES + ['', None], dtype=object), rows)
+    columns['Empower Agent Name'] = rng.choice(np.array(['Agent 1', 'Agent 2', '', None], dtype=object), rows)
+    columns['Billing Amount'] = rng.choice(amounts, rows)
+    columns['Other Amount'] = rng.choice(amounts, rows)
+    columns['Preferred  Ai  CTC'] = rng.choice(np.array(['Yes', 'No', 'none'], dtype=object), rows)
+    columns['Listing PAID Amount'] = rng.choice(np.array([0, '150', '200'], dtype=object), rows)
+    # Rows left after the agent-account join keep their labels, with gaps
+    return pd.DataFrame(columns, index=np.cumsum(rng.integers(1, 3, rows)))
+
+
+def legacy_staging_rules(transaction_df):
+    """
+    The previous create_staging_layer filters and corrections (a drop per rule, three title scans,
+    the billing mask built twice and a copied frame), kept as the reference for `apply_staging_rules`.
+    The old code recomputed the listing mask after clearing the dates it tests, so its Listing PAID
+    Amount reset never applied; here it reuses the mask, as `apply_staging_rules` does.
+    """
+    import pandas as pd
+    from data_preparation import na_filler
+
+    def correcting_ba_amount(df):
+        df = df.copy()
+        billing_amount_blank = (pd.isna(df['Billing Amount'])) | (df['Billing Amount'] == 0) | (df['Billing Amount'] == '')
+        other_amount_valid = (pd.notna(df['Other Amount'])) & (df['Other Amount'] != 0) & (df['Other Amount'] != '')
+        df.loc[billing_amount_blank & other_amount_valid, 'Billing Amount'] = df.loc[billing_amount_blank & other_amount_valid, 'Other Amount']
+        remaining_blank = billing_amount_blank & ~other_amount_valid
+        df.loc[remaining_blank & (df['Preferred  Ai  CTC'] == 'Yes'), 'Billing Amount'] = 99.00
+        df.loc[remaining_blank & (df['Preferred  Ai  CTC'] != 'Yes'), 'Billing Amount'] = 400.00
+        return df['Billing Amount'].to_list()
+
+    for word in ('test', 'training', 'delete'):
+        transaction_df.drop(transaction_df[transaction_df['Contract Title'].str.lower().str.contains(word)].index,
+                            axis=0, inplace=True)
+    not_started = ((transaction_df['CTC Started with Empower'] == na_filler)
+                   & (transaction_df['Listing Started with Empower'] == na_filler)
+                   & (transaction_df['Offer Started with Empower'] == na_filler)
+                   & (transaction_df['Compliance Started with Empower'] == na_filler))
+    for name in ('Empower TC Name', 'Empower Agent Name'):
+        transaction_df.drop(
+            transaction_df[((pd.isna(transaction_df[name])) | (transaction_df[name] == '')) & not_started].index,
+            axis=0, inplace=True)
+        not_started = not_started[transaction_df.index]
+
+    transaction_df.loc[transaction_df[transaction_df['Contract Status'].isin([
+        'Compliance - PAID', 'Compliance - Ready to BILL', 'CTC - Preferred - Terminated - No Change',
+        'CTC - Terminated - No Change', 'CTC - Preferred - Withdrawn', 'CTC - Withdrawn', 'Listing - PAID',
+        'Listing - Pre-Listing',
+    ])].index, 'Closing'] = na_filler
+    listing_on_ctc = transaction_df[(transaction_df['CTC Started with Empower'].dt.year >= 2021)
+                                    & (transaction_df['Listing Started with Empower'].dt.year >= 2021)].index
+    transaction_df.loc[listing_on_ctc, ['Listing Started with Empower', 'Live on MLS Date', 'Listing PAID Date']] = na_filler
+    transaction_df.loc[listing_on_ctc, 'Listing PAID Amount'] = 0
+
+    billing_status_list = transaction_df.loc[transaction_df['Billing Status'] != 'none', 'Billing Status'].to_list()
+    transaction_df.loc[transaction_df['Billing Status'] != 'none', 'Contract Status'] = billing_status_list
+
+    ba_amount_correction = transaction_df.loc[
+        ((transaction_df['Billing Amount'] == 0) | (pd.isna(transaction_df['Billing Amount'])) | (transaction_df['Billing Amount'] == '')) & (transaction_df['Closing'] != na_filler),
+        ['Billing Amount', 'Other Amount', 'Preferred  Ai  CTC']
+    ]
+    corrected_ba_amount = correcting_ba_amount(ba_amount_correction)
+    transaction_df.loc[
+        ((transaction_df['Billing Amount'] == 0) | (pd.isna(transaction_df['Billing Amount'])) | (transaction_df['Billing Amount'] == '')) & (transaction_df['Closing'] != na_filler),
+        'Billing Amount'
+    ] = corrected_ba_amount
+    return transaction_df
+
+
+def benchmark_staging(rows_list):
+    import tracemalloc
+    from data_preparation import apply_staging_rules
+
+    for rows in rows_list:
+        df = staged_transaction_frame(rows)
+        results = {}
+        line = f"{rows:>9,} rows:"
+        for label, rules in (('per-rule drops', legacy_staging_rules), ('one mask pass', apply_staging_rules)):
+            frame = df.copy()
+            tracemalloc.start()
+            start = time.perf_counter()
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                results[label] = rules(frame)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            line += f" {label} {elapsed:.2f}s, peak {peak / 1e6:.0f} MB;"
+            del frame
+        print(f"{line} {len(results['one mask pass']):,} rows kept")
+
+
+AGENT_ACCOUNT_SCHEMA = ['Contract Title', 'Contract Status', '1st Transaction Date', 'Reassigned Date', 'Brokerage',
+                        'Agent Provided by']
+
+
+def staging_properties(count, agent_share=0.2, seed=0, minutes_apart=1):
+    """
+    Synthetic properties for data_preparation.create_staging_layer: `agent_share` of them are agent
+    accounts titled after an agent (some agents have several), the rest transactions naming one of
+    those agents (or an unknown one). Created timestamps are unique, so "latest per title" has no ties;
+    they are whole multiples of `minutes_apart` minutes from 2022-01-01, spanning `count * 10` of them.
+    """
+    rng = random.Random(seed)
+    agents = [f"Agent {i}" for i in range(max(1, int(count * agent_share * 0.8)))]
+    properties = generate_properties(count, seed=seed)
+    created = rng.sample(range(count * 10), count)
+    for record, seconds in zip(properties, created):
+        record['created'] = (datetime(2022, 1, 1) + timedelta(minutes=seconds * minutes_apart)).strftime('%Y-%m-%d %H:%M:%S')
+        values = {item['label']: item for item in record['field_values']}
+        if rng.random() < agent_share:
+            values['Contract Status']['value'] = 'AGENT ACCOUNT'
+            values['Contract Title']['value'] = rng.choice(agents)
+            values['Brokerage']['value'] = f"Brokerage {rng.randint(1, 50)}"
+        else:
+            values['Empower Agent Name']['value'] = rng.choice(agents + ['Unknown Agent'])
+    return properties
+
+
+def write_team_lists():
+    """
+    Writes the daily contract count's team lists to the working directory. They are not in the
+    repository; the extract sheets' lists stand in for them.
+    """
+    for path in ('ctc_teams.csv', 'preferred_teams.csv'):
+        shutil.copy(os.path.join(BASE_DIR, 'extract_' + path), path)
+
+
+def write_staging_schema_files():
+    """Writes the column lists create_staging_layer reads from the working directory."""
+    import csv
+    for path in ('trx_order.csv', 'trx_date_columns.csv', 'trx_columns_need_fillna_0.csv',
+                 'trx_columns_need_fillna_none.csv'):
+        shutil.copy(os.path.join(BASE_DIR, path), path)
+    from data_preparation import AGENT_ACCOUNT_JOIN_COLUMNS, SOURCE_COLUMNS
+    transaction_schema = [column for column in read_schema_file('trx_order.csv')
+                          if column not in SOURCE_COLUMNS.values() and column not in AGENT_ACCOUNT_JOIN_COLUMNS]
+    for path, schema in (('Columns_Transaction_Source.csv', transaction_schema),
+                         ('Columns_Agent_Account_Source.csv', AGENT_ACCOUNT_SCHEMA)):
+        with open(path, 'w', newline='') as file:
+            csv.writer(file).writerows([column] for column in schema)
+
+
+def legacy_extract_field_values_batch(field_values, schema):
+    """The previous data_preparation per-document extraction (last match wins), kept for legacy_staging_layer."""
+    result = {key: None for key in schema}
+    for item in json.loads(field_values):
+        if isinstance(item, dict) and "label" in item and "value" in item:
+            if item["label"] in schema:
+                result[item["label"]] = item["value"]
+    return result
+
+
+def legacy_staging_layer(properties_file_path):
+    """
+    The previous create_staging_layer extraction (every document parsed once per table, agent
+    accounts sorted and deduplicated over all history, then merged), kept as the reference;
+    formatting and staging rules are shared with the current version.
+    """
+    import csv
+    import duckdb
+    import pandas as pd
+    import data_preparation
+
+    conn = duckdb.connect(database=':memory:')
+    df = conn.execute(f"SELECT * FROM read_parquet('{properties_file_path}')").fetchdf()
+    conn.close()
+
+    def source_table(schema_file):
+        with open(schema_file) as file:
+            schema = [row[0] for row in csv.reader(file)]
+        intermediate = df['field_values'].map(lambda x: legacy_extract_field_values_batch(x, schema))
+        table = df[['timezone', 'team_name', 'team_user_name', 'created', 'agent_name']].copy()
+        table.rename({'timezone': 'Time Zone', 'team_name': 'Team', 'team_user_name': 'Team User',
+                      'created': 'Date Created', 'agent_name': 'Created By'}, axis=1, inplace=True)
+        return pd.concat([table, pd.DataFrame(intermediate.tolist(), columns=schema)], axis=1)
+
+    transaction_df = source_table('Columns_Transaction_Source.csv')
+    transaction_df = transaction_df[transaction_df['Contract Status'] != 'AGENT ACCOUNT']
+    transaction_df['Date Created'] = pd.to_datetime(transaction_df['Date Created'])
+    transaction_df.sort_values('Date Created', inplace=True, ignore_index=True, ascending=False)
+
+    agent_account_df = source_table('Columns_Agent_Account_Source.csv')
+    agent_account_df = agent_account_df[agent_account_df['Contract Status'] == 'AGENT ACCOUNT']
+    agent_account_df['Date Created'] = pd.to_datetime(agent_account_df['Date Created'])
+    agent_account_df.sort_values('Date Created', inplace=True, ignore_index=True, ascending=False)
+    duplicated_agent_account_df = agent_account_df[agent_account_df.duplicated('Contract Title', keep='first')].copy()
+    agent_account_df.drop_duplicates('Contract Title', keep='first', inplace=True, ignore_index=True)
+
+    transaction_df = transaction_df.merge(agent_account_df[['Contract Title', '1st Transaction Date', 'Reassigned Date', 'Brokerage', 'Agent Provided by']], how='left', left_on='Empower Agent Name', right_on='Contract Title', indicator=True)
+    transaction_df.rename({'Contract Title_x': 'Contract Title'}, inplace=True, axis=1)
+    transaction_df.drop(columns='Contract Title_y', inplace=True)
+    error_df = transaction_df[transaction_df['_merge'] == 'left_only'].drop(columns='_merge')
+    transaction_df = transaction_df[transaction_df['_merge'] == 'both'].drop(columns='_merge')
+
+    transaction_df = transaction_df[read_schema_file('trx_order.csv')]
+    trx_date_columns = read_schema_file('trx_date_columns.csv')
+    transaction_df[trx_date_columns] = transaction_df[trx_date_columns].astype('datetime64[ns]').fillna(data_preparation.na_filler)
+    fillna_0 = read_schema_file('trx_columns_need_fillna_0.csv')
+    fillna_none = read_schema_file('trx_columns_need_fillna_none.csv')
+    transaction_df[fillna_0] = transaction_df[fillna_0].fillna(0).replace('', 0)
+    transaction_df[fillna_none] = transaction_df[fillna_none].fillna('none').replace('', 'none')
+    transaction_df = data_preparation.apply_staging_rules(transaction_df)
+    return transaction_df, error_df, agent_account_df, duplicated_agent_account_df
+
+
+@in_scratch_dir
+def benchmark_agent_accounts(records, change_rate):
+    import pyarrow.parquet as pq
+    from data_preparation import create_staging_layer
+    from property_store import DatasetWriter, records_to_table
+
+    write_staging_schema_files()
+    properties = staging_properties(records)
+    with DatasetWriter() as writer:
+        writer.write_records(properties)
+    source = 'datas/all_properties_*.parquet'
+
+    def run(label, build):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            elapsed, tables = time_call(build, repeat=1)
+        print(f"{label}: {elapsed:.2f} seconds")
+        return elapsed, tables
+
+    agent_accounts = sum(1 for record in properties
+                         if any(item['label'] == 'Contract Status' and item['value'] == 'AGENT ACCOUNT'
+                                for item in record['field_values']))
+    print(f"{records} properties, {agent_accounts} agent accounts")
+    run('two parses, full sort + merge', lambda: legacy_staging_layer(source))
+    run('one parse, index built', lambda: create_staging_layer(source))
+
+    # Some agent accounts change (and one is removed); the index only re-ranks their titles
+    rng = random.Random(1)
+    changed = [record for record in properties
+               if any(item['label'] == 'Contract Status' and item['value'] == 'AGENT ACCOUNT'
+                      for item in record['field_values']) and rng.random() < change_rate]
+    for record in changed[1:]:
+        for item in record['field_values']:
+            if item['label'] == 'Brokerage':
+                item['value'] = 'Brokerage changed'
+    if changed:
+        properties.remove(changed[0])
+    for path in glob.glob(source):
+        os.remove(path)
+    pq.write_table(records_to_table(properties), 'datas/all_properties_changed.parquet')
+
+    legacy_time, _ = run('two parses, full sort + merge (after changes)', lambda: legacy_staging_layer(source))
+    incremental_time, _ = run(f"one parse, {len(changed)} agent accounts changed", lambda: create_staging_layer(source))
+    print(f"speedup: {legacy_time / incremental_time:.1f}x")
+
+
+@in_scratch_dir
+def benchmark_staging_store(records, months):
+    from data_preparation import create_staging_layer
+    from property_store import DatasetWriter
+    from staging_store import STAGING_TABLES, monthly_staging_summary, read_staging_table, save_staging_tables, staging_connection
+
+    write_staging_schema_files()
+    # Spread the created timestamps over `months` months
+    minutes_apart = max(1, months * 30 * 24 * 60 // (records * 10))
+    with DatasetWriter() as writer:
+        writer.write_records(staging_properties(records, minutes_apart=minutes_apart))
+    source = 'datas/all_properties_*.parquet'
+
+    def run(label, build):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            elapsed, result = time_call(build, repeat=1)
+        print(f"{label}: {elapsed:.3f} seconds")
+        return elapsed, result
+
+    derive_time, tables = run('re-derive the staging tables from field_values', lambda: create_staging_layer(source))
+    tables = dict(zip(STAGING_TABLES, tables))
+    run('write the staging store', lambda: save_staging_tables(tables))
+    print(f"{records} properties over {tables['transaction']['Date Created'].dt.strftime('%Y-%m').nunique()} months: "
+          + ", ".join(f"{len(df)} {name} rows" for name, df in tables.items()))
+
+    read_time, _ = run('read every staging table from the store',
+                       lambda: {name: read_staging_table(name) for name in STAGING_TABLES})
+
+    # A report needing one month of transactions
+    month = tables['transaction']['Date Created'].max().strftime('%Y-%m')
+    columns = ['Contract Title', 'Empower TC Name', 'Contract Status', 'Closing', 'Billing Amount']
+    month_time, _ = run(f"read {len(columns)} columns of {month} from the store",
+                        lambda: read_staging_table('transaction', columns=columns, months=[month]))
+
+    conn = staging_connection()
+    query = 'SELECT created_month, "Contract Status", count(*) AS n FROM "transaction" GROUP BY ALL ORDER BY ALL'
+    sql_time, _ = run('count transactions per month and status in SQL', lambda: conn.execute(query).fetchall())
+    conn.close()
+    print(f"speedup: {derive_time / read_time:.1f}x full read, {derive_time / month_time:.1f}x one month, "
+          f"{derive_time / sql_time:.1f}x SQL summary")
+
+    # The Source Report's Monthly Summary tab
+    summary_time, summary = run('monthly summary of every table from the store', monthly_staging_summary)
+    print(f"monthly summary: {len(summary)} months in {summary_time:.3f} seconds")
+
+
+@in_scratch_dir
+def benchmark_schemas(runs):
+    import csv
+    import pandas as pd
+    from daily_contract_count.summary_engine import SUMMARY_SPECS
+    from schemas import (AGENT_ACCOUNT_SOURCE, CTC_TEAM_LIST, DAILY_UPDATE_SOURCE, LABEL_SCHEMAS, PREFERRED_TEAM_LIST,
+                         SCHEMA_FILES, TRANSACTION_SOURCE, TRX_DATE_COLUMNS, TRX_FILLNA_0, TRX_FILLNA_NONE,
+                         TRX_ORDER, SchemaRegistry, observed_labels)
+
+    write_team_lists()
+    write_staging_schema_files()
+    os.makedirs('tc_daily_update')
+    shutil.copy(os.path.join(BASE_DIR, 'tc_daily_update', 'Columns_Transaction_Source.csv'), 'tc_daily_update')
+
+    # The lists one daily run read before: the staging layer's six, tc_payroll's source twice (report and
+    # ledger), tc_daily_update's once and a team list per team-restricted summary row
+    files = {TRX_ORDER: 'trx_order.csv', TRX_DATE_COLUMNS: 'trx_date_columns.csv',
+             TRX_FILLNA_0: 'trx_columns_need_fillna_0.csv', TRX_FILLNA_NONE: 'trx_columns_need_fillna_none.csv',
+             TRANSACTION_SOURCE: 'Columns_Transaction_Source.csv', AGENT_ACCOUNT_SOURCE: 'Columns_Agent_Account_Source.csv',
+             DAILY_UPDATE_SOURCE: 'tc_daily_update/Columns_Transaction_Source.csv', CTC_TEAM_LIST: 'ctc_teams.csv',
+             PREFERRED_TEAM_LIST: 'preferred_teams.csv'}
+    lookups = [TRX_ORDER, TRX_DATE_COLUMNS, TRX_FILLNA_0, TRX_FILLNA_NONE, TRANSACTION_SOURCE, AGENT_ACCOUNT_SOURCE,
+               TRANSACTION_SOURCE, TRANSACTION_SOURCE, DAILY_UPDATE_SOURCE]
+    lookups += [spec.teams for spec in SUMMARY_SPECS if spec.teams]
+    print(f"{runs} runs of {len(lookups)} column-list lookups ({sum(1 for spec in SUMMARY_SPECS if spec.teams)} team lists)")
+
+    def legacy():
+        lists = []
+        for _ in range(runs):
+            for name in lookups:
+                with open(files[name]) as file:
+                    lists.append([row[0] for row in csv.reader(file)])
+        return lists
+
+    registry = SchemaRegistry([os.getcwd()])
+
+    def cached():
+        lists = []
+        for _ in range(runs):
+            for name in lookups:
+                lists.append(list(registry.columns(name)))
+            registry.transaction_dtypes()
+        return lists
+
+    legacy_time, _ = time_call(legacy, repeat=1)
+    cached_time, _ = time_call(cached, repeat=1)
+    print(f"csv.reader per lookup: {legacy_time * 1000:.1f} ms")
+    print(f"schema registry (read once, plus the dtype map): {cached_time * 1000:.1f} ms")
+    print(f"speedup: {legacy_time / cached_time:.1f}x")
+
+    # Relative paths only resolve from the repository root; the registry resolves them anywhere
+    os.makedirs('elsewhere')
+    os.chdir('elsewhere')
+    missing = 0
+    for name in dict.fromkeys(lookups):
+        try:
+            open(files[name]).close()
+        except OSError:
+            missing += 1
+    repository = SchemaRegistry([BASE_DIR])
+    not_in_repository = []
+    for name in SCHEMA_FILES:
+        try:
+            repository.path(name)
+        except FileNotFoundError:
+            not_in_repository.append(name)
+    os.chdir('..')
+    print(f"from another directory: {missing} of {len(set(lookups))} lists not found by relative path; the registry "
+          f"finds {len(SCHEMA_FILES) - len(not_in_repository)} of {len(SCHEMA_FILES)} in the repository "
+          f"(not in it: {', '.join(not_in_repository)})")
+
+    # Label lists against the labels of a dataset built from the field template
+    properties = pd.DataFrame({'field_values': [json.dumps(record['field_values']) for record in generate_properties(200)]})
+    labels = observed_labels(properties)
+    print(f"{len(labels)} field labels in the dataset")
+    for name, unknown in repository.validate(labels, names=LABEL_SCHEMAS).items():
+        print(f"  {name}: {len(unknown)} entries are not field labels")
+
+
+def legacy_populate_sheet(service, spreadsheet_id, df, sheet_title):
+    """The previous one-request-per-tab writer, kept as the reference for `gsheetapi.populate_google_sheets`."""
+    df = df.fillna("")
+    df = df.copy()
+    for col in df.select_dtypes(include=['datetime', 'datetimetz']).columns:
+        df[col] = df[col].astype(str)
+    sheets = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute().get('sheets', '')
+    if sheet_title not in [sheet['properties']['title'] for sheet in sheets]:
+        service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id, body={"requests": [{"addSheet": {"properties": {"title": sheet_title}}}]}
+        ).execute()
+    else:
+        service.spreadsheets().values().clear(spreadsheetId=spreadsheet_id, range=f"{sheet_title}!A1:ZZ").execute()
+    values = [df.columns.tolist()] + df.values.tolist()
+    service.spreadsheets().values().update(
+        spreadsheetId=spreadsheet_id, range=f"{sheet_title}!A1", valueInputOption="RAW", body={"values": values},
+    ).execute()
+
+
+def benchmark_sheets(rows, latency, seconds_per_cell, max_request_mb, workers, memory=False):
+    import tracemalloc
+    import gsheetapi
+
+    tc_payroll = load_script_module('tc_payroll/main.py', 'tc_payroll_main')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        enriched = tc_payroll.transform_transaction_source(payroll_source_frame(rows))
+    reports = tc_payroll.build_payroll_reports(enriched)
+    dataframes = [enriched, reports['p'], reports['a']]
+    titles = ['transaction_data', 'projected', 'actual']
+    cells = sum(df.size for df in dataframes)
+    print(f"{rows:,} transactions, {cells:,} cells over {len(titles)} tabs")
+
+    def run(label, write):
+        service = FakeSheetsService(latency, seconds_per_cell, int(max_request_mb * 1e6), keep_cells=False)
+        spreadsheet_id = service.create({})['spreadsheetId']
+        if memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            failed = write(service, spreadsheet_id)
+        elapsed = time.perf_counter() - start
+        line = (f"{label:>8}: {elapsed:.2f}s, {sum(service.calls.values())} requests {dict(service.calls)}, "
+                f"largest request {service.largest_request_bytes / 1e6:.1f} MB")
+        if memory:
+            line += f", peak memory {tracemalloc.get_traced_memory()[1] / 1e6:.0f} MB"
+            tracemalloc.stop()
+        print(line + (f", FAILED tabs: {failed}" if failed else ""))
+
+    def legacy(service, spreadsheet_id):
+        failed = []
+        for df, title in zip(dataframes, titles):
+            try:
+                legacy_populate_sheet(service, spreadsheet_id, df, title)
+            except FakeHttpError:
+                failed.append(title)
+        return failed
+
+    def batched(service, spreadsheet_id):
+        written = gsheetapi.populate_google_sheets(lambda: service, spreadsheet_id, dataframes, titles,
+                                                   max_workers=workers)
+        return [title for title in titles if title not in written]
+
+    run('legacy', legacy)
+    run('batched', batched)
+
+
+def benchmark_sheet_sync(rows, change_rate, latency, seconds_per_cell):
+    import contextlib
+    import numpy as np
+    import pandas as pd
+    import gsheetapi
+
+    tc_payroll = load_script_module('tc_payroll/main.py', 'tc_payroll_main')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yesterday = tc_payroll.transform_transaction_source(payroll_source_frame(rows))
+    yesterday.insert(0, 'Contract Title', [f"{i} Synthetic Street" for i in range(rows)])
+
+    # Today: a share of rows changed, removed and added
+    rng = np.random.default_rng(1)
+    changes = max(1, int(rows * change_rate))
+    today = yesterday.drop(index=rng.choice(rows, changes, replace=False))
+    updated = rng.choice(today.index.to_numpy(), changes, replace=False)
+    today.loc[updated, 'Billing Amount'] = today.loc[updated, 'Billing Amount'].fillna(0) + 1
+    added = yesterday.sample(changes, random_state=2).assign(
+        **{'Contract Title': [f"{rows + i} Synthetic Street" for i in range(changes)]})
+    today = pd.concat([today, added])
+    print(f"{rows:,} rows x {len(today.columns)} columns; {changes} updated, {changes} deleted, {changes} inserted")
+
+    snapshot_folder = tempfile.mkdtemp(prefix='otc_bench_snapshots_')
+    try:
+        def run(label, write):
+            service = FakeSheetsService(latency, seconds_per_cell)
+            spreadsheet_id = service.create({})['spreadsheetId']
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                gsheetapi.sync_google_sheet(service, spreadsheet_id, yesterday, 'transaction_data', ['Contract Title'],
+                                            snapshot_folder)
+                service.calls.clear()
+                service.largest_request_bytes = 0
+                start = time.perf_counter()
+                write(service, spreadsheet_id)
+            elapsed = time.perf_counter() - start
+            print(f"{label:>8}: {elapsed:.2f}s, {sum(service.calls.values())} requests {dict(service.calls)}, "
+                  f"largest request {service.largest_request_bytes / 1e6:.2f} MB")
+
+        run('rewrite', lambda service, spreadsheet_id: gsheetapi.populate_google_sheets(
+            lambda: service, spreadsheet_id, [today], ['transaction_data']))
+        run('sync', lambda service, spreadsheet_id: gsheetapi.sync_google_sheet(
+            service, spreadsheet_id, today, 'transaction_data', ['Contract Title'], snapshot_folder))
+    finally:
+        shutil.rmtree(snapshot_folder, ignore_errors=True)
+    sync_several_tabs(today, latency, seconds_per_cell)
+
+
+@in_scratch_dir
+def sync_several_tabs(df, latency, seconds_per_cell, tabs=4):
+    """create_google_sheet with every tab diff-synced: one metadata read, tabs synced by the worker pool."""
+    import contextlib
+    import gsheetapi
+
+    titles = [f"sync {i + 1}" for i in range(tabs)]
+    sync_keys = {title: ['Contract Title'] for title in titles}
+    service = FakeSheetsService(latency, seconds_per_cell)
+    spreadsheet_id = service.create({})['spreadsheetId']
+    for run in ('first', 'second'):
+        service.calls.clear()
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            gsheetapi.create_google_sheet([df] * tabs, titles, 'sync', spreadsheet_id, service_factory=lambda: service,
+                                          drive_service=FakeDriveService(), sync_keys=sync_keys)
+        elapsed = time.perf_counter() - start
+        print(f"{tabs} synced tabs, {run} run: {elapsed:.2f}s, {dict(service.calls)}")
+
+
+class FakeClock:
+    """Simulated time for QuotaScheduler: `sleep` advances the clock instead of blocking."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now += max(seconds, 0.0)
+
+
+class FakeQuotaEndpoint:
+    """
+    Google API method on a FakeClock that enforces a per-minute quota the way the real one
+    does: a request beyond `per_minute` in the last 60 seconds is rejected with a 429.
+    """
+
+    def __init__(self, clock, per_minute, latency):
+        self.clock = clock
+        self.per_minute = per_minute
+        self.latency = latency
+        self.accepted = []
+        self.rejected = 0
+
+    def __call__(self):
+        now = self.clock()
+        self.clock.sleep(self.latency)
+        recent = bisect.bisect_left(self.accepted, now - 60)
+        if len(self.accepted) - recent >= self.per_minute:
+            self.rejected += 1
+            raise FakeHttpError(429, "Quota exceeded for quota metric 'Write requests'")
+        self.accepted.append(now)
+        return {}
+
+
+def benchmark_quota(requests, per_minute, latency, other_load):
+    from google_quota import QuotaScheduler
+
+    def run(label, send):
+        clock = FakeClock()
+        endpoint = FakeQuotaEndpoint(clock, per_minute, latency)
+        # Requests another process already spent from the same quota
+        endpoint.accepted.extend([0.0] * other_load)
+        failed, metrics = send(clock, endpoint)
+        print(f"{label:>10}: {requests - failed}/{requests} succeeded, {endpoint.rejected} rejected with 429, "
+              f"{clock.now:.1f}s simulated")
+        if metrics:
+            print(f"{'':>10}  {metrics}")
+
+    def unpaced(clock, endpoint):
+        failed = 0
+        for _ in range(requests):
+            try:
+                endpoint()
+            except FakeHttpError:
+                failed += 1
+        return failed, None
+
+    def scheduled(clock, endpoint):
+        scheduler = QuotaScheduler({'sheets.write': per_minute}, clock=clock, sleep=clock.sleep,
+                                   rand=random.Random(0).random)
+        failed = 0
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for _ in range(requests):
+                try:
+                    scheduler.run('sheets.write', endpoint)
+                except FakeHttpError:
+                    failed += 1
+        return failed, scheduler.snapshot()['sheets.write']
+
+    print(f"{requests} write requests against a {per_minute}/minute quota "
+          f"({other_load} already used elsewhere), {latency}s per request")
+    run('unpaced', unpaced)
+    run('scheduled', scheduled)
+
+
+class FakeTokenEndpoint:
+    """google.auth transport stand-in for the OAuth token endpoint: every call is a token exchange taking `latency`."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.exchanges = 0
+
+    def __call__(self, url, method='GET', body=None, headers=None, **kwargs):
+        class Response:
+            status = 200
+            headers = {}
+            data = b''
+
+        if 'allowedLocations' in url:
+            # google-auth's regional access boundary lookup, made once a token is held
+            Response.data = json.dumps({'encodedLocations': '0x0', 'locations': []}).encode()
+            return Response()
+        Response.data = json.dumps({'access_token': 'token', 'expires_in': 3600}).encode()
+        self.exchanges += 1
+        time.sleep(self.latency)
+        return Response()
+
+
+def service_account_file(path):
+    """Writes a service-account key with a freshly generated RSA key, loadable like the real credentials.json."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(path, 'w') as file:
+        json.dump({
+            'type': 'service_account',
+            'project_id': 'benchmark',
+            'private_key_id': 'benchmark',
+            'private_key': key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                             serialization.NoEncryption()).decode(),
+            'client_email': 'benchmark@benchmark.iam.gserviceaccount.com',
+            'client_id': '1',
+            'token_uri': 'https://oauth2.googleapis.com/token',
+        }, file)
+
+
+@in_scratch_dir
+def benchmark_clients(reports, token_latency):
+    from google.oauth2.service_account import Credentials
+    from googleapiclient.discovery import build
+    from google_clients import ClientRegistry, SCOPES, load_credentials
+
+    service_account_file('credentials.json')
+
+    def run(label, clients):
+        endpoint = FakeTokenEndpoint(token_latency)
+        start = time.perf_counter()
+        first = None
+        for _ in range(reports):
+            sheets, drive, creds = clients()
+            # The first request of a service authorizes it, exchanging a token unless one is held already
+            creds.before_request(endpoint, 'POST', 'https://sheets.googleapis.com/v4/spreadsheets', {})
+            first = first or time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+        print(f"{label:>9}: first report ready in {first * 1000:.1f} ms, {reports} reports in {elapsed * 1000:.1f} ms, "
+              f"{endpoint.exchanges} token exchanges")
+        return elapsed
+
+    def per_call():
+        # What gsheetapi.create_google_sheet and every standalone report did on each call
+        creds = Credentials.from_service_account_file('credentials.json', scopes=list(SCOPES))
+        return build('sheets', 'v4', credentials=creds), build('drive', 'v3', credentials=creds), creds
+
+    registry = ClientRegistry(credentials_loader=load_credentials)
+
+    def shared():
+        return registry.service('sheets', 'v4'), registry.service('drive', 'v3'), registry.credentials()
+
+    print(f"{reports} reports, {token_latency * 1000:.0f} ms per token exchange")
+    legacy = run('per call', per_call)
+    cached = run('registry', shared)
+    print(f"speedup: {legacy / cached:.1f}x; registry loaded credentials {registry.credential_loads} time(s), "
+          f"built {registry.services_built} services")
+
+
+@in_scratch_dir
+def benchmark_orchestrator(records, latency):
+    import contextlib
+    import subprocess
+    import sys
+    import google_clients
+    from google_quota import QuotaScheduler
+    from property_store import DatasetWriter
+    from report_dataset import DATASET_PATTERN
+    from main_orchestrator import REPORTS, DagOrchestrator, Task, build_report_tasks, load_report_module
+
+    properties = generate_properties(records)
+    write_team_lists()
+
+    def ingest():
+        with DatasetWriter() as writer:
+            writer.write_records(properties)
+
+    modules = {name: load_report_module(relative_path, module_name) for name, relative_path, module_name in REPORTS}
+
+    def run(label, orchestrator):
+        # Unpaced, only counting the requests of each quota for the run summary
+        scheduler = QuotaScheduler(quotas={})
+        registry = FakeClientRegistry(latency, scheduler)
+        previous = google_clients.set_registry(registry)
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                start = time.perf_counter()
+                results = orchestrator.run()
+                elapsed = time.perf_counter() - start
+        finally:
+            google_clients.set_registry(previous)
+        print(f"{label}: {elapsed:.2f}s")
+        quotas = scheduler.snapshot()
+        print(orchestrator.summary(results, elapsed, quotas))
+        failed = [name for name, result in results.items() if result.status != 'ok']
+        assert not failed, {name: results[name].error for name in failed}
+        return elapsed
+
+    # The previous orchestrator: one report after another, each reading and parsing the properties itself
+    sequential_tasks = [Task('ingest', lambda inputs: ingest())]
+    previous_task = 'ingest'
+    for name, _, _ in REPORTS:
+        def report(inputs, module=modules[name]):
+            path = DATASET_PATTERN
+            if module is modules['tc_daily_update']:
+                return module.generate_daily_update_report(module.generate_source(path))
+            return module.run_report(None, path)
+        sequential_tasks.append(Task(name, report, depends_on=(previous_task,)))
+        previous_task = name
+    sequential_time = run('sequential, separate loads', DagOrchestrator(sequential_tasks, max_workers=1))
+    shutil.rmtree(os.path.join('datas', 'sheet_snapshots'), ignore_errors=True)
+
+    dag_time = run('DAG, shared dataset', DagOrchestrator(build_report_tasks(ingest=ingest), max_workers=len(REPORTS)))
+
+    # Each subprocess of the previous orchestrator also paid a cold interpreter start
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import pandas, duckdb, pyarrow, googleapiclient.discovery'], check=True)
+    cold_start = time.perf_counter() - start
+    print(f"cold interpreter start with pandas/DuckDB/Google imports: {cold_start:.2f}s, paid by each of the "
+          f"{len(REPORTS) + 1} subprocesses before")
+    print(f"speedup: {(sequential_time + (len(REPORTS) + 1) * cold_start) / dag_time:.1f}x including cold starts, "
+          f"{sequential_time / dag_time:.1f}x in process")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    fetch_parser = subparsers.add_parser('fetch', help='serial vs concurrent property crawl against the stub server')
+    fetch_parser.add_argument('--records', type=int, default=5000)
+    fetch_parser.add_argument('--latency', type=float, default=0.05)
+    fetch_parser.add_argument('--workers', type=int, default=8)
+    fetch_parser.add_argument('--max-rps', type=float, default=None)
+    fetch_parser.add_argument('--failure-rate', type=float, default=0.0)
+
+    scan_parser = subparsers.add_parser('scan', help='downstream DuckDB scan time, page files vs compacted dataset')
+    scan_parser.add_argument('--records', type=int, default=5000)
+    scan_parser.add_argument('--page-size', type=int, default=50)
+    scan_parser.add_argument('--row-group-size', type=int, default=2000)
+
+    extract_parser = subparsers.add_parser('extract', help='per-field JSON re-parsing vs single-pass extraction')
+    extract_parser.add_argument('--records', type=int, default=500)
+
+    duckdb_parser = subparsers.add_parser('duckdb', help='Python JSON extraction vs DuckDB-native extraction, cross-checked')
+    duckdb_parser.add_argument('--records', type=int, default=5000)
+
+    flattened_parser = subparsers.add_parser('flattened', help='field_values JSON vs the flattened table, full vs incremental flatten')
+    flattened_parser.add_argument('--records', type=int, default=5000)
+    flattened_parser.add_argument('--change-rate', type=float, default=0.01)
+
+    extracts_parser = subparsers.add_parser('extracts', help='extract scripts each loading the dataset vs one shared extract pass')
+    extracts_parser.add_argument('--records', type=int, default=5000)
+
+    flags_parser = subparsers.add_parser('flags', help='row-wise vs vectorized tc_daily_update flag columns')
+    flags_parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    flags_parser.add_argument('--legacy-max-rows', type=int, default=100000,
+                              help='largest size the row-wise reference is run (and compared) at')
+
+    periods_parser = subparsers.add_parser('periods', help='per-period transform and pivots vs one pass over every tc_daily_update period')
+    periods_parser.add_argument('--rows', type=int, default=1500)
+
+    payroll_parser = subparsers.add_parser('payroll', help='row-wise vs vectorized tc_payroll periods and amounts')
+    payroll_parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    payroll_parser.add_argument('--legacy-max-rows', type=int, default=10000,
+                                help='largest size the row-wise reference is run (and compared) at')
+
+    ledger_parser = subparsers.add_parser('ledger', help='tc_payroll: parsing and transforming every property vs the incremental ledger')
+    ledger_parser.add_argument('--records', type=int, default=5000)
+    ledger_parser.add_argument('--change-rate', type=float, default=0.01,
+                               help='share of properties edited, and again removed and added, before the update')
+
+    staging_parser = subparsers.add_parser('staging', help='per-rule drops vs one mask pass in the staging layer (time and peak memory)')
+    staging_parser.add_argument('--rows', type=int, nargs='+', default=[500000])
+
+    agent_accounts_parser = subparsers.add_parser('agentaccounts', help='per-table parses and full agent-account dedup vs one parse and the incremental index')
+    agent_accounts_parser.add_argument('--records', type=int, default=5000)
+    agent_accounts_parser.add_argument('--change-rate', type=float, default=0.01, help='share of agent accounts changed before the second run')
+
+    staging_store_parser = subparsers.add_parser('stagingstore', help='re-deriving the staging tables vs reading the persisted staging store')
+    staging_store_parser.add_argument('--records', type=int, default=5000)
+    staging_store_parser.add_argument('--months', type=int, default=24, help='months the created dates span')
+
+    schemas_parser = subparsers.add_parser('schemas', help='csv.reader per column-list lookup vs the cached schema registry')
+    schemas_parser.add_argument('--runs', type=int, default=100, help='daily runs of lookups in one process')
+
+    sheets_parser = subparsers.add_parser('sheets', help='single-request vs chunked, concurrent Google Sheets writes (fake service)')
+    sheets_parser.add_argument('--rows', type=int, default=50000)
+    sheets_parser.add_argument('--latency', type=float, default=0.2, help='seconds per request')
+    sheets_parser.add_argument('--seconds-per-cell', type=float, default=2e-6)
+    sheets_parser.add_argument('--max-request-mb', type=float, default=10.0, help='request size the fake rejects')
+    sheets_parser.add_argument('--workers', type=int, default=4)
+    sheets_parser.add_argument('--memory', action='store_true', help='also report peak Python memory (slower)')
+
+    sheetsync_parser = subparsers.add_parser('sheetsync', help='full rewrite vs diff sync of a changed tab (fake service)')
+    sheetsync_parser.add_argument('--rows', type=int, default=20000)
+    sheetsync_parser.add_argument('--change-rate', type=float, default=0.01,
+                                  help='share of rows updated, and again of rows deleted and inserted')
+    sheetsync_parser.add_argument('--latency', type=float, default=0.2, help='seconds per request')
+    sheetsync_parser.add_argument('--seconds-per-cell', type=float, default=2e-6)
+
+    quota_parser = subparsers.add_parser('quota', help='unpaced vs scheduled Sheets writes against a per-minute quota (fake clock)')
+    quota_parser.add_argument('--requests', type=int, default=300)
+    quota_parser.add_argument('--per-minute', type=int, default=60)
+    quota_parser.add_argument('--latency', type=float, default=0.2, help='seconds per request')
+    quota_parser.add_argument('--other-load', type=int, default=0,
+                              help='requests already spent from the quota by another process')
+
+    clients_parser = subparsers.add_parser('clients', help='per-call vs cached Google credentials and services (startup time)')
+    clients_parser.add_argument('--reports', type=int, default=12, help='Sheets writes in one process')
+    clients_parser.add_argument('--token-latency', type=float, default=0.2, help='seconds per OAuth token exchange')
+
+    orchestrator_parser = subparsers.add_parser('orchestrator', help='sequential reports vs the in-process DAG on one shared dataset (fake Google services)')
+    orchestrator_parser.add_argument('--records', type=int, default=5000)
+    orchestrator_parser.add_argument('--latency', type=float, default=0.05, help='seconds per Sheets request')
+
+    args = parser.parse_args()
+    if args.benchmark == 'fetch':
+        benchmark_fetch(args.records, args.latency, args.workers, args.max_rps, args.failure_rate)
+    elif args.benchmark == 'scan':
+        benchmark_scan(args.records, args.page_size, args.row_group_size)
+    elif args.benchmark == 'extract':
+        benchmark_extract(args.records)
+    elif args.benchmark == 'duckdb':
+        benchmark_duckdb(args.records)
+    elif args.benchmark == 'flattened':
+        benchmark_flattened(args.records, args.change_rate)
+    elif args.benchmark == 'extracts':
+        benchmark_report_extracts(args.records)
+    elif args.benchmark == 'flags':
+        benchmark_flags(args.rows, args.legacy_max_rows)
+    elif args.benchmark == 'periods':
+        benchmark_periods(args.rows)
+    elif args.benchmark == 'payroll':
+        benchmark_payroll(args.rows, args.legacy_max_rows)
+    elif args.benchmark == 'ledger':
+        benchmark_ledger(args.records, args.change_rate)
+    elif args.benchmark == 'staging':
+        benchmark_staging(args.rows)
+    elif args.benchmark == 'agentaccounts':
+        benchmark_agent_accounts(args.records, args.change_rate)
+    elif args.benchmark == 'stagingstore':
+        benchmark_staging_store(args.records, args.months)
+    elif args.benchmark == 'schemas':
+        benchmark_schemas(args.runs)
+    elif args.benchmark == 'sheets':
+        benchmark_sheets(args.rows, args.latency, args.seconds_per_cell, args.max_request_mb, args.workers,
+                         args.memory)
+    elif args.benchmark == 'sheetsync':
+        benchmark_sheet_sync(args.rows, args.change_rate, args.latency, args.seconds_per_cell)
+    elif args.benchmark == 'quota':
+        benchmark_quota(args.requests, args.per_minute, args.latency, args.other_load)
+    elif args.benchmark == 'clients':
+        benchmark_clients(args.reports, args.token_latency)
+    elif args.benchmark == 'orchestrator':
+        benchmark_orchestrator(args.records, args.latency)
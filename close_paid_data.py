@@ -1,116 +1,44 @@
-import duckdb
-import json
-import os
-from google.auth.transport.requests import Request
-from google.oauth2 import service_account
-from google.oauth2.service_account import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-import gspread
-
+from google_clients import get_service
 import pandas as pd
 from datetime import datetime, timedelta
 import numpy as np
 
+from report_dataset import PropertyDataset
+from report_extracts import extract_report, extract_spec, window_bounds
+
 
-def read_parquet_and_create_google_sheets(parquet_file_path, sheet_name_prefix):
+def read_parquet_and_create_google_sheets(parquet_file_path, sheet_name_prefix, dataset=None, rows=None):
     """
-    Reads data from a Parquet file using DuckDB, filters it based on closing date and contract status,
+    Reads data from a Parquet file, filters it based on closing date and contract status,
     and creates two Google Sheets for the previous month's data.
 
     :param parquet_file_path: Path to the Parquet file.
     :param sheet_name_prefix: Prefix for the Google Sheet names.
+    :param dataset: Already loaded report_dataset.PropertyDataset.
+    :param rows: Rows already extracted for the sheet (e.g. by report_extracts.run_extract_reports).
     :return: IDs of the created Google Sheets.
     """
-    conn = duckdb.connect(database=":memory:")
-
     try:
-        query = f"SELECT * FROM '{parquet_file_path}'"
-        df = conn.execute(query).fetchdf()
-
-        def get_closing_date_and_status(field_values):
-            try:
-                values = json.loads(field_values)
-                closing_date = None
-                status = None
-                for item in values:
-                    if isinstance(item, dict):
-                        if item.get("key") == "closing_date":
-                            closing_date = item.get("value")
-                        elif item.get("key") == "contract_status":
-                            status = item.get("value")
-                return closing_date, status == "CTC - Closed - PAID"
-            except json.JSONDecodeError:
-                pass
-            return None, False
-
-        df["closing_date"], df["is_closed_paid"] = zip(
-            *df["field_values"].apply(get_closing_date_and_status)
-        )
-        df["closing_date"] = pd.to_datetime(df["closing_date"], errors="coerce")
-
-        # Filter for the previous month and closed-paid status
-        today = datetime.now()
-        first_day_of_current_month = today.replace(day=1)
+        # Rows come from the shared extract engine (see report_extracts)
+        filtered_df = rows
+        if filtered_df is None:
+            dataset = dataset or PropertyDataset(parquet_file_path)
+            filtered_df = extract_report(extract_spec("close_paid_data"), dataset)
+        first_day_of_previous_month, first_day_of_current_month = window_bounds("last_month", datetime.now())
         last_day_of_previous_month = first_day_of_current_month - timedelta(days=1)
-        first_day_of_previous_month = last_day_of_previous_month.replace(day=1)
-
-        # List of specific teams to include
-        specific_teams = [
-            "Team Christianna Velazquez",
-            "Team Kimberly Lewis",
-            "Team Stephanie Kleinman",
-            "Team Molly Kelley",
-            "Jenn McKinley",
-            "Team Jenn McKinley",
-        ]
-
-        filtered_df = df[
-            (df["closing_date"] >= first_day_of_previous_month)
-            & (df["closing_date"] <= last_day_of_previous_month)
-            & (df["team_name"].isin(specific_teams))
-        ]
+
         if filtered_df.empty:
             print(
                 "No matching records found for the previous month with closed-paid status."
             )
             return None, None
 
-        # Remove unnecessary columns
-        filtered_df = filtered_df.drop(columns=["field_values"])
-
-        # Convert datetime columns to string
-        for col in filtered_df.select_dtypes(include=["datetime64"]).columns:
-            filtered_df[col] = filtered_df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
-
         # Split the data into two parts
         first_half = filtered_df[pd.to_datetime(filtered_df["closing_date"]).dt.day <= 15]
         second_half = filtered_df[pd.to_datetime(filtered_df["closing_date"]).dt.day > 15]
 
-        # Set up Google Sheets API
-        scope = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive.file",
-        ]
-        creds = None
-
-        # if os.path.exists("token.json"):
-        #     creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-        # if not creds or not creds.valid:
-        #     if creds and creds.expired and creds.refresh_token:
-        #         creds.refresh(Request())
-        #     else:
-        #         flow = InstalledAppFlow.from_client_secrets_file(
-        #             "credentials.json", SCOPES
-        #         )
-        #         creds = flow.run_local_server(port=0)
-        #     with open("token.json", "w") as token:
-        #         token.write(creds.to_json())
-
-        creds = Credentials.from_service_account_file('credentials.json', scopes=scope)
-        # service = gspread.authorize(creds)
-
-        service = build("sheets", "v4", credentials=creds)
+        # Shared, cached Sheets client (see google_clients)
+        service = get_service("sheets", "v4")
 
         # Create and populate the Google Sheets
         month_year = first_day_of_previous_month.strftime("%B %Y")
@@ -123,7 +51,7 @@ def read_parquet_and_create_google_sheets(parquet_file_path, sheet_name_prefix):
             f"{sheet_name_prefix} 16-{last_day_of_previous_month.day} {month_year}",
         )
 
-        drive_service = build('drive', 'v3', credentials=creds)
+        drive_service = get_service("drive", "v3")
 
         # Step 5: Set public sharing permissions for the Google Sheet
         permission_body = {
@@ -148,8 +76,6 @@ def read_parquet_and_create_google_sheets(parquet_file_path, sheet_name_prefix):
     except Exception as e:
         print(f"Error processing data: {e}")
         return None, None
-    finally:
-        conn.close()
 
 
 def create_and_populate_google_sheet(service, data, sheet_name):
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+import duckdb
+import pandas as pd
+
+# setting path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from field_values import flattened_source_folder, query_fields, read_flattened_fields
+
+# Every field_values key read by the summaries in this folder
+SUMMARY_KEYS = [
+    "contract_status",
+    "contract_client_type",
+    "closing_date",
+    "ctc_started_with_empower",
+    "listing_started_with_empower",
+    "listing_paid_date",
+    "compliance_started_with_empower",
+    "compliance_paid_date",
+]
+DATE_KEYS = [
+    "closing_date",
+    "ctc_started_with_empower",
+    "listing_started_with_empower",
+    "listing_paid_date",
+    "compliance_started_with_empower",
+    "compliance_paid_date",
+]
+PROPERTY_COLUMNS = ["id", "created", "team_id", "team_name", "team_user_id", "team_user_name", "agent_id", "agent_name"]
+
+
+class SummaryDataset:
+    """
+    Property rows loaded and parsed once per report run and shared by every summary.
+
+    The Parquet files are scanned once, only the keys in `SUMMARY_KEYS` are pulled out of
+    `field_values` (inside DuckDB), and the date keys are converted with `pd.to_datetime`
+    once, so each summary starts from ready-made columns instead of re-reading and
+    re-parsing the whole dataset. When `parquet_file_path` names the whole dataset of a folder
+    whose flattened table is current (see field_values.write_flattened_dataset), the keys are
+    read from its typed columns instead, without parsing any JSON. `parquet_file_path` may
+    also be the raw properties already loaded for the run (see report_dataset.PropertyDataset),
+    which are then queried in place.
+    """
+
+    def __init__(self, parquet_file_path, keys=SUMMARY_KEYS, date_keys=DATE_KEYS):
+        start_time = time.time()
+        flattened_folder = flattened_source_folder(parquet_file_path)
+        if flattened_folder is not None:
+            self.df = read_flattened_fields(keys, PROPERTY_COLUMNS, flattened_folder)
+        else:
+            conn = duckdb.connect(database=":memory:")
+            try:
+                self.df = query_fields(parquet_file_path, keys, by="key", columns=PROPERTY_COLUMNS, conn=conn)
+            finally:
+                conn.close()
+        for key in date_keys:
+            self.df[key] = pd.to_datetime(self.df[key], errors="coerce")
+        source = parquet_file_path if isinstance(parquet_file_path, str) else "the loaded dataset"
+        if flattened_folder is not None:
+            source += " (flattened table)"
+        print(f"Loaded {len(self.df)} properties from {source} in {time.time() - start_time:.2f} seconds")
+
+    def frame(self):
+        """Returns a shallow copy, so a summary adding columns does not touch the shared rows."""
+        return self.df.copy(deep=False)
+
@@ -0,0 +1,177 @@
+import calendar
+import os
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+# setting path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schemas import CTC_TEAM_LIST, PREFERRED_TEAM_LIST, get_registry
+
+# Windows: how a row's month columns are derived from the monthly counts of its date field
+#   month        - closings (starts, ...) dated in that month
+#   next_month   - those dated in the following month
+#   rest_of_year - those dated in any later month of the year
+WINDOWS = ("month", "next_month", "rest_of_year")
+
+
+@dataclass(frozen=True)
+class SummarySpec:
+    """
+    One row of the daily contract count sheet.
+
+    :param state: Row label.
+    :param date_field: Date key the row is counted by.
+    :param statuses: Contract statuses to count.
+    :param teams: Schema name of the team list to restrict to (schemas.CTC_TEAM_LIST or
+                  schemas.PREFERRED_TEAM_LIST), or None for every team.
+    :param client_type: Contract client type to restrict to, or None.
+    :param window: One of WINDOWS.
+    """
+    state: str
+    date_field: str
+    statuses: tuple
+    teams: str = None
+    client_type: str = None
+    window: str = "month"
+
+
+# Sheet rows, in order. Adding a row here does not add a pass over the data.
+SUMMARY_SPECS = [
+    SummarySpec("CTC - Preferred Started", "ctc_started_with_empower", ("CTC - Preferred - Pending",),
+                PREFERRED_TEAM_LIST),
+    SummarySpec("CTC - Preferred Closing", "closing_date", ("CTC - Preferred - Closed - Ready to BILL",),
+                PREFERRED_TEAM_LIST),
+    SummarySpec("CTC - Started", "ctc_started_with_empower", ("CTC - Pending",), CTC_TEAM_LIST),
+    SummarySpec("CTC - Closing", "closing_date", ("CTC - Closed - PAID",), CTC_TEAM_LIST),
+    SummarySpec("CTC - Terminated", "closing_date", ("CTC - Terminated - No Charge",), CTC_TEAM_LIST),
+    SummarySpec("CTC - Withdrawn", "closing_date", ("CTC - Withdrawn",), CTC_TEAM_LIST),
+    SummarySpec("Client Type-Buyer", "closing_date", ("CTC - Closed - PAID",), CTC_TEAM_LIST, "Buyer"),
+    SummarySpec("Preferred (epique) Buyer Closed", "closing_date", ("CTC - Preferred - Closed - Ready to BILL",),
+                PREFERRED_TEAM_LIST, "Buyer"),
+    SummarySpec("Client Type-Seller", "closing_date", ("CTC - Closed - PAID",), CTC_TEAM_LIST, "Seller"),
+    SummarySpec("Preferred (epique) Seller Closed", "closing_date", ("CTC - Preferred - Closed - Ready to BILL",),
+                PREFERRED_TEAM_LIST, "Seller"),
+    SummarySpec("Listing - Started with Empower", "listing_started_with_empower", ("Listing - Pre-Listing",)),
+    SummarySpec("Listing - Paid", "listing_paid_date", ("Listing - PAID",)),
+    SummarySpec("Compliance - Started with Empower", "compliance_started_with_empower", ("Compliance",)),
+    SummarySpec("Compliance - Paid", "compliance_paid_date", ("Compliance - PAID",)),
+    SummarySpec("All Closing Current Month", "closing_date",
+                ("CTC - Closed - PAID", "CTC - Preferred - Closed - Ready to BILL")),
+    SummarySpec("Future Closing Next Month - Preffered", "closing_date", ("CTC - Preferred - Pending",),
+                PREFERRED_TEAM_LIST, window="next_month"),
+    SummarySpec("Future Closing Next Month - CTC", "closing_date", ("CTC - Pending",), CTC_TEAM_LIST,
+                window="next_month"),
+    SummarySpec("Future Closing All Other Month - Preferred", "closing_date", ("CTC - Preferred - Pending",),
+                PREFERRED_TEAM_LIST, window="rest_of_year"),
+    SummarySpec("Future Closing All Other Month - CTC", "closing_date", ("CTC - Pending",), CTC_TEAM_LIST,
+                window="rest_of_year"),
+]
+
+
+def read_teams(teams):
+    return list(get_registry().columns(teams))
+
+
+def monthly_counts(df, specs, year, teams):
+    """
+    Counts the rows matching each spec per calendar month of `year`, for every spec at once.
+
+    Each distinct status set, team list and client type is matched once, giving one boolean
+    column per spec; the counts are then a single product of that (rows x specs) matrix with
+    a one-hot (rows x 12) month matrix per date field.
+
+    :param df: Rows from SummaryDataset.
+    :param specs: List of SummarySpec.
+    :param year: Calendar year to count.
+    :param teams: Dictionary of team list schema name to its team names.
+    :return: numpy array of shape (len(specs), 12); column 0 is January.
+    """
+    start_time = time.time()
+    masks = {}
+
+    def mask(name, build):
+        if name not in masks:
+            masks[name] = build()
+        return masks[name]
+
+    spec_masks = np.ones((len(df), len(specs)), dtype=np.int64)
+    for index, spec in enumerate(specs):
+        spec_masks[:, index] &= mask(
+            ("status", spec.statuses), lambda: df["contract_status"].isin(spec.statuses).to_numpy()
+        )
+        if spec.teams:
+            spec_masks[:, index] &= mask(
+                ("teams", spec.teams), lambda: df["team_name"].isin(teams[spec.teams]).to_numpy()
+            )
+        if spec.client_type:
+            spec_masks[:, index] &= mask(
+                ("client_type", spec.client_type), lambda: (df["contract_client_type"] == spec.client_type).to_numpy()
+            )
+
+    print(f"Summary filters took {time.time() - start_time:.3f} seconds ({len(masks)} distinct)")
+
+    by_date_field = defaultdict(list)
+    for index, spec in enumerate(specs):
+        by_date_field[spec.date_field].append(index)
+
+    counts = np.zeros((len(specs), 12), dtype=np.int64)
+    for date_field, indices in by_date_field.items():
+        count_start_time = time.time()
+        dates = df[date_field]
+        in_year = (dates.dt.year == year).to_numpy()
+        months = np.zeros((len(df), 12), dtype=np.int64)
+        months[np.flatnonzero(in_year), dates.dt.month.to_numpy()[in_year].astype(int) - 1] = 1
+        counts[indices] = spec_masks[:, indices].T @ months
+        states = ", ".join(specs[index].state for index in indices)
+        print(f"{date_field} counts took {time.time() - count_start_time:.3f} seconds ({states})")
+    return counts
+
+
+def compute_summaries(df, specs=SUMMARY_SPECS, today=None):
+    """
+    Builds every summary row from one grouped count over `df`.
+
+    :param df: Rows from SummaryDataset.
+    :param specs: List of SummarySpec, in output order.
+    :param today: Reference date (defaults to now); rows cover January to its month.
+    :return: List of dictionaries ({"state": ..., "Jan <year>": count, ...}).
+    """
+    today = today or datetime.now()
+    current_year, current_month = today.year, today.month
+    for spec in specs:
+        if spec.window not in WINDOWS:
+            raise ValueError(f"Unknown window {spec.window!r} for {spec.state!r}")
+
+    # Rows whose team list cannot be read are left out, as a failed summary was before
+    start_time = time.time()
+    teams = {}
+    for name in dict.fromkeys(spec.teams for spec in specs if spec.teams):
+        try:
+            teams[name] = read_teams(name)
+        except OSError as e:
+            print(f"Error processing data: {e}")
+    specs = [spec for spec in specs if not spec.teams or spec.teams in teams]
+    print(f"read_teams() took {time.time() - start_time:.3f} seconds")
+
+    counts = monthly_counts(df, specs, current_year, teams)
+    # Counts dated after each month, summed from December backwards
+    later = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1] - counts
+
+    summaries = []
+    for index, spec in enumerate(specs):
+        summary = {"state": spec.state}
+        for month in range(1, current_month + 1):
+            if spec.window == "month":
+                count = counts[index, month - 1]
+            elif spec.window == "next_month":
+                count = counts[index, month] if month < 12 else 0
+            else:
+                count = later[index, month - 1]
+            summary[f"{calendar.month_abbr[month]} {current_year}"] = int(count)
+        summaries.append(summary)
+    return summaries
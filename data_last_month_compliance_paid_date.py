@@ -1,95 +1,38 @@
-import duckdb
-import json
-import os
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-import pandas as pd
-from datetime import datetime
+from google_clients import DRIVE_SCOPES, get_service
 import numpy as np
 
+from report_dataset import PropertyDataset
+from report_extracts import extract_report, extract_spec
 
-def read_parquet_and_create_google_sheets(parquet_file_path, sheet_name):
+
+def read_parquet_and_create_google_sheets(parquet_file_path, sheet_name, dataset=None, rows=None):
     """
-    Reads data from a Parquet file using DuckDB, filters it based on compliance_paid_date for the last month,
+    Reads data from a Parquet file, filters it based on compliance_paid_date for the last month,
     and creates a Google Sheet in the OTC folder.
 
     :param parquet_file_path: Path to the Parquet file.
     :param sheet_name: Name for the Google Sheet.
+    :param dataset: Already loaded report_dataset.PropertyDataset.
+    :param rows: Rows already extracted for the sheet (e.g. by report_extracts.run_extract_reports).
     :return: ID of the created Google Sheet.
     """
-    conn = duckdb.connect(database=":memory:")
-
     try:
-        query = f"SELECT * FROM '{parquet_file_path}'"
-        df = conn.execute(query).fetchdf()
-
-        def get_compliance_paid_date(field_values):
-            try:
-                values = json.loads(field_values)
-                for item in values:
-                    if (
-                        isinstance(item, dict)
-                        and item.get("key") == "compliance_paid_date"
-                    ):
-                        return item.get("value")
-            except json.JSONDecodeError:
-                pass
-            return None
-
-        df["compliance_paid_date"] = df["field_values"].apply(get_compliance_paid_date)
-        df["compliance_paid_date"] = pd.to_datetime(
-            df["compliance_paid_date"], errors="coerce"
-        )
-
-        # Filter for last month only
-        today = datetime.now()
-        first_day_of_current_month = today.replace(day=1)
-        last_day_of_last_month = first_day_of_current_month - pd.Timedelta(days=1)
-        first_day_of_last_month = last_day_of_last_month.replace(day=1)
-
-        filtered_df = df[
-            (df["compliance_paid_date"] >= first_day_of_last_month)
-            & (df["compliance_paid_date"] <= last_day_of_last_month)
-        ]
+        # Rows come from the shared extract engine (see report_extracts)
+        filtered_df = rows
+        if filtered_df is None:
+            dataset = dataset or PropertyDataset(parquet_file_path)
+            filtered_df = extract_report(extract_spec("data_last_month_compliance_paid_date"), dataset)
 
         if filtered_df.empty:
             print("No matching records found for last month's compliance paid dates.")
             return None
 
-        # Remove unnecessary columns
-        filtered_df = filtered_df.drop(columns=["field_values"])
-
-        # Convert datetime columns to string
-        for col in filtered_df.select_dtypes(include=["datetime64"]).columns:
-            filtered_df[col] = filtered_df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
-
-        # Set up Google Sheets API
-        SCOPES = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive.file",
-            "https://www.googleapis.com/auth/drive",
-        ]
-        creds = None
-        if os.path.exists("token.json"):
-            creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    "credentials.json", SCOPES
-                )
-                creds = flow.run_local_server(port=0)
-            with open("token.json", "w") as token:
-                token.write(creds.to_json())
-
-        service = build("sheets", "v4", credentials=creds)
+        # Shared, cached Sheets client (see google_clients)
+        service = get_service("sheets", "v4", DRIVE_SCOPES)
 
         # Create and populate the Google Sheet
         sheet_id = create_and_populate_google_sheet(
-            service, filtered_df, sheet_name, creds
+            service, filtered_df, sheet_name
         )
         print(f"Google Sheet created with ID: {sheet_id}")
 
@@ -98,18 +41,15 @@ def read_parquet_and_create_google_sheets(parquet_file_path, sheet_name):
     except Exception as e:
         print(f"Error processing data: {e}")
         return None
-    finally:
-        conn.close()
 
 
-def create_and_populate_google_sheet(service, data, sheet_name, creds):
+def create_and_populate_google_sheet(service, data, sheet_name):
     """
     Creates a new Google Sheet, populates it with data, and moves it to the "OTC" folder.
 
     :param service: Google Sheets API service object.
     :param data: Pandas DataFrame containing the data to be added to the sheet.
     :param sheet_name: Name for the new Google Sheet.
-    :param creds: Credentials object for Google APIs.
     :return: ID of the created Google Sheet.
     """
     try:
@@ -139,7 +79,7 @@ def create_and_populate_google_sheet(service, data, sheet_name, creds):
         ).execute()
 
         # Move the spreadsheet to the "OTC" folder
-        drive_service = build("drive", "v3", credentials=creds)
+        drive_service = get_service("drive", "v3", DRIVE_SCOPES)
 
         # Find the "OTC" folder
         folder_name = "OTC"
@@ -1,217 +1,258 @@
 import duckdb
-import csv
+import os
+import re
+import time
+import numpy as np
 import pandas as pd
-import json
 from gsheetapi import *
 from datetime import datetime
 
-na_filler = datetime(1899, 12, 30)
-
-
-def correcting_ba_amount(df):
-    # Create a copy to avoid modifying the original DataFrame
-    df = df.copy()
-
-    # Conditions for Billing Amount replacement
-    billing_amount_blank = (pd.isna(df['Billing Amount'])) | (df['Billing Amount'] == 0) | (df['Billing Amount'] == '')
-
-    # Replace with Other Amount if available
-    other_amount_valid = (pd.notna(df['Other Amount'])) & (df['Other Amount'] != 0) & (df['Other Amount'] != '')
-    df.loc[billing_amount_blank & other_amount_valid, 'Billing Amount'] = df.loc[billing_amount_blank & other_amount_valid, 'Other Amount']
-
-    # Fill remaining blank rows based on Preferred Ai CTC
-    remaining_blank = billing_amount_blank & ~other_amount_valid
-    df.loc[remaining_blank & (df['Preferred  Ai  CTC'] == 'Yes'), 'Billing Amount'] = 99.00
-    df.loc[remaining_blank & (df['Preferred  Ai  CTC'] != 'Yes'), 'Billing Amount'] = 400.00
-
-    return df['Billing Amount'].to_list()
-
-
-def extract_field_values(field_values, key):
-    try:
-        values = json.loads(field_values)
-        for item in values:
-            if isinstance(item, dict) and item.get("label") == key:
-                return item.get("value")
-    except json.JSONDecodeError:
-        pass
-    return None
-
-
-def extract_field_values_batch(field_values, schema):
-    values = json.loads(field_values)
-    result = {key: None for key in schema}
-    for item in values:
-        if isinstance(item, dict) and "label" in item and "value" in item:
-            if item["label"] in schema:
-                result[item["label"]] = item["value"]
-
-    return result
+from field_values import extract_fields
+from schemas import AGENT_ACCOUNT_SOURCE, TRANSACTION_SOURCE, get_registry, observed_labels
+from staging_store import STAGING_TABLES, monthly_staging_summary, save_staging_tables
 
+na_filler = datetime(1899, 12, 30)
 
-def create_staging_layer(properties_file_path):
+# Transactions whose Contract Title contains any of these words (in any case) are left out
+EXCLUDED_TITLE_WORDS = ('test', 'training', 'delete')
+# Matched against the lowercased title: re.IGNORECASE makes CPython's matcher about twice as slow
+EXCLUDED_TITLE_PATTERN = re.compile('|'.join(re.escape(word) for word in EXCLUDED_TITLE_WORDS))
+# A transaction with none of these dates never started with Empower
+STARTED_WITH_EMPOWER_COLUMNS = ['CTC Started with Empower', 'Listing Started with Empower',
+                                'Offer Started with Empower', 'Compliance Started with Empower']
+# Statuses of transactions that did not close: their Closing date is cleared
+NOT_CLOSED_STATUSES = (
+    'Compliance - PAID',
+    'Compliance - Ready to BILL',
+    'CTC - Preferred - Terminated - No Change',
+    'CTC - Terminated - No Change',
+    'CTC - Preferred - Withdrawn',
+    'CTC - Withdrawn',
+    'Listing - PAID',
+    'Listing - Pre-Listing',
+)
+# Listing columns cleared on CTC transactions (since 2021) that also carry a listing start
+LISTING_COLUMNS = ['Listing Started with Empower', 'Live on MLS Date', 'Listing PAID Date']
+# Billing Amount of a closed transaction billed without an amount, by its Preferred  Ai  CTC value
+PREFERRED_BILLING_AMOUNT = 99.00
+DEFAULT_BILLING_AMOUNT = 400.00
+
+
+# Top-level property columns carried into the source report, and their names there
+SOURCE_COLUMNS = {'timezone': 'Time Zone', 'team_name': 'Team', 'team_user_name': 'Team User',
+                  'created': 'Date Created', 'agent_name': 'Created By'}
+# Properties with this Contract Status are agent accounts, not transactions
+AGENT_ACCOUNT_STATUS = 'AGENT ACCOUNT'
+# Agent-account columns joined onto each transaction by its Empower Agent Name
+AGENT_ACCOUNT_JOIN_COLUMNS = ['1st Transaction Date', 'Reassigned Date', 'Brokerage', 'Agent Provided by']
+
+INDEX_FOLDER = 'datas'
+# Latest agent-account record per Contract Title: the lookup transactions are joined on
+AGENT_ACCOUNT_INDEX_FILE = 'agent_account_index.parquet'
+# Every agent-account property, with the md5 of its field_values
+AGENT_ACCOUNT_ROWS_FILE = '_agent_account_rows.parquet'
+
+
+def latest_by_title(rows):
+    """Newest record (by Date Created, then id) per Contract Title, newest first."""
+    rows = rows.sort_values(['Date Created', 'id'], ascending=False, kind='mergesort')
+    return rows.drop_duplicates('Contract Title', keep='first')
+
+
+def load_agent_account_index(folder=INDEX_FOLDER):
+    """
+    Reads the persisted agent-account index.
+
+    :param folder: Index folder.
+    :return: (latest, rows) DataFrames, or (None, None) when no index has been built yet.
+    """
+    index_path = os.path.join(folder, AGENT_ACCOUNT_INDEX_FILE)
+    rows_path = os.path.join(folder, AGENT_ACCOUNT_ROWS_FILE)
+    if not (os.path.exists(index_path) and os.path.exists(rows_path)):
+        return None, None
+    return pd.read_parquet(index_path), pd.read_parquet(rows_path)
+
+
+def save_agent_account_index(latest, rows, folder=INDEX_FOLDER):
+    """Writes the index and its rows atomically."""
+    os.makedirs(folder, exist_ok=True)
+    for frame, filename in ((latest, AGENT_ACCOUNT_INDEX_FILE), (rows, AGENT_ACCOUNT_ROWS_FILE)):
+        path = os.path.join(folder, filename)
+        frame.to_parquet(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+
+
+def update_agent_account_index(agent_account_rows, folder=INDEX_FOLDER, full=False):
+    """
+    Brings the persisted agent-account index up to date with the current agent accounts.
+
+    Properties are matched to the index rows by id and the md5 of their field_values. Only the
+    titles of new, changed and removed agent accounts are re-ranked; every other title keeps
+    its latest record from the index, so the sort and deduplication do not go over all history.
+    Property ids are assumed unique, as in the property store.
+
+    :param agent_account_rows: Every current agent account: id, row_hash and the source report columns.
+    :param folder: Index folder.
+    :param full: Ignore the persisted index and rebuild it.
+    :return: (latest, duplicates): the latest record per Contract Title and the older records,
+             both newest first.
+    """
+    start_time = time.time()
+    latest, rows = (None, None) if full else load_agent_account_index(folder)
+    if latest is None or list(rows.columns) != list(agent_account_rows.columns):
+        # First run, or the schema changed: rank every title
+        rows = agent_account_rows.iloc[:0]
+        latest = rows
+        known = pd.Series(dtype=object)
+    else:
+        known = rows.set_index('id')['row_hash']
+
+    current_hashes = agent_account_rows.set_index('id')['row_hash']
+    changed = agent_account_rows[current_hashes.ne(known.reindex(current_hashes.index)).to_numpy()]
+    removed_ids = known.index[~known.index.isin(current_hashes.index)]
+
+    if len(changed) or len(removed_ids) or full:
+        stale = rows['id'].isin(changed['id']) | rows['id'].isin(removed_ids)
+        touched = pd.concat([rows.loc[stale, 'Contract Title'], changed['Contract Title']]).unique()
+        rows = pd.concat([rows[~stale], changed], ignore_index=True)
+        reranked = latest_by_title(rows[rows['Contract Title'].isin(touched)])
+        latest = pd.concat([latest[~latest['Contract Title'].isin(touched)], reranked])
+        latest = latest.sort_values(['Date Created', 'id'], ascending=False, kind='mergesort', ignore_index=True)
+        save_agent_account_index(latest, rows, folder)
+
+    duplicates = rows[~rows['id'].isin(latest['id'])]
+    duplicates = duplicates.sort_values(['Date Created', 'id'], ascending=False, kind='mergesort', ignore_index=True)
+    print(f"Agent-account index: {len(changed)} of {len(agent_account_rows)} agent accounts new or changed, "
+          f"{len(removed_ids)} removed, {len(latest)} titles in {time.time() - start_time:.2f} seconds")
+    return latest, duplicates
+
+
+def is_blank(series):
+    return pd.isna(series) | (series == '')
+
+
+def excluded_titles(titles):
+    """Boolean array, True where a Contract Title contains an EXCLUDED_TITLE_WORDS word; one scan, missing titles kept."""
+    search = EXCLUDED_TITLE_PATTERN.search
+    return np.fromiter((isinstance(title, str) and search(title.lower()) is not None for title in titles),
+                       dtype=bool, count=len(titles))
+
+
+def apply_staging_rules(transaction_df):
+    """
+    Drops the transactions left out of the source report and applies its corrections.
+
+    Left out: titles containing an EXCLUDED_TITLE_WORDS word, and transactions without a TC
+    or agent name that never started with Empower. Corrected: the Closing date of
+    NOT_CLOSED_STATUSES, the listing columns of CTC transactions started since 2021, Contract
+    Status from Billing Status, and the Billing Amount of closed transactions billed without
+    one (Other Amount, else 99 for Preferred Ai CTC, else 400).
+
+    All exclusions are one mask over the formatted frame (one regex scan of the titles), the
+    kept rows are selected once, and each correction mask is computed once and written in place.
+
+    :param transaction_df: Formatted transactions (date columns filled with na_filler).
+    :return: The kept transactions, with their index labels.
+    """
+    not_started = (transaction_df[STARTED_WITH_EMPOWER_COLUMNS] == na_filler).all(axis=1)
+    excluded = (
+        excluded_titles(transaction_df['Contract Title'])
+        | ((is_blank(transaction_df['Empower TC Name']) | is_blank(transaction_df['Empower Agent Name'])) & not_started)
+    )
+    transaction_df = transaction_df.take(np.flatnonzero(~excluded))
+
+    transaction_df.loc[transaction_df['Contract Status'].isin(NOT_CLOSED_STATUSES), 'Closing'] = na_filler
+
+    listing_on_ctc = ((transaction_df['CTC Started with Empower'].dt.year >= 2021)
+                      & (transaction_df['Listing Started with Empower'].dt.year >= 2021))
+    transaction_df.loc[listing_on_ctc, LISTING_COLUMNS] = na_filler
+    transaction_df.loc[listing_on_ctc, 'Listing PAID Amount'] = 0
+
+    billed = transaction_df['Billing Status'] != 'none'
+    transaction_df.loc[billed, 'Contract Status'] = transaction_df.loc[billed, 'Billing Status']
+
+    billing_amount = transaction_df['Billing Amount']
+    other_amount = transaction_df['Other Amount']
+    missing_amount = (is_blank(billing_amount) | (billing_amount == 0)) & (transaction_df['Closing'] != na_filler)
+    other_amount_valid = ~(is_blank(other_amount) | (other_amount == 0))
+    preferred = transaction_df['Preferred  Ai  CTC'] == 'Yes'
+    transaction_df.loc[missing_amount & other_amount_valid, 'Billing Amount'] = other_amount[missing_amount & other_amount_valid]
+    transaction_df.loc[missing_amount & ~other_amount_valid & preferred, 'Billing Amount'] = PREFERRED_BILLING_AMOUNT
+    transaction_df.loc[missing_amount & ~other_amount_valid & ~preferred, 'Billing Amount'] = DEFAULT_BILLING_AMOUNT
+    return transaction_df
+
+
+def create_staging_layer(properties_file_path, index_folder=INDEX_FOLDER, full_index=False, validate_schemas=False):
+    """
+    Builds the source report tables from the raw property dataset.
+
+    :param properties_file_path: Parquet path or glob of the raw property dataset.
+    :param index_folder: Folder of the persisted agent-account index.
+    :param full_index: Rebuild the agent-account index from every agent account.
+    :param validate_schemas: Also check the label lists against the labels of the dataset (an extra
+                             JSON pass in DuckDB; see schemas.SchemaRegistry.validate).
+    :return: (transaction_df, error_df, agent_account_df, duplicated_agent_account_df), or None on error.
+    """
     print('Extracting source report...')
     conn = duckdb.connect(database=":memory:")
     try:
-        query = f"SELECT * FROM read_parquet('{properties_file_path}')"
+        # The hash of each document tells the agent-account index which properties changed
+        query = f"SELECT *, md5(field_values) AS row_hash FROM read_parquet('{properties_file_path}')"
         df = conn.execute(query).fetchdf()
 
-        with open('Columns_Transaction_Source.csv') as file:
-            rows = csv.reader(file)
-            transaction_schema = [row[0] for row in rows]
+        registry = get_registry()
+        if validate_schemas:
+            registry.validate(observed_labels(df, conn), names=(TRANSACTION_SOURCE, AGENT_ACCOUNT_SOURCE))
+        # The source columns come from the property itself, not from field_values
+        transaction_schema = [column for column in registry.columns(TRANSACTION_SOURCE)
+                              if column not in SOURCE_COLUMNS.values()]
+        agent_account_schema = list(registry.columns(AGENT_ACCOUNT_SOURCE))
 
-        intermediate_trx_data = df['field_values'].map(lambda x: extract_field_values_batch(x, transaction_schema))
-        intermediate_df = pd.DataFrame(intermediate_trx_data.tolist(), columns=transaction_schema)
-        transaction_df = df[['timezone', 'team_name', 'team_user_name', 'created', 'agent_name']].copy()
-        transaction_df.rename({'timezone': 'Time Zone', 'team_name': 'Team', 'team_user_name': 'Team User', 'created': 'Date Created', 'agent_name': 'Created By'}, axis=1, inplace=True)
-        transaction_df = pd.concat([transaction_df, intermediate_df], axis=1)
-        transaction_df = transaction_df[transaction_df['Contract Status'] != 'AGENT ACCOUNT']
+        # One parse of every document for both tables, split on Contract Status
+        parsed = extract_fields(df['field_values'], transaction_schema + agent_account_schema)
+        source_df = df[list(SOURCE_COLUMNS)].rename(columns=SOURCE_COLUMNS)
+        is_agent_account = (parsed['Contract Status'] == AGENT_ACCOUNT_STATUS).to_numpy()
+
+        transaction_df = pd.concat([source_df[~is_agent_account], parsed.loc[~is_agent_account, transaction_schema]], axis=1)
         transaction_df['Date Created'] = pd.to_datetime(transaction_df['Date Created'])
         transaction_df.sort_values('Date Created', inplace=True, ignore_index=True, ascending=False)
 
-        agent_account_schema = list()
-        with open('Columns_Agent_Account_Source.csv') as file:
-            rows = csv.reader(file)
-            for row in rows:
-                agent_account_schema.append(row[0])
-
-        intermediate_aa_data = df['field_values'].map(lambda x: extract_field_values_batch(x, agent_account_schema))
-        intermediate_aa_df = pd.DataFrame(intermediate_aa_data.tolist(), columns=agent_account_schema)
-        agent_account_df = df[['timezone', 'team_name', 'team_user_name', 'created', 'agent_name']].copy()
-        agent_account_df.rename({'timezone': 'Time Zone', 'team_name': 'Team', 'team_user_name': 'Team User', 'created': 'Date Created', 'agent_name': 'Created By'}, axis=1, inplace=True)
-        agent_account_df = pd.concat([agent_account_df, intermediate_aa_df], axis=1)
-        agent_account_df = agent_account_df[agent_account_df['Contract Status'] == 'AGENT ACCOUNT']
-        agent_account_df['Date Created'] = pd.to_datetime(agent_account_df['Date Created'])
-        agent_account_df.sort_values('Date Created', inplace=True, ignore_index=True, ascending=False)
-        duplicated_agent_account_df = agent_account_df[agent_account_df.duplicated('Contract Title', keep='first')].copy()
-        agent_account_df.drop_duplicates('Contract Title', keep='first', inplace=True, ignore_index=True)
-
-        # Join Transaction with Agent Account
-        transaction_df = transaction_df.merge(agent_account_df[['Contract Title', '1st Transaction Date', 'Reassigned Date', 'Brokerage', 'Agent Provided by']], how='left', left_on='Empower Agent Name', right_on='Contract Title', indicator=True)
-        transaction_df.rename({'Contract Title_x': 'Contract Title'}, inplace=True, axis=1)
-        transaction_df.drop(columns='Contract Title_y', inplace=True)
-
-        error_df = transaction_df[transaction_df['_merge'] == 'left_only']
-        error_df.drop(columns='_merge', inplace=True)
-
-        transaction_df = transaction_df[transaction_df['_merge'] == 'both']
-        transaction_df.drop(columns='_merge', inplace=True)
+        agent_account_rows = pd.concat([df.loc[is_agent_account, ['id', 'row_hash']], source_df[is_agent_account],
+                                        parsed.loc[is_agent_account, agent_account_schema]], axis=1)
+        agent_account_rows['Date Created'] = pd.to_datetime(agent_account_rows['Date Created'])
+        agent_account_df, duplicated_agent_account_df = update_agent_account_index(agent_account_rows, index_folder,
+                                                                                   full_index)
+        agent_account_df = agent_account_df.drop(columns=['id', 'row_hash'])
+        duplicated_agent_account_df = duplicated_agent_account_df.drop(columns=['id', 'row_hash'])
+
+        # Join Transaction with Agent Account: a hash lookup of each agent in the latest records by title
+        positions = pd.Index(agent_account_df['Contract Title']).get_indexer(transaction_df['Empower Agent Name'])
+        for column in AGENT_ACCOUNT_JOIN_COLUMNS:
+            # Position -1 (no agent account) picks the NaN appended after the values
+            transaction_df[column] = np.append(agent_account_df[column].to_numpy(dtype=object), np.nan)[positions]
+        matched = positions >= 0
+        error_df = transaction_df[~matched]
+        transaction_df = transaction_df[matched]
 
         # Formating
-        with open('trx_order.csv') as file:
-            rows = csv.reader(file)
-            trx_order_columns = [row[0] for row in rows]
+        column_specs = registry.transaction_columns()
+        trx_order_columns = [spec.name for spec in column_specs]
         transaction_df = transaction_df[trx_order_columns]
 
-        with open('trx_date_columns.csv') as file:
-            rows = csv.reader(file)
-            trx_date_columns = [row[0] for row in rows]
+        trx_date_columns = [spec.name for spec in column_specs if spec.kind == 'date']
         transaction_df[trx_date_columns] = transaction_df[trx_date_columns].astype('datetime64[ns]')
         transaction_df[trx_date_columns] = transaction_df[trx_date_columns].fillna(na_filler)
 
-        with open('trx_columns_need_fillna_0.csv') as file:
-            rows = csv.reader(file)
-            trx_columns_need_fillna_0 = [row[0] for row in rows]
-
-        with open('trx_columns_need_fillna_none.csv') as file:
-            rows = csv.reader(file)
-            trx_columns_need_fillna_none = [row[0] for row in rows]
+        trx_columns_need_fillna_0 = [spec.name for spec in column_specs if spec.fill == 0]
+        trx_columns_need_fillna_none = [spec.name for spec in column_specs if spec.fill == 'none']
 
         transaction_df[trx_columns_need_fillna_0] = transaction_df[trx_columns_need_fillna_0].fillna(0)
         transaction_df[trx_columns_need_fillna_0] = transaction_df[trx_columns_need_fillna_0].replace('', 0)
         transaction_df[trx_columns_need_fillna_none] = transaction_df[trx_columns_need_fillna_none].fillna('none')
         transaction_df[trx_columns_need_fillna_none] = transaction_df[trx_columns_need_fillna_none].replace('', 'none')
 
-        # Filtering
-        transaction_df.drop(
-            transaction_df[
-                transaction_df['Contract Title'].str.lower().str.contains('test')
-            ].index,
-            axis=0,
-            inplace=True
-        )
-
-        transaction_df.drop(
-            transaction_df[
-                transaction_df['Contract Title'].str.lower().str.contains('training')
-            ].index,
-            axis=0,
-            inplace=True
-        )
-
-        transaction_df.drop(
-            transaction_df[
-                transaction_df['Contract Title'].str.lower().str.contains('delete')
-            ].index,
-            axis=0,
-            inplace=True
-        )
-
-        transaction_df.drop(
-            transaction_df[
-                ((pd.isna(transaction_df['Empower TC Name'])) | (transaction_df['Empower TC Name'] == '')) & (transaction_df['CTC Started with Empower'] == na_filler) & (transaction_df['Listing Started with Empower'] == na_filler) & (transaction_df['Offer Started with Empower'] == na_filler) & (transaction_df['Compliance Started with Empower'] == na_filler)].index,
-            axis=0,
-            inplace=True
-        )
-
-        transaction_df.drop(
-            transaction_df[
-                ((pd.isna(transaction_df['Empower Agent Name'])) | (transaction_df['Empower Agent Name'] == '')) & (transaction_df['CTC Started with Empower'] == na_filler) & (transaction_df['Listing Started with Empower'] == na_filler) & (transaction_df['Offer Started with Empower'] == na_filler) & (transaction_df['Compliance Started with Empower'] == na_filler)].index,
-            axis=0,
-            inplace=True
-        )
-
-        # Correction
-        transaction_df.loc[
-            transaction_df[(
-                transaction_df['Contract Status'].isin([
-                    'Compliance - PAID',
-                    'Compliance - Ready to BILL',
-                    'CTC - Preferred - Terminated - No Change',
-                    'CTC - Terminated - No Change',
-                    'CTC - Preferred - Withdrawn',
-                    'CTC - Withdrawn',
-                    'Listing - PAID',
-                    'Listing - Pre-Listing',
-                ])
-            )].index,
-            'Closing'
-        ] = na_filler
-
-        print(transaction_df['CTC Started with Empower'].dtype)
-
-        transaction_df.loc[
-            transaction_df[
-                (transaction_df['CTC Started with Empower'].dt.year >= 2021) & (transaction_df['Listing Started with Empower'].dt.year >= 2021)
-            ].index,
-            ['Listing Started with Empower', 'Live on MLS Date', 'Listing PAID Date']
-        ] = na_filler
-
-        transaction_df.loc[
-            transaction_df[
-                (transaction_df['CTC Started with Empower'].dt.year >= 2021) & (transaction_df['Listing Started with Empower'].dt.year >= 2021)
-            ].index,
-            'Listing PAID Amount'
-        ] = 0
-
-        billing_status_list = transaction_df.loc[
-            transaction_df['Billing Status'] != 'none',
-            'Billing Status'].to_list()
-        transaction_df.loc[
-            transaction_df['Billing Status'] != 'none',
-            'Contract Status'] = billing_status_list
-
-        ba_amount_correction = transaction_df.loc[
-            ((transaction_df['Billing Amount'] == 0) | (pd.isna(transaction_df['Billing Amount'])) | (transaction_df['Billing Amount'] == '')) & (transaction_df['Closing'] != na_filler),
-            ['Billing Amount', 'Other Amount', 'Preferred  Ai  CTC']
-        ]
-
-        corrected_ba_amount = correcting_ba_amount(ba_amount_correction)
-
-        transaction_df.loc[
-            ((transaction_df['Billing Amount'] == 0) | (pd.isna(transaction_df['Billing Amount'])) | (transaction_df['Billing Amount'] == '')) & (transaction_df['Closing'] != na_filler),
-            'Billing Amount'
-        ] = corrected_ba_amount
+        # Filtering and corrections
+        transaction_df = apply_staging_rules(transaction_df)
 
         return transaction_df, error_df, agent_account_df, duplicated_agent_account_df
 
@@ -224,10 +265,18 @@ def create_staging_layer(properties_file_path):
 
 
 if __name__ == '__main__':
-    transaction_df, error_df, agent_account_df, duplicated_agent_account_df = create_staging_layer('datas/all_properties_*.parquet')
+    tables = create_staging_layer('datas/all_properties_*.parquet')
+    transaction_df, error_df, agent_account_df, duplicated_agent_account_df = tables
+
+    # Typed copy of the tables for local queries (see staging_store.read_staging_table)
+    save_staging_tables(dict(zip(STAGING_TABLES, tables)))
 
     dataframes = [transaction_df, error_df, agent_account_df, duplicated_agent_account_df]
     sheet_titles = ["Transaction", "Error Transaction", "Agent Account", "Duplicated Agent Account"]
+
+    # Row counts and billing per month of Date Created, read back from the store
+    dataframes.append(monthly_staging_summary())
+    sheet_titles.append("Monthly Summary")
     spreadsheet_name = "Source Report"
     spreadsheet_id = "1NFgo4enM06OiEEaY9bNe6E3e1O-O_xXI2cvAejpFC9A"
 
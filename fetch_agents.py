@@ -1,33 +1,19 @@
-import requests
-import urllib.parse
 import json
 import pyarrow as pa
 import pyarrow.parquet as pq
 import pandas as pd
 from dotenv import load_dotenv
 import os
+from otc_client import API_ROOT, get_client
 
 load_dotenv()
 
 
-def fetch_agents(api_token, limit=50, offset=0):
-    base_url = "https://api.opentoclose.com/v1/agents"
-
-    # URL encode the parameters
+def fetch_agents(api_token, limit=50, offset=0, client=None):
+    client = client or get_client()
     params = {"api_token": api_token, "limit": limit, "offset": offset}
-    encoded_params = urllib.parse.urlencode(params)
-
-    url = f"{base_url}?{encoded_params}"
-
-    headers = {"Accept": "application/json"}
-
-    response = requests.get(url, headers=headers)
 
-    if response.status_code != 200:
-        print(f"Error: API request failed with status code {response.status_code}")
-        return None
-
-    return response.json()
+    return client.get_json(f"{API_ROOT}/agents", params=params)
 
 
 def fetch_all_agents(api_token):
@@ -38,9 +24,6 @@ def fetch_all_agents(api_token):
     while True:
         data = fetch_agents(api_token, limit, offset)
         print(f"Fetching data: limit={limit}, offset={offset}")
-        if data is None:
-            break
-
         all_properties.extend(data)
 
         if len(data) < limit:
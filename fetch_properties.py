@@ -1,123 +1,281 @@
-import requests
-import urllib.parse
-import json
-import pyarrow as pa
 import pyarrow.parquet as pq
 from dotenv import load_dotenv
 import os
-import pandas as pd
 import time
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from field_values import FLATTENED_FILE, update_flattened_dataset, write_flattened_dataset
+from otc_client import API_ROOT, RateLimiter, get_client
+from property_store import (
+    DATA_FOLDER, DEFAULT_ROW_GROUP_SIZE, SCHEMA, DatasetWriter, content_hash, dataset_files,
+    full_sync_due, load_manifest, load_sync_state, records_to_table, replace_dataset, save_manifest,
+    save_sync_state,
+)
 
 load_dotenv()
 
-# Define a consistent schema
-SCHEMA = pa.schema([
-    ("id", pa.int64()),
-    ("created", pa.string()),
-    ("timezone", pa.string()),
-    ("field_values", pa.string()),
-    ("team_id", pa.int64()),
-    ("team_name", pa.string()),
-    ("team_user_id", pa.int64()),
-    ("team_user_name", pa.string()),
-    ("agent_id", pa.int64()),  # Force `agent_id` to be int64
-    ("agent_name", pa.string()),
-    ("brokerage", pa.string()),
-    ("api_data", pa.string()),
-    ("inbound_email_address", pa.string()),
-])
-
-
-def fetch_properties(api_token, limit=50, offset=0):
-    base_url = "https://api.opentoclose.com/v1/properties"
+BASE_URL = f"{API_ROOT}/properties"
+
+
+def fetch_properties(api_token, limit=50, offset=0, base_url=BASE_URL, client=None):
+    # Failures that survive the client's retries raise OTCAPIError instead of returning
+    # None, so a crawl can no longer mistake an error for the end of the data
+    client = client or get_client()
     params = {"api_token": api_token, "limit": limit, "offset": offset}
-    encoded_params = urllib.parse.urlencode(params)
-    url = f"{base_url}?{encoded_params}"
-    headers = {"Accept": "application/json"}
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        print(f"Error: API request failed with status code {response.status_code}")
-        return None
-    return response.json()
+    return client.get_json(base_url, params=params)
 
 
-def save_to_parquet_in_chunks(data_chunk, filename_prefix):
+def save_to_parquet_in_chunks(data_chunk, filename_prefix, folder=DATA_FOLDER):
+    # Adds one standalone file to the dataset. Crawls should prefer DatasetWriter, which
+    # streams every page into a single file instead of one small file per call.
     if not data_chunk:
         print("No data to save in this chunk. Skipping.")
         return
 
-    # Convert list of records to DataFrame
-    df = pd.DataFrame(data_chunk)
+    with DatasetWriter(folder, filename_prefix, replace_existing=False) as writer:
+        writer.write_records(data_chunk)
+
+
+def fetch_and_save(api_token, filename_prefix="all_properties", limit=50, base_url=BASE_URL, client=None,
+                   folder=DATA_FOLDER, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    client = client or get_client()
+    offset = 0
+    with DatasetWriter(folder, filename_prefix, row_group_size) as writer:
+        while True:
+            data = fetch_properties(api_token, limit, offset, base_url=base_url, client=client)
+            if len(data) == 0:
+                break
+            print(f"Fetched {len(data)} records, offset={offset}")
+            writer.write_records(data)
+            offset += limit
+    print(f"HTTP client: {client.metrics}")
+
+
+def iter_pages(api_token, limit=50, max_workers=8, max_rps=None, start_offset=0, base_url=BASE_URL, client=None):
+    """
+    Yields `(offset, records)` for consecutive pages, in offset order, until the first empty page.
+
+    Up to `max_workers` page requests are kept in flight on a thread pool and a shared
+    RateLimiter caps how many start per second. Closing the generator early cancels the
+    pages that have not started yet. A page that still fails after the client's retries
+    raises OTCAPIError.
+
+    :param api_token: OpenToClose API token.
+    :param limit: Page size.
+    :param max_workers: Number of pages requested concurrently.
+    :param max_rps: Global ceiling on requests started per second (None for no ceiling).
+    :param start_offset: Offset of the first page.
+    :param base_url: Properties endpoint, overridable to point at a stub server.
+    :param client: OTCClient to use; defaults to the shared process-wide client.
+    """
+    client = client or get_client()
+    limiter = RateLimiter(max_rps)
+
+    def fetch_page(offset):
+        client.metrics.record_throttle(limiter.wait())
+        return fetch_properties(api_token, limit, offset, base_url=base_url, client=client)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        next_offset = start_offset
+        offset = start_offset
+        try:
+            while True:
+                # Keep the window full: at most max_workers pages beyond the one being consumed
+                while len(pending) < max_workers:
+                    pending[next_offset] = executor.submit(fetch_page, next_offset)
+                    next_offset += limit
 
-    # Convert nested structures to JSON strings
-    for column in df.columns:
-        if df[column].dtype == "object":
-            df[column] = df[column].apply(
-                lambda x: json.dumps(x) if isinstance(x, (dict, list)) else x
-            )
+                data = pending.pop(offset).result()
+                if len(data) == 0:
+                    break
+                yield offset, data
+                offset += limit
+        finally:
+            for future in pending.values():
+                future.cancel()
 
-    # Standardize column types to match the schema
-    for field in SCHEMA:
-        column = field.name
-        if column in df.columns:
-            if pa.types.is_int64(field.type):
-                df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int64')
-            elif pa.types.is_string(field.type):
-                df[column] = df[column].astype('string')
 
-    # Convert DataFrame to PyArrow Table
-    table = pa.Table.from_pandas(df, schema=SCHEMA)
+def fetch_and_save_concurrent(api_token, filename_prefix="all_properties", limit=50,
+                              max_workers=8, max_rps=None, base_url=BASE_URL, client=None,
+                              folder=DATA_FOLDER, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Fetches pages with up to `max_workers` requests in flight and saves them in offset order.
 
-    # Create a unique filename based on timestamp
-    timestamp = time.strftime("%Y%m%d%H%M%S")
-    filename = f"datas/{filename_prefix}_{timestamp}.parquet"
+    Pages are consumed strictly in offset order (see `iter_pages`), so the first empty page
+    ends the crawl and every page after it is discarded. Pages are streamed into a single
+    dataset file that replaces the existing one once the crawl completes.
 
-    # Write data to a new file (no appending to existing files)
-    pq.write_table(table, filename, compression='snappy')
+    :return: Number of records saved.
+    """
+    client = client or get_client()
+    total = 0
+    with DatasetWriter(folder, filename_prefix, row_group_size) as writer:
+        for offset, data in iter_pages(api_token, limit, max_workers, max_rps, base_url=base_url, client=client):
+            print(f"Fetched {len(data)} records, offset={offset}")
+            writer.write_records(data)
+            total += len(data)
 
-    print(f"Written {len(data_chunk)} records to {filename}")
+    print(f"HTTP client: {client.metrics}")
+    return total
 
 
-def delete_and_recreate_folder(folder_path):
+def detect_ordering(records):
+    ids = [record.get('id') for record in records]
+    if len(ids) < 2 or None in ids:
+        return 'unknown'
+    if all(a > b for a, b in zip(ids, ids[1:])):
+        return 'descending'
+    if all(a < b for a, b in zip(ids, ids[1:])):
+        return 'ascending'
+    return 'unknown'
+
+
+def sync_properties(api_token, folder=DATA_FOLDER, filename_prefix="all_properties", limit=50,
+                    max_workers=8, max_rps=None, full=False, full_sync_interval_days=7,
+                    unchanged_pages_to_stop=2, base_url=BASE_URL, client=None,
+                    row_group_size=DEFAULT_ROW_GROUP_SIZE, flatten=True):
+    """
+    Brings the local property dataset up to date, rewriting only new or changed properties.
+
+    A manifest of per-property content hashes (plus max id / created high-water marks in the
+    sync state) is kept next to the dataset. An incremental run compares each fetched record
+    with its recorded hash and upserts only the differences into the dataset. How much of the
+    API it has to walk depends on the listing order observed on the first page:
+
+    - newest first: the crawl stops after `unchanged_pages_to_stop` consecutive pages with
+      nothing new or changed;
+    - oldest first: the crawl resumes one page before the known tail, provided that page
+      still starts with a known property;
+    - otherwise every page is walked, but unchanged records are still not rewritten.
+
+    A full run (forced, on first use, or every `full_sync_interval_days`) walks every page,
+    rebuilds the dataset and drops properties that no longer exist upstream.
+
+    The flattened, typed field-values table (`properties_flat.parquet`, see
+    `field_values.write_flattened_dataset`) is rebuilt by a full run; an incremental run only
+    flattens the new or changed properties into it (see `field_values.update_flattened_dataset`).
+
+    :param api_token: OpenToClose API token.
+    :param folder: Dataset folder.
+    :param filename_prefix: Dataset file prefix.
+    :param limit: Page size.
+    :param max_workers: Number of pages requested concurrently.
+    :param max_rps: Global ceiling on requests started per second (None for no ceiling).
+    :param full: Force a full reconciliation.
+    :param full_sync_interval_days: Days between automatic full reconciliations (None to never force one).
+    :param unchanged_pages_to_stop: Consecutive unchanged pages that end a newest-first incremental crawl.
+    :param base_url: Properties endpoint, overridable to point at a stub server.
+    :param client: OTCClient to use; defaults to the shared process-wide client.
+    :param row_group_size: Rows per row group in the rewritten dataset file.
+    :param flatten: Also keep the flattened field-values table up to date.
+    :return: Dictionary with the sync statistics that are also persisted in the sync state.
+    """
+    client = client or get_client()
+    start_time = time.time()
+    os.makedirs(folder, exist_ok=True)
+    state = load_sync_state(folder)
+    manifest = load_manifest(folder)
+    full = (
+        full
+        or not manifest
+        or not dataset_files(folder, filename_prefix)
+        or full_sync_due(state, full_sync_interval_days)
+    )
+
+    start_offset = 0
+    ordering = 'unknown'
+    if not full:
+        ordering = detect_ordering(fetch_properties(api_token, limit, 0, base_url=base_url, client=client))
+        if ordering == 'ascending':
+            tail_offset = max(0, (len(manifest) // limit - 1) * limit)
+            tail_page = fetch_properties(api_token, limit, tail_offset, base_url=base_url, client=client)
+            # Deletions shift records left; resuming is only safe if the page still starts
+            # with a property we already know, i.e. every new property lies beyond it
+            if tail_page and tail_page[0].get('id') in manifest:
+                start_offset = tail_offset
+
+    print(f"Starting {'full' if full else 'incremental'} sync (ordering={ordering}, start offset={start_offset})")
+    entries = dict(manifest)
+    seen_ids = set()
+    changed_ids = set()
+    unchanged_pages = 0
+    staging_path = os.path.join(folder, '_staging.parquet')
+
     try:
-        # Check if the folder exists
-        if os.path.exists(folder_path):
-            # If the folder is not empty, use shutil.rmtree()
-            if os.listdir(folder_path):
-                shutil.rmtree(folder_path)
-                print(f"Folder '{folder_path}' and its contents have been deleted.")
+        with pq.ParquetWriter(staging_path, SCHEMA, compression='snappy') as writer:
+            pages = iter_pages(api_token, limit, max_workers, max_rps, start_offset, base_url=base_url, client=client)
+            for offset, data in pages:
+                to_write = []
+                page_changed = False
+                for record in data:
+                    record_hash = content_hash(record)
+                    changed = entries.get(record['id'], (None,))[0] != record_hash
+                    if changed:
+                        changed_ids.add(record['id'])
+                        page_changed = True
+                    if full or changed:
+                        to_write.append(record)
+                    seen_ids.add(record['id'])
+                    entries[record['id']] = (record_hash, record.get('created'))
+                if to_write:
+                    writer.write_table(records_to_table(to_write))
+                print(f"Fetched {len(data)} records, offset={offset}, {len(to_write)} to write")
 
-            # If the folder is empty, use os.rmdir()
-            else:
-                os.rmdir(folder_path)
-                print(f"Empty folder '{folder_path}' has been deleted.")
+                unchanged_pages = 0 if page_changed else unchanged_pages + 1
+                if not full and ordering == 'descending' and unchanged_pages >= unchanged_pages_to_stop:
+                    pages.close()
+                    break
 
-        # Create a new empty folder at the same path
-        os.makedirs(folder_path)
-        print(f"A new empty folder has been created at '{folder_path}'.")
+        deleted_ids = set()
+        if full:
+            deleted_ids = set(manifest) - seen_ids
+            entries = {id_: entries[id_] for id_ in seen_ids}
+            replace_dataset(staging_path, folder, filename_prefix, row_group_size=row_group_size)
+        elif changed_ids:
+            replace_dataset(staging_path, folder, filename_prefix, keep_existing=True, exclude_ids=changed_ids,
+                            row_group_size=row_group_size)
+        else:
+            print("No new or changed properties.")
+    finally:
+        # A crawl that raised (or had nothing to publish) leaves no stray staging file
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
 
-    except PermissionError:
-        print(f"Permission denied: Unable to delete or create folder at '{folder_path}'.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    save_manifest(entries, folder)
+    if flatten and (full or not os.path.exists(os.path.join(folder, FLATTENED_FILE))):
+        write_flattened_dataset(folder, filename_prefix)
+    elif flatten and changed_ids:
+        update_flattened_dataset(changed_ids, folder=folder, filename_prefix=filename_prefix)
 
+    created_values = [created for _, created in entries.values() if created]
+    now = datetime.now().isoformat(timespec='seconds')
+    state.update({
+        'last_sync': now,
+        'last_sync_mode': 'full' if full else 'incremental',
+        'ordering': ordering,
+        'records': len(entries),
+        'changed': len(changed_ids),
+        'deleted': len(deleted_ids),
+        'max_id': max(entries) if entries else None,
+        'max_created': max(created_values) if created_values else None,
+        'duration_seconds': round(time.time() - start_time, 2),
+    })
+    if full:
+        state['last_full_sync'] = now
+    save_sync_state(state, folder)
 
-def fetch_and_save(api_token, filename_prefix="all_properties", limit=50):
-    offset = 0
-    while True:
-        data = fetch_properties(api_token, limit, offset)
-        if data is None or len(data) == 0:
-            break
-        print(f"Fetched {len(data)} records, offset={offset}")
-        save_to_parquet_in_chunks(data, filename_prefix)
-        offset += limit
+    print(f"Sync finished in {state['duration_seconds']:.2f} seconds: {len(changed_ids)} new or changed, "
+          f"{len(deleted_ids)} deleted, {len(entries)} total. HTTP client: {client.metrics}")
+    return state
 
 
-def execute_fetch_properties():
+def execute_fetch_properties(mode=None, max_workers=None, max_rps=None):
     api_token = os.getenv('OTC_API_KEY')
     if not api_token:
         print("Error: API token not found in environment variables.")
         return
-    delete_and_recreate_folder('./datas')
-    fetch_and_save(api_token)
+    mode = mode or os.getenv('OTC_SYNC_MODE', 'incremental')
+    max_workers = max_workers or int(os.getenv('OTC_FETCH_WORKERS', '8'))
+    max_rps = max_rps or float(os.getenv('OTC_MAX_RPS', '0')) or None
+    sync_properties(api_token, max_workers=max_workers, max_rps=max_rps, full=(mode == 'full'))
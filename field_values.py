@@ -0,0 +1,442 @@
+import glob
+import json
+import os
+from decimal import Decimal, InvalidOperation
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from property_store import DATA_FOLDER, dataset_files
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FLATTENED_FILE = 'properties_flat.parquet'
+
+# Name an in-memory properties DataFrame is queried under (see query_fields)
+PROPERTIES_VIEW = '__properties'
+
+# Shape of a field_values document for DuckDB's from_json
+FIELD_VALUES_JSON_STRUCTURE = '[{"label": "VARCHAR", "key": "VARCHAR", "value": "VARCHAR"}]'
+
+# Top-level property columns carried into the flattened table next to the field values
+PROPERTY_COLUMNS = ['id', 'created', 'timezone', 'team_id', 'team_name', 'team_user_id', 'team_user_name',
+                    'agent_id', 'agent_name', 'brokerage']
+
+DECIMAL_TYPE = pa.decimal128(18, 4)
+DECIMAL_QUANTUM = Decimal('0.0001')
+
+
+def loads(document):
+    """Parses a field_values document, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(document)
+    return json.loads(document)
+
+
+def extract_fields(field_values, fields, by='label'):
+    """
+    Extracts several fields from a column of field_values JSON documents in a single pass.
+
+    Each document is parsed once and every requested field is filled from that parse,
+    instead of parsing the same document once per field. For every field the first
+    matching item wins, and unparseable documents yield a row of None, as with the
+    per-field extraction the report scripts used to do.
+
+    :param field_values: pandas.Series of field_values JSON strings.
+    :param fields: Field labels (or keys, see `by`) to extract; duplicates are ignored.
+    :param by: Item attribute to match fields on, 'label' or 'key'.
+    :return: pandas.DataFrame with one object column per field, indexed like `field_values`.
+    """
+    fields = list(dict.fromkeys(fields))
+    positions = {field: index for index, field in enumerate(fields)}
+    missing = object()
+    rows = []
+    for document in field_values:
+        row = [missing] * len(fields)
+        try:
+            items = loads(document) if document else []
+        except (ValueError, TypeError):
+            items = []
+        for item in items:
+            if isinstance(item, dict):
+                index = positions.get(item.get(by))
+                if index is not None and row[index] is missing:
+                    row[index] = item.get("value")
+        rows.append([None if value is missing else value for value in row])
+    return pd.DataFrame(rows, columns=fields, index=field_values.index, dtype=object)
+
+
+def quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def quote_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def field_values_query(source, fields, by='label', date_fields=(), columns=('id',), equals=None, date_range=None):
+    """
+    Builds a DuckDB query that extracts fields from field_values JSON and filters in SQL.
+
+    The labels (or keys) and the values of every document are pulled out as two parallel
+    lists with JSON path expressions, and each requested field is a positional lookup into
+    them (first match wins, as in `extract_fields`). Documents where the lists do not line up
+    (an item without a label or value) fall back to a full `from_json` parse. Date fields are
+    cast to TIMESTAMP (ISO dates, falling back to MM/DD/YYYY; anything else becomes NULL, like
+    `pd.to_datetime(errors='coerce')`). Filters on top-level columns are pushed down into the
+    Parquet scan, so filtered-out rows are never parsed.
+
+    :param source: Parquet path or glob, or None to read the DataFrame `query_fields` registers
+                   as PROPERTIES_VIEW.
+    :param fields: Field labels (or keys, see `by`) to extract; each becomes a column of that name.
+    :param by: Item attribute to match fields on, 'label' or 'key'.
+    :param date_fields: Subset of `fields` to cast to TIMESTAMP.
+    :param columns: Top-level property columns to carry through (e.g. 'id', 'team_name').
+    :param equals: Dictionary of column/field name to a value (equality) or a list/tuple/set
+                   of values (IN).
+    :param date_range: Optional (name, start, end) tuple; rows outside [start, end] are
+                       dropped. Either bound may be None.
+    :return: (sql, params) tuple for `conn.execute`.
+    """
+    if by not in ('label', 'key'):
+        raise ValueError(f"by must be 'label' or 'key', got: {by}")
+    fields = list(dict.fromkeys(fields))
+    carried = [quote_identifier(column) for column in columns]
+    parsed = f"from_json(field_values, {quote_literal(FIELD_VALUES_JSON_STRUCTURE)})"
+
+    extracted = []
+    for field in fields:
+        name = quote_literal(field)
+        lookup = (f"CASE WHEN len(__names) = len(__values) THEN __values[list_position(__names, {name})] "
+                  f"ELSE {parsed}[list_position(list_transform({parsed}, x -> x.{by}), {name})].value END")
+        if field in date_fields:
+            lookup = f"COALESCE(TRY_CAST({lookup} AS TIMESTAMP), try_strptime({lookup}, '%m/%d/%Y'))"
+        extracted.append(f"{lookup} AS {quote_identifier(field)}")
+
+    conditions = []
+    params = []
+    for name, value in (equals or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            conditions.append(f"{quote_identifier(name)} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        else:
+            conditions.append(f"{quote_identifier(name)} = ?")
+            params.append(value)
+    if date_range:
+        name, start, end = date_range
+        if start is not None:
+            conditions.append(f"{quote_identifier(name)} >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append(f"{quote_identifier(name)} <= ?")
+            params.append(end)
+
+    sql = (
+        f"SELECT * FROM ("
+        f"SELECT {', '.join(carried + extracted)} FROM ("
+        f"SELECT {''.join(column + ', ' for column in carried)}field_values, "
+        f"json_extract_string(field_values, '$[*].{by}') AS __names, "
+        f"json_extract_string(field_values, '$[*].value') AS __values "
+        f"FROM {PROPERTIES_VIEW if source is None else f'read_parquet({quote_literal(source)})'}))"
+    )
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql, params
+
+
+def query_fields(source, fields, by='label', date_fields=(), columns=('id',), equals=None, date_range=None,
+                 conn=None):
+    """
+    Runs `field_values_query` in DuckDB and returns only the projected, filtered rows.
+
+    Takes the same arguments as `field_values_query`, plus an optional DuckDB connection
+    (a temporary in-memory one is used otherwise). `source` may also be a DataFrame of raw
+    properties already in memory (see report_dataset.PropertyDataset), queried in place.
+
+    :return: pandas.DataFrame with the carried columns followed by the extracted fields.
+    """
+    import duckdb
+
+    frame = None if isinstance(source, str) else source
+    sql, params = field_values_query(None if frame is not None else source, fields, by, date_fields, columns,
+                                     equals, date_range)
+    own_conn = conn is None
+    conn = conn or duckdb.connect(database=":memory:")
+    try:
+        if frame is not None:
+            conn.register(PROPERTIES_VIEW, frame)
+        return conn.execute(sql, params).fetchdf()
+    finally:
+        if own_conn:
+            conn.close()
+        elif frame is not None:
+            conn.unregister(PROPERTIES_VIEW)
+
+
+def arrow_type(field_type):
+    """Maps an OpenToClose field `type` to the Arrow type used in the flattened table."""
+    if field_type == 'date':
+        return pa.date32()
+    if field_type == 'decimal':
+        return DECIMAL_TYPE
+    if field_type == 'number':
+        return pa.float64()
+    return pa.string()
+
+
+def to_decimal(value):
+    if value is None or value == '':
+        return None
+    try:
+        return Decimal(str(value).replace(',', '')).quantize(DECIMAL_QUANTUM)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def typed_array(values, field_type):
+    """
+    Converts raw field values (strings, mostly '' when unset) into a typed Arrow array.
+    Values that do not parse as the declared type become null.
+    """
+    if field_type == 'date':
+        dates = pd.to_datetime(pd.Series(values, dtype='object'), errors='coerce', format='mixed')
+        return pa.array(dates.dt.date, type=pa.date32(), from_pandas=True)
+    if field_type == 'decimal':
+        return pa.array([to_decimal(value) for value in values], type=DECIMAL_TYPE)
+    if field_type == 'number':
+        return pa.array(pd.to_numeric(pd.Series(values, dtype='object'), errors='coerce'), type=pa.float64(),
+                        from_pandas=True)
+    return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def flatten_table(table):
+    """
+    Flattens the `field_values` JSON of a raw property table into one typed column per field label.
+
+    Each document is parsed once; when a document repeats a label, its first item wins. The
+    column type follows the field's declared `type` (date, decimal, number, or string for
+    everything else), and the field `key` and `type` are kept in the column metadata.
+
+    :param table: pyarrow.Table with the raw property schema.
+    :return: pyarrow.Table keyed by `id`, with the top-level property columns followed by
+             one column per field label.
+    """
+    num_rows = table.num_rows
+    columns = {}
+    fields = {}
+    for row, field_values in enumerate(table['field_values'].to_pylist()):
+        try:
+            items = loads(field_values) if field_values else []
+        except (ValueError, TypeError):
+            continue
+        seen = set()
+        for item in items:
+            if not isinstance(item, dict) or 'label' not in item:
+                continue
+            label = item['label']
+            # The first item of a label wins, as in extract_fields
+            if label in seen:
+                continue
+            seen.add(label)
+            if label not in columns:
+                columns[label] = [None] * num_rows
+                fields[label] = (item.get('key'), item.get('type'))
+            columns[label][row] = item.get('value')
+
+    present = [name for name in PROPERTY_COLUMNS if name in table.column_names]
+    arrays = [table[name] for name in present]
+    schema_fields = [table.schema.field(name) for name in present]
+    if 'created' in present:
+        index = present.index('created')
+        created = pd.to_datetime(pd.Series(table['created'].to_pylist(), dtype='object'), errors='coerce')
+        arrays[index] = pa.array(created, type=pa.timestamp('us'), from_pandas=True)
+        schema_fields[index] = pa.field('created', pa.timestamp('us'))
+
+    for label, values in columns.items():
+        key, field_type = fields[label]
+        arrays.append(typed_array(values, field_type))
+        schema_fields.append(pa.field(label, arrow_type(field_type),
+                                      metadata={'key': key or '', 'type': field_type or ''}))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(schema_fields))
+
+
+def align_flattened_tables(tables):
+    """
+    Brings flattened tables to one schema: a column missing from a table becomes a null column
+    there, and a label typed differently in different tables (its declared `type` changed)
+    becomes a string column everywhere.
+
+    :param tables: List of pyarrow.Table from `flatten_table`.
+    :return: (tables, schema).
+    """
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            types.setdefault(field.name, set()).add(field.type)
+    conflicts = {name for name, found in types.items() if len(found) > 1}
+    if conflicts:
+        tables = [
+            table.cast(pa.schema([
+                field.with_type(pa.string()).with_metadata({**(field.metadata or {}), b'type': b'string'})
+                if field.name in conflicts else field
+                for field in table.schema
+            ]))
+            for table in tables
+        ]
+    schema = pa.unify_schemas([table.schema for table in tables])
+    tables = [
+        pa.Table.from_arrays(
+            [table[name] if name in table.column_names else pa.nulls(table.num_rows, schema.field(name).type)
+             for name in schema.names],
+            schema=schema,
+        )
+        for table in tables
+    ]
+    return tables, schema
+
+
+def flattened_path(folder=DATA_FOLDER):
+    return os.path.join(folder, FLATTENED_FILE)
+
+
+def save_flattened_table(table, folder=DATA_FOLDER):
+    path = flattened_path(folder)
+    pq.write_table(table, path + '.tmp', compression='snappy')
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def write_flattened_dataset(folder=DATA_FOLDER, filename_prefix="all_properties"):
+    """
+    Builds `<folder>/properties_flat.parquet` from the raw property dataset.
+
+    Raw files are flattened one at a time; the per-file tables are aligned (see
+    `align_flattened_tables`) before everything is written out.
+
+    :param folder: Dataset folder.
+    :param filename_prefix: Raw dataset file prefix.
+    :return: Path of the flattened file, or None when there is no raw data.
+    """
+    paths = dataset_files(folder, filename_prefix)
+    if not paths:
+        print("No property data to flatten.")
+        return None
+
+    tables, schema = align_flattened_tables([flatten_table(pq.read_table(path)) for path in paths])
+    path = save_flattened_table(pa.concat_tables(tables), folder)
+    print(f"Written flattened properties ({len(schema.names)} columns) to {path}")
+    return path
+
+
+def update_flattened_dataset(changed_ids, deleted_ids=(), folder=DATA_FOLDER, filename_prefix="all_properties"):
+    """
+    Brings `<folder>/properties_flat.parquet` up to date after an incremental sync.
+
+    Rows of changed and deleted properties are dropped from the flattened table, and only the
+    changed properties are read back from the raw dataset, flattened and appended, so rows
+    keep the order of the raw dataset (see property_store.replace_dataset). Without a
+    flattened table yet, the whole dataset is flattened.
+
+    :param changed_ids: Ids of the new or changed properties.
+    :param deleted_ids: Ids of the properties no longer in the dataset.
+    :param folder: Dataset folder.
+    :param filename_prefix: Raw dataset file prefix.
+    :return: Path of the flattened file, or None when there is no raw data.
+    """
+    path = flattened_path(folder)
+    if not os.path.exists(path):
+        return write_flattened_dataset(folder, filename_prefix)
+
+    changed = pa.array(sorted(changed_ids), pa.int64())
+    stale = pa.array(sorted(set(changed_ids) | set(deleted_ids)), pa.int64())
+    current = pq.read_table(path)
+    current = current.filter(pc.invert(pc.is_in(current['id'], value_set=stale)))
+    changed_rows = []
+    for raw_path in dataset_files(folder, filename_prefix):
+        raw = pq.read_table(raw_path)
+        changed_rows.append(raw.filter(pc.is_in(raw['id'], value_set=changed)))
+    if changed_rows:
+        tables, schema = align_flattened_tables([current] + [flatten_table(table) for table in changed_rows])
+        current = pa.concat_tables(tables)
+    path = save_flattened_table(current, folder)
+    print(f"Updated flattened properties: {len(changed)} changed, {len(deleted_ids)} deleted, "
+          f"{current.num_columns} columns")
+    return path
+
+
+def flattened_is_current(folder=DATA_FOLDER, filename_prefix="all_properties"):
+    """Whether the flattened table exists and was written after every raw dataset file."""
+    path = flattened_path(folder)
+    paths = dataset_files(folder, filename_prefix)
+    return bool(paths) and os.path.exists(path) and \
+        os.path.getmtime(path) >= max(os.path.getmtime(raw_path) for raw_path in paths)
+
+
+def read_flattened_properties(columns=None, folder=DATA_FOLDER):
+    """
+    Reads the flattened property table into pandas, loading only the requested columns.
+
+    Dates come back as datetime64 and decimals as float64, matching what the reports get
+    from `pd.to_datetime` / `pd.to_numeric` on the JSON values.
+
+    :param columns: Column names (field labels or top-level property columns); None for all.
+    :param folder: Dataset folder.
+    :return: pandas.DataFrame.
+    """
+    table = pq.read_table(os.path.join(folder, FLATTENED_FILE), columns=columns)
+    for index, field in enumerate(table.schema):
+        if pa.types.is_decimal(field.type):
+            table = table.set_column(index, field.name, table[field.name].cast(pa.float64()))
+    return table.to_pandas(date_as_object=False)
+
+
+def read_flattened_fields(keys, columns=('id',), folder=DATA_FOLDER):
+    """
+    Reads fields by their `key` from the flattened table, like `query_fields(..., by='key')`
+    but from typed columns instead of the field_values JSON.
+
+    A key shared by several labels is read from the first of their columns; a key no
+    property has gives a column of None. Dates come back as datetime64[ns].
+
+    :param keys: Field keys.
+    :param columns: Top-level property columns to include first.
+    :param folder: Dataset folder.
+    :return: pandas.DataFrame with the `columns` followed by one column per key, named by key.
+    """
+    labels = {}
+    for field in pq.read_schema(flattened_path(folder)):
+        key = (field.metadata or {}).get(b'key')
+        if key:
+            labels.setdefault(key.decode(), field.name)
+    keys = list(dict.fromkeys(keys))
+    names = list(dict.fromkeys(list(columns) + [labels[key] for key in keys if key in labels]))
+    flat = read_flattened_properties(names, folder)
+    df = flat[list(columns)].copy()
+    for key in keys:
+        df[key] = flat[labels[key]] if key in labels else None
+    for column in df.columns[df.dtypes.map(pd.api.types.is_datetime64_any_dtype)]:
+        df[column] = df[column].astype('datetime64[ns]')
+    return df
+
+
+def flattened_source_folder(source, filename_prefix="all_properties"):
+    """
+    Folder whose flattened table stands for `source`, or None when the raw files have to be read.
+
+    :param source: Parquet path or glob of the raw properties (anything else gives None). It
+                   must name exactly the raw dataset files of its folder, and the flattened
+                   table must be current (see `flattened_is_current`).
+    """
+    if not isinstance(source, str):
+        return None
+    folder = os.path.dirname(source) or '.'
+    paths = [os.path.normpath(path) for path in dataset_files(folder, filename_prefix)]
+    if not paths or sorted(os.path.normpath(path) for path in glob.glob(source)) != paths:
+        return None
+    return folder if flattened_is_current(folder, filename_prefix) else None
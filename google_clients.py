@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+
+from google.auth.transport.requests import Request
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+
+from google_quota import ScheduledHttpRequest
+
+# What create_google_sheet and the reports that leave their spreadsheet where it is create
+SCOPES = (
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.file",
+)
+# Reports that look up and move into the OTC folder also need to see files they did not create
+DRIVE_SCOPES = SCOPES + ("https://www.googleapis.com/auth/drive",)
+# Service-account key, or OAuth client secrets for the browser flow
+CREDENTIALS_FILE = "credentials.json"
+# Authorized user token saved by the browser flow (see `authorize`)
+TOKEN_FILE = "token.json"
+
+
+def load_credentials(scopes=SCOPES, credentials_file=CREDENTIALS_FILE, token_file=TOKEN_FILE):
+    """
+    Loads the Google credentials the reports run with.
+
+    A service-account key in `credentials_file` is used as is. Otherwise the authorized user
+    token in `token_file` is used, refreshed (and saved) when expired. The browser flow is never
+    started from here: without a usable token run `python google_clients.py` once (see `authorize`).
+
+    :raises RuntimeError: When there is neither a service-account key nor a usable token.
+    """
+    if os.path.exists(credentials_file):
+        with open(credentials_file) as file:
+            info = json.load(file)
+        if info.get("type") == "service_account":
+            from google.oauth2.service_account import Credentials
+            return Credentials.from_service_account_info(info, scopes=list(scopes))
+
+    from google.oauth2.credentials import Credentials
+    creds = None
+    if os.path.exists(token_file):
+        creds = Credentials.from_authorized_user_file(token_file, list(scopes))
+    if creds and not creds.valid and creds.expired and creds.refresh_token:
+        creds.refresh(Request())
+        with open(token_file, "w") as token:
+            token.write(creds.to_json())
+    if not creds or not creds.valid:
+        raise RuntimeError(f"No service-account key in {credentials_file} and no usable token in {token_file}: "
+                           f"run `python google_clients.py` to authorize")
+    return creds
+
+
+def authorize(scopes=DRIVE_SCOPES, credentials_file=CREDENTIALS_FILE, token_file=TOKEN_FILE):
+    """
+    Runs the OAuth browser flow with `credentials_file` as the client secrets and saves the
+    token to `token_file`. Interactive: it blocks until the consent page is answered, so it is
+    only run by hand, never by the reports.
+
+    :param scopes: Scopes to grant; the default covers every report.
+    """
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    flow = InstalledAppFlow.from_client_secrets_file(credentials_file, list(scopes))
+    creds = flow.run_local_server(port=0)
+    with open(token_file, "w") as token:
+        token.write(creds.to_json())
+    print(f"Token saved to {token_file}")
+    return creds
+
+
+def discovery_document(service_name, version):
+    """Discovery document bundled with googleapiclient for a service, e.g. ('sheets', 'v4'), parsed."""
+    content = discovery_cache.get_static_doc(service_name, version)
+    if content is None:
+        raise ValueError(f"No bundled discovery document for {service_name} {version}")
+    return json.loads(content)
+
+
+class ClientRegistry:
+    """
+    Google API clients shared by every report of the process.
+
+    The credentials are loaded once per set of scopes, on first use, and refreshed in place
+    when their token expires; each discovery document is read and parsed once.
+    googleapiclient services are not thread-safe, so each thread gets its own service per API
+    and scopes, built from the cached document with requests paced by the quota scheduler
+    (see google_quota).
+
+    :param credentials_loader: Callable taking the scopes and returning Google credentials
+                               (defaults to `load_credentials`).
+    :param request_builder: googleapiclient request class the services use.
+    """
+
+    def __init__(self, credentials_loader=load_credentials, request_builder=ScheduledHttpRequest):
+        self.credentials_loader = credentials_loader
+        self.request_builder = request_builder
+        self.lock = threading.Lock()
+        self.creds = {}
+        self.documents = {}
+        self.local = threading.local()
+        self.credential_loads = 0
+        self.services_built = 0
+
+    def credentials(self, scopes=SCOPES):
+        scopes = tuple(scopes)
+        with self.lock:
+            if scopes not in self.creds:
+                self.creds[scopes] = self.credentials_loader(scopes)
+                self.credential_loads += 1
+            elif self.creds[scopes].expired:
+                self.creds[scopes].refresh(Request())
+            return self.creds[scopes]
+
+    def document(self, service_name, version):
+        with self.lock:
+            key = (service_name, version)
+            if key not in self.documents:
+                self.documents[key] = discovery_document(service_name, version)
+            return self.documents[key]
+
+    def service(self, service_name, version, scopes=SCOPES):
+        """
+        Returns this thread's service for an API, e.g. ('sheets', 'v4') or ('drive', 'v3').
+
+        :param scopes: Scopes the service is authorized for: SCOPES, or DRIVE_SCOPES for the reports
+                       that need to see every Drive file.
+        """
+        services = self.local.__dict__.setdefault("services", {})
+        key = (service_name, version, tuple(scopes))
+        if key not in services:
+            services[key] = build_from_document(
+                self.document(service_name, version),
+                credentials=self.credentials(scopes),
+                requestBuilder=self.request_builder,
+            )
+            with self.lock:
+                self.services_built += 1
+        return services[key]
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Returns the process-wide registry, creating it on first use."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry()
+        return _default_registry
+
+
+def set_registry(registry):
+    """Replaces the process-wide registry (e.g. with fake credentials); returns the previous one."""
+    global _default_registry
+    with _default_registry_lock:
+        previous, _default_registry = _default_registry, registry
+        return previous
+
+
+def get_service(service_name, version, scopes=SCOPES):
+    """This thread's shared service for an API, from the process-wide registry."""
+    return get_registry().service(service_name, version, scopes)
+
+
+if __name__ == '__main__':
+    # python google_clients.py: authorizes the reports with the browser flow (not needed with a service-account key)
+    authorize()
@@ -0,0 +1,275 @@
+import random
+import threading
+import time
+from collections import deque
+
+from googleapiclient.http import HttpRequest
+
+from otc_client import RETRY_STATUS_CODES, ClientMetrics, parse_retry_after
+
+# Requests per minute allowed for each quota (Google's per-user defaults): Sheets counts reads
+# and writes separately, Drive queries share one budget
+DEFAULT_QUOTAS = {
+    "sheets.read": 60,
+    "sheets.write": 60,
+    "drive": 12000,
+}
+# Share of a quota that may go out at once; the rest is spread evenly over the minute
+BURST_FRACTION = 0.1
+# Methods billed against the read quota; every other Sheets method is a write
+SHEETS_READ_METHODS = {"get", "batchGet", "getByDataFilter", "batchGetByDataFilter"}
+# Recent request latencies kept per quota for the percentiles in the metrics
+LATENCY_SAMPLES = 1000
+
+
+def quota_name(method_id):
+    """
+    Quota a Google API method is billed against, e.g. 'sheets.spreadsheets.values.batchUpdate'
+    -> 'sheets.write' and 'drive.files.list' -> 'drive'.
+    """
+    api, _, method = (method_id or "").partition(".")
+    if api == "sheets":
+        return "sheets.read" if method.rpartition(".")[2] in SHEETS_READ_METHODS else "sheets.write"
+    return api
+
+
+def error_status(error):
+    """HTTP status of a googleapiclient HttpError (or anything with `status_code`/`status`), else None."""
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status is None and getattr(error, "resp", None) is not None:
+        status = getattr(error.resp, "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def error_retry_after(error):
+    """Seconds asked for by the Retry-After header of a failed response, or None."""
+    resp = getattr(error, "resp", None)
+    if resp is None or not hasattr(resp, "get"):
+        return None
+    return parse_retry_after(resp.get("retry-after"))
+
+
+class TokenBucket:
+    """
+    Token bucket for a per-minute quota: holds at most `burst` tokens and refills the other
+    `per_minute - burst` evenly over the minute, so no 60-second window sees more than
+    `per_minute` requests. Not thread-safe; QuotaScheduler holds its lock around every call.
+    """
+
+    def __init__(self, per_minute, burst=None, now=0.0):
+        self.burst = max(1, min(per_minute, int(per_minute * BURST_FRACTION)) if burst is None else burst)
+        self.rate = max(per_minute - self.burst, 1) / 60.0
+        self.tokens = float(self.burst)
+        self.updated = now
+
+    def reserve(self, now):
+        """
+        Takes one token, going into debt when the bucket is empty.
+
+        :return: Seconds from `now` until the token is actually available.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def drain(self, now):
+        """Drops the tokens left, after the API answered 429 despite the pacing."""
+        self.tokens = min(0.0, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class QuotaMetrics(ClientMetrics):
+    """ClientMetrics plus the queue depth and request latency of one quota."""
+
+    def __init__(self):
+        super().__init__()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.latency_seconds = 0.0
+        self.max_latency_seconds = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def enter_queue(self):
+        with self.lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def leave_queue(self, wait_seconds):
+        with self.lock:
+            self.queue_depth -= 1
+            self.throttle_wait_seconds += wait_seconds
+
+    def record_latency(self, seconds):
+        with self.lock:
+            self.latency_seconds += seconds
+            self.max_latency_seconds = max(self.max_latency_seconds, seconds)
+            self.latencies.append(seconds)
+
+    def snapshot(self):
+        stats = super().snapshot()
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats.update({
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "latency_seconds": round(self.latency_seconds, 3),
+                "max_latency_seconds": round(self.max_latency_seconds, 3),
+            })
+        for name, fraction in (("p50_latency_seconds", 0.5), ("p95_latency_seconds", 0.95)):
+            stats[name] = round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 3) if latencies else 0.0
+        return stats
+
+
+class QuotaScheduler:
+    """
+    Paces Google API calls against per-minute quotas, shared by every thread of the process.
+
+    Each quota (see `quota_name`) has a TokenBucket; a call waits for its token, runs, and is
+    retried with truncated exponential backoff on 429, 5xx and connection errors. A 429 also
+    empties the bucket and holds back every call on that quota until the backoff (or the
+    response's Retry-After) has passed, since the quota is shared. Time comes from `clock` and
+    waits go through `sleep`, so both can be replaced by a fake clock.
+
+    :param quotas: Dictionary of quota name to requests per minute; unknown quotas are not paced.
+    :param clock: Callable returning the current time in seconds.
+    :param sleep: Callable waiting a number of seconds.
+    :param rand: Callable returning a float in [0, 1), for the backoff jitter.
+    """
+
+    def __init__(self, quotas=None, max_retries=7, backoff_base=1.0, backoff_max=64.0,
+                 clock=time.monotonic, sleep=time.sleep, rand=random.random):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.sleep = sleep
+        self.rand = rand
+        self.lock = threading.Lock()
+        now = clock()
+        self.buckets = {name: TokenBucket(per_minute, now=now)
+                        for name, per_minute in (DEFAULT_QUOTAS if quotas is None else quotas).items()}
+        self.blocked_until = {}
+        self.metrics = {}
+
+    def quota_metrics(self, quota):
+        with self.lock:
+            if quota not in self.metrics:
+                self.metrics[quota] = QuotaMetrics()
+            return self.metrics[quota]
+
+    def backoff_delay(self, attempt):
+        # Google's truncated exponential backoff: base * 2^attempt plus up to `base` of jitter, capped.
+        # Seven retries wait about two minutes in all, long enough for a per-minute quota to refill
+        return min(self.backoff_max, self.backoff_base * (2 ** attempt + self.rand()))
+
+    def acquire(self, quota):
+        """Waits until a call on `quota` may start. :return: Seconds waited."""
+        metrics = self.quota_metrics(quota)
+        metrics.enter_queue()
+        start = self.clock()
+        waited = 0.0
+        try:
+            with self.lock:
+                bucket = self.buckets.get(quota)
+                delay = bucket.reserve(start) if bucket is not None else 0.0
+            while True:
+                if delay > 0:
+                    self.sleep(delay)
+                # A 429 on another thread may have pushed the quota back meanwhile
+                now = self.clock()
+                with self.lock:
+                    delay = self.blocked_until.get(quota, now) - now
+                if delay <= 0:
+                    break
+            waited = self.clock() - start
+            return waited
+        finally:
+            metrics.leave_queue(waited)
+
+    def back_off(self, quota, delay):
+        """Holds back every call on `quota` for `delay` seconds."""
+        now = self.clock()
+        with self.lock:
+            self.blocked_until[quota] = max(self.blocked_until.get(quota, now), now + delay)
+            if quota in self.buckets:
+                self.buckets[quota].drain(now)
+
+    def run(self, quota, call):
+        """
+        Runs `call` (no arguments) within `quota`.
+
+        :return: What `call` returned.
+        :raises: The call's exception when it is not retryable or still fails after `max_retries` retries.
+        """
+        metrics = self.quota_metrics(quota)
+        attempt = 0
+        while True:
+            self.acquire(quota)
+            start = self.clock()
+            try:
+                result = call()
+            except Exception as e:
+                metrics.record_latency(self.clock() - start)
+                status = error_status(e)
+                metrics.record_response(status)
+                retryable = status in RETRY_STATUS_CODES or isinstance(e, (ConnectionError, TimeoutError))
+                if not retryable or attempt >= self.max_retries:
+                    metrics.record_failure()
+                    raise
+                retry_after = error_retry_after(e)
+                delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+                print(f"Retrying {quota} request in {delay:.2f}s after: {e}")
+                metrics.record_retry(delay)
+                if status == 429:
+                    self.back_off(quota, delay)
+                else:
+                    self.sleep(delay)
+                attempt += 1
+                continue
+            metrics.record_latency(self.clock() - start)
+            metrics.record_response(200)
+            return result
+
+    def execute(self, request, method_id=None):
+        """Executes a googleapiclient-style request (anything with `execute()`) within its quota."""
+        return self.run(quota_name(method_id or getattr(request, "methodId", None)), request.execute)
+
+    def snapshot(self):
+        """Dictionary of quota name to its metrics (see QuotaMetrics.snapshot)."""
+        with self.lock:
+            metrics = dict(self.metrics)
+        return {quota: quota_metrics.snapshot() for quota, quota_metrics in metrics.items()}
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Returns the process-wide scheduler, creating it on first use."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = QuotaScheduler()
+        return _default_scheduler
+
+
+def set_scheduler(scheduler):
+    """Replaces the process-wide scheduler (e.g. with one on a fake clock); returns the previous one."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        previous, _default_scheduler = _default_scheduler, scheduler
+        return previous
+
+
+class ScheduledHttpRequest(HttpRequest):
+    """HttpRequest whose `execute()` goes through the process-wide QuotaScheduler."""
+
+    def execute(self, http=None, num_retries=0):
+        # Retries are the scheduler's job, so the request itself is sent once per attempt
+        return get_scheduler().run(quota_name(self.methodId), lambda: HttpRequest.execute(self, http=http))
+
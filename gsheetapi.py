@@ -1,95 +1,444 @@
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+import pandas as pd
 
-def create_and_populate_google_sheet(service, spreadsheet_id, df, sheet_title):
+from google_clients import get_service
+
+# Cells per values.batchUpdate request: keeps each payload far below the API's request size
+# limit and bounds the rows held as Python lists at any one time
+MAX_CHUNK_CELLS = 50000
+UPLOAD_WORKERS = 4
+CLEAR_RANGE = "A1:ZZ"
+# Local record of what each diff-synced tab holds (see sync_google_sheet)
+SNAPSHOT_FOLDER = os.path.join('datas', 'sheet_snapshots')
+
+
+def a1_range(sheet_title, cells="A1"):
+    """A1 notation for `cells` on a tab, with the title quoted so any tab name is accepted."""
+    return "'" + sheet_title.replace("'", "''") + "'!" + cells
+
+
+def formatted_datetimes(df):
     """
-    Adds a new sheet or updates existing sheet in Google Spreadsheet and populates it with data.
-    :param service: Google Sheets API service object.
+    String form of every datetime column ("" for NaT), by column position. Formatted over the
+    whole column, so every piece of a tab uses the same format.
+    """
+    formatted = {}
+    for index, dtype in enumerate(df.dtypes):
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            # Dates repeat a lot: format each distinct value once (NaT gets code -1, the trailing "")
+            codes, uniques = pd.factorize(df.iloc[:, index])
+            strings = np.append(uniques.astype(str).to_numpy(dtype=object), "")
+            formatted[index] = pd.Series(strings[codes], index=df.index)
+    return formatted
+
+
+def frame_values(df, positions, formatted):
+    """
+    Rows of a DataFrame as the lists of values the Sheets API takes: missing values become ""
+    and datetime columns are taken from `formatted` (see `formatted_datetimes`).
+
+    :param positions: Slice or list of row positions.
+    """
+    chunk = df.iloc[positions]
+    if formatted:
+        chunk = chunk.copy()
+        for index, values in formatted.items():
+            chunk.isetitem(index, values.iloc[positions].to_numpy())
+    return chunk.fillna("").values.tolist()
+
+
+def value_chunks(df, max_chunk_cells=MAX_CHUNK_CELLS):
+    """
+    Yields (first row number, rows) pieces of a DataFrame, header included, as the lists of
+    values the Sheets API takes (see `frame_values`). Each piece has at most `max_chunk_cells`
+    cells (but at least one row); only one piece is converted at a time.
+    """
+    formatted = formatted_datetimes(df)
+    rows_per_chunk = max(1, max_chunk_cells // max(1, len(df.columns)))
+
+    # The header takes one row of the first piece
+    header = [df.columns.tolist()]
+    start, stop = 0, min(len(df), rows_per_chunk - 1)
+    while True:
+        yield (1 if header else start + 2), header + frame_values(df, slice(start, stop), formatted)
+        if stop >= len(df):
+            break
+        header = []
+        start, stop = stop, min(len(df), stop + rows_per_chunk)
+
+
+def read_sheet_ids(service, spreadsheet_id):
+    """Dictionary of tab title to sheetId, from one read of the spreadsheet metadata."""
+    sheet_metadata = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+    return {sheet['properties']['title']: sheet['properties']['sheetId']
+            for sheet in sheet_metadata.get('sheets', [])}
+
+
+def prepare_sheets(service, spreadsheet_id, sheet_titles, sheet_ids=None):
+    """
+    Makes sure every tab exists and is empty, with one metadata read for the spreadsheet:
+    missing tabs are added in a single batchUpdate and existing ones cleared in a single batchClear.
+
+    :param sheet_ids: Dictionary of tab title to sheetId, when the caller has read the metadata
+                      already (see `read_sheet_ids`); it is updated with the added tabs.
+    :return: Dictionary of tab title to sheetId.
+    """
+    if sheet_ids is None:
+        sheet_ids = read_sheet_ids(service, spreadsheet_id)
+
+    missing = [title for title in dict.fromkeys(sheet_titles) if title not in sheet_ids]
+    existing = [title for title in dict.fromkeys(sheet_titles) if title in sheet_ids]
+    if missing:
+        response = service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"requests": [{"addSheet": {"properties": {"title": title}}} for title in missing]}
+        ).execute()
+        for reply in response.get('replies', []):
+            properties = reply.get('addSheet', {}).get('properties', {})
+            if 'title' in properties:
+                sheet_ids[properties['title']] = properties.get('sheetId')
+        for title in missing:
+            print(f"Sheet '{title}' created.")
+    if existing:
+        service.spreadsheets().values().batchClear(
+            spreadsheetId=spreadsheet_id,
+            body={"ranges": [a1_range(title, CLEAR_RANGE) for title in existing]}
+        ).execute()
+        for title in existing:
+            print(f"Existing sheet '{title}' cleared.")
+    return sheet_ids
+
+
+def write_sheet_values(service, spreadsheet_id, df, sheet_title, max_chunk_cells=MAX_CHUNK_CELLS):
+    """
+    Writes a DataFrame (header first) to a tab from A1, one values.batchUpdate request per chunk.
+
+    :return: Number of requests sent.
+    """
+    requests_sent = 0
+    for row_number, values in value_chunks(df, max_chunk_cells):
+        service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={
+                "valueInputOption": "RAW",
+                "data": [{"range": a1_range(sheet_title, f"A{row_number}"), "values": values}],
+            },
+        ).execute()
+        requests_sent += 1
+    return requests_sent
+
+
+def populate_google_sheets(service_factory, spreadsheet_id, dataframes, sheet_titles, max_workers=UPLOAD_WORKERS,
+                           max_chunk_cells=MAX_CHUNK_CELLS, sync_keys=None, sheet_ids=None):
+    """
+    Writes several DataFrames to their tabs of one spreadsheet.
+
+    The spreadsheet metadata is read once (see `prepare_sheets`), then the chunks of every tab
+    (see `value_chunks`) are uploaded concurrently, each with its own values.batchUpdate
+    request. Chunks are converted only as workers free up, so at most about twice
+    `max_workers` chunks are held in memory. Services from `get_service` pace every request
+    through the process-wide quota scheduler (see google_quota), so the uploads together stay
+    within the Sheets write quota. A tab that fails is reported and does not stop the others.
+
+    Tabs listed in `sync_keys` are diff-synced (see `sync_google_sheet`) by the same workers,
+    with the metadata read above.
+
+    :param service_factory: Callable returning a Sheets service; called once per worker
+                            thread, since googleapiclient services are not thread-safe.
     :param spreadsheet_id: ID of the Google Spreadsheet.
-    :param df: Pandas DataFrame containing the data.
-    :param sheet_title: Title for the sheet.
+    :param dataframes: List of DataFrames.
+    :param sheet_titles: Tab titles, one per DataFrame.
+    :param max_workers: Requests in flight at the same time.
+    :param max_chunk_cells: Cells per request.
+    :param sync_keys: Dictionary of tab title to key columns of the tabs to diff-sync instead of rewrite.
+    :param sheet_ids: Dictionary of tab title to sheetId, when the caller has read the metadata already.
+    :return: List of the tab titles written successfully.
     """
-    try:
-        # Prepare DataFrame
-        df = df.fillna("")
-        df = df.copy()
-        for col in df.select_dtypes(include=['datetime', 'datetimetz']).columns:
-            df[col] = df[col].astype(str)
-
-        # Get all sheets in the spreadsheet
-        sheet_metadata = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-        sheets = sheet_metadata.get('sheets', '')
-        sheet_exists = False
-        sheet_id = None
-
-        # Check if sheet already exists
-        for sheet in sheets:
-            if sheet['properties']['title'] == sheet_title:
-                sheet_exists = True
-                sheet_id = sheet['properties']['sheetId']
-                break
-
-        if not sheet_exists:
-            # Create new sheet if it doesn't exist
-            requests = [{
-                "addSheet": {
-                    "properties": {
-                        "title": sheet_title
-                    }
-                }
-            }]
-            service.spreadsheets().batchUpdate(
+    local = threading.local()
+
+    def thread_service():
+        if not hasattr(local, 'service'):
+            local.service = service_factory()
+        return local.service
+
+    sync_keys = sync_keys or {}
+    if sheet_ids is None:
+        sheet_ids = read_sheet_ids(thread_service(), spreadsheet_id)
+    rewritten = [title for title in sheet_titles if title not in sync_keys]
+    if rewritten:
+        prepare_sheets(thread_service(), spreadsheet_id, rewritten, sheet_ids)
+    errors = {}
+    in_flight = threading.BoundedSemaphore(2 * max(1, max_workers))
+
+    def sync(df, title):
+        try:
+            sync_google_sheet(thread_service(), spreadsheet_id, df, title, sync_keys[title],
+                              max_chunk_cells=max_chunk_cells, sheet_ids=sheet_ids)
+        except Exception as e:
+            errors.setdefault(title, e)
+        finally:
+            in_flight.release()
+
+    def upload(title, row_number, values):
+        try:
+            if title in errors:
+                return
+            thread_service().spreadsheets().values().batchUpdate(
                 spreadsheetId=spreadsheet_id,
-                body={"requests": requests}
+                body={
+                    "valueInputOption": "RAW",
+                    "data": [{"range": a1_range(title, f"A{row_number}"), "values": values}],
+                },
             ).execute()
-            print(f"Sheet '{sheet_title}' created.")
+        except Exception as e:
+            errors.setdefault(title, e)
+        finally:
+            in_flight.release()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # Synced tabs first: each is one task, started before the chunks queue up behind it
+        for df, title in zip(dataframes, sheet_titles):
+            if title in sync_keys:
+                in_flight.acquire()
+                executor.submit(sync, df, title)
+        for df, title in zip(dataframes, sheet_titles):
+            if title in sync_keys:
+                continue
+            for row_number, values in value_chunks(df, max_chunk_cells):
+                in_flight.acquire()
+                executor.submit(upload, title, row_number, values)
+
+    written = []
+    for title in sheet_titles:
+        if title in errors:
+            print(f"Error working with Google Sheet '{title}': {errors[title]}")
         else:
-            # Clear existing sheet if it exists
-            range_name = f"{sheet_title}!A1:ZZ"
-            service.spreadsheets().values().clear(
-                spreadsheetId=spreadsheet_id,
-                range=range_name
-            ).execute()
-            print(f"Existing sheet '{sheet_title}' cleared.")
+            if title not in sync_keys:
+                print(f"Sheet '{title}' populated successfully.")
+            written.append(title)
+    return written
+
+
+def snapshot_path(spreadsheet_id, sheet_title, folder=SNAPSHOT_FOLDER):
+    name = hashlib.sha1(f"{spreadsheet_id}\n{sheet_title}".encode()).hexdigest()[:16]
+    return os.path.join(folder, f"{name}.json")
+
+
+def load_sheet_snapshot(spreadsheet_id, sheet_title, folder=SNAPSHOT_FOLDER):
+    """
+    Reads what the last sync wrote to a tab: the header, and the key and content hash of each
+    row in sheet order. Returns None when the tab has not been synced yet.
+    """
+    path = snapshot_path(spreadsheet_id, sheet_title, folder)
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_sheet_snapshot(spreadsheet_id, sheet_title, snapshot, folder=SNAPSHOT_FOLDER):
+    os.makedirs(folder, exist_ok=True)
+    path = snapshot_path(spreadsheet_id, sheet_title, folder)
+    with open(path + '.tmp', 'w') as file:
+        json.dump(snapshot, file)
+    os.replace(path + '.tmp', path)
+
+
+def delete_sheet_snapshot(spreadsheet_id, sheet_title, folder=SNAPSHOT_FOLDER):
+    path = snapshot_path(spreadsheet_id, sheet_title, folder)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def sheet_snapshot(df, key_columns, max_chunk_cells=MAX_CHUNK_CELLS):
+    """
+    Builds the snapshot of a DataFrame as it is written to a tab (see `load_sheet_snapshot`).
+
+    A row's key is its `key_columns` values plus an occurrence number, so rows sharing a key
+    value are still told apart; its hash covers every written value.
+    """
+    header = [str(column) for column in df.columns]
+    key_positions = [df.columns.get_loc(column) for column in key_columns]
+    keys = []
+    hashes = []
+    seen = {}
+    for row_number, rows in value_chunks(df, max_chunk_cells):
+        # The first piece starts with the header
+        for row in (rows[1:] if row_number == 1 else rows):
+            key = repr([row[position] for position in key_positions])
+            seen[key] = seen.get(key, 0) + 1
+            keys.append(f"{key}#{seen[key]}")
+            hashes.append(hashlib.md5(repr(row).encode()).hexdigest())
+    return {"header": header, "keys": keys, "hashes": hashes}
+
+
+def plan_sheet_sync(previous, current):
+    """
+    Compares two snapshots of a tab.
+
+    Rows keep their place in the sheet: removed keys are deleted, rows whose hash changed are
+    rewritten where they are, and new keys are appended after the kept rows.
+
+    :return: (deleted, updated, inserted, snapshot) where `deleted` lists previous row positions,
+             `updated` lists (row position after the deletes, current row position) pairs,
+             `inserted` lists current row positions, and `snapshot` describes the tab afterwards.
+    """
+    current_positions = {key: position for position, key in enumerate(current['keys'])}
+    deleted = [position for position, key in enumerate(previous['keys']) if key not in current_positions]
+    kept = [(key, row_hash) for key, row_hash in zip(previous['keys'], previous['hashes']) if key in current_positions]
+    updated = [
+        (position, current_positions[key]) for position, (key, row_hash) in enumerate(kept)
+        if current['hashes'][current_positions[key]] != row_hash
+    ]
+    previous_keys = set(previous['keys'])
+    inserted = [position for position, key in enumerate(current['keys']) if key not in previous_keys]
 
-        # Convert DataFrame to list of lists for Google Sheets API
-        values = [df.columns.tolist()] + df.values.tolist()
+    keys = [key for key, _ in kept] + [current['keys'][position] for position in inserted]
+    snapshot = {
+        "header": current['header'],
+        "keys": keys,
+        "hashes": [current['hashes'][current_positions[key]] for key in keys],
+    }
+    return deleted, updated, inserted, snapshot
 
-        # Update the sheet with data
-        service.spreadsheets().values().update(
+
+def row_runs(positions):
+    """Groups sorted positions into (first, last) runs of consecutive positions."""
+    runs = []
+    for position in positions:
+        if runs and position == runs[-1][1] + 1:
+            runs[-1][1] = position
+        else:
+            runs.append([position, position])
+    return [tuple(run) for run in runs]
+
+
+def sync_google_sheet(service, spreadsheet_id, df, sheet_title, key_columns, snapshot_folder=SNAPSHOT_FOLDER,
+                      full=False, max_chunk_cells=MAX_CHUNK_CELLS, sheet_ids=None):
+    """
+    Brings a tab in line with a DataFrame by writing only the rows that changed since the last sync.
+
+    The local snapshot of the tab (see `sheet_snapshot`) is compared with the DataFrame:
+    removed rows are deleted with one batchUpdate of deleteDimension requests, and changed and
+    new rows are written with values.batchUpdate requests of at most `max_chunk_cells` cells.
+    The tab is rewritten in full (cleared and written from A1) when there is no snapshot, the
+    header changed, the tab is missing, or `full` is set. The snapshot is trusted: edits made
+    in the sheet by hand are not detected, and a failed sync drops it so the next run rewrites
+    the tab.
+
+    :param key_columns: Columns identifying a row, e.g. ['Contract Title'] or ['Empower TC Name'].
+    :param sheet_ids: Dictionary of tab title to sheetId, when the caller has read the metadata already
+                      (a tab added by a full rewrite is added to it).
+    :return: Dictionary with the 'inserted', 'updated' and 'deleted' row counts, 'requests' sent and
+             whether the tab was rewritten in 'full'.
+    """
+    current = sheet_snapshot(df, key_columns, max_chunk_cells)
+    previous = None if full else load_sheet_snapshot(spreadsheet_id, sheet_title, snapshot_folder)
+    if sheet_ids is None:
+        sheet_ids = read_sheet_ids(service, spreadsheet_id)
+
+    delete_sheet_snapshot(spreadsheet_id, sheet_title, snapshot_folder)
+    if previous is None or previous.get('header') != current['header'] or sheet_title not in sheet_ids:
+        prepare_sheets(service, spreadsheet_id, [sheet_title], sheet_ids)
+        requests_sent = write_sheet_values(service, spreadsheet_id, df, sheet_title, max_chunk_cells)
+        save_sheet_snapshot(spreadsheet_id, sheet_title, current, snapshot_folder)
+        print(f"Sheet '{sheet_title}' written in full ({len(df)} rows).")
+        return {"inserted": len(df), "updated": 0, "deleted": 0, "requests": requests_sent, "full": True}
+
+    deleted, updated, inserted, snapshot = plan_sheet_sync(previous, current)
+    requests_sent = 0
+    if deleted:
+        # Bottom-up, so earlier deletes do not shift the rows of later ones; row 0 is the header
+        service.spreadsheets().batchUpdate(
             spreadsheetId=spreadsheet_id,
-            range=f"{sheet_title}!A1",
-            valueInputOption="RAW",
-            body={"values": values},
+            body={"requests": [
+                {"deleteDimension": {"range": {
+                    "sheetId": sheet_ids[sheet_title], "dimension": "ROWS",
+                    "startIndex": first + 1, "endIndex": last + 2,
+                }}}
+                for first, last in reversed(row_runs(deleted))
+            ]},
+        ).execute()
+        requests_sent += 1
+
+    # Sheet row position (after the deletes) -> DataFrame row position
+    targets = dict(updated)
+    kept_count = len(previous['keys']) - len(deleted)
+    targets.update({kept_count + offset: position for offset, position in enumerate(inserted)})
+    formatted = formatted_datetimes(df)
+    data = []
+    data_cells = 0
+    for first, last in row_runs(sorted(targets)):
+        values = frame_values(df, [targets[position] for position in range(first, last + 1)], formatted)
+        data.append({"range": a1_range(sheet_title, f"A{first + 2}"), "values": values})
+        data_cells += len(values) * max(1, len(df.columns))
+        if data_cells >= max_chunk_cells:
+            service.spreadsheets().values().batchUpdate(
+                spreadsheetId=spreadsheet_id, body={"valueInputOption": "RAW", "data": data}
+            ).execute()
+            requests_sent += 1
+            data, data_cells = [], 0
+    if data:
+        service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id, body={"valueInputOption": "RAW", "data": data}
         ).execute()
+        requests_sent += 1
 
+    save_sheet_snapshot(spreadsheet_id, sheet_title, snapshot, snapshot_folder)
+    print(f"Sheet '{sheet_title}' synced: {len(inserted)} inserted, {len(updated)} updated, "
+          f"{len(deleted)} deleted.")
+    return {"inserted": len(inserted), "updated": len(updated), "deleted": len(deleted),
+            "requests": requests_sent, "full": False}
+
+
+def create_and_populate_google_sheet(service, spreadsheet_id, df, sheet_title):
+    """
+    Adds a new sheet or updates existing sheet in Google Spreadsheet and populates it with data.
+    :param service: Google Sheets API service object.
+    :param spreadsheet_id: ID of the Google Spreadsheet.
+    :param df: Pandas DataFrame containing the data.
+    :param sheet_title: Title for the sheet.
+    """
+    try:
+        prepare_sheets(service, spreadsheet_id, [sheet_title])
+        write_sheet_values(service, spreadsheet_id, df, sheet_title)
         print(f"Sheet '{sheet_title}' populated successfully.")
 
     except Exception as e:
         print(f"Error working with Google Sheet: {e}")
 
 
-def create_google_sheet(dataframes, sheet_titles, spreadsheet_name, spreadsheet_id=None):
+def create_google_sheet(dataframes, sheet_titles, spreadsheet_name, spreadsheet_id=None, service_factory=None,
+                        drive_service=None, max_workers=UPLOAD_WORKERS, sync_keys=None):
     """
     Creates a Google Spreadsheet with multiple sheets, each populated with a different DataFrame.
 
     :param dataframes: List of DataFrames.
     :param sheet_titles: List of sheet titles corresponding to each DataFrame.
     :param spreadsheet_name: Name for the new Google Spreadsheet.
+    :param spreadsheet_id: Existing spreadsheet to write to instead of creating one.
+    :param service_factory: Callable returning a Sheets service (defaults to the shared one, see google_clients).
+    :param drive_service: Drive service (defaults to the shared one).
+    :param max_workers: Requests in flight at the same time.
+    :param sync_keys: Dictionary of sheet title to key columns; those tabs are diff-synced
+                      (see `sync_google_sheet`) instead of rewritten.
     :return: ID of the created Google Spreadsheet.
     """
     if not dataframes or len(dataframes) != len(sheet_titles):
         print("DataFrames and sheet titles must be provided and match in length.")
         return None
 
-    # Set up Google Sheets API
-    scope = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive.file",
-    ]
-    creds = Credentials.from_service_account_file('credentials.json', scopes=scope)
-    service = build("sheets", "v4", credentials=creds)
+    # Shared, cached Google clients: one per worker thread, built once per process
+    if service_factory is None:
+        def service_factory():
+            return get_service("sheets", "v4")
+    service = service_factory()
 
     try:
         if not spreadsheet_id:
@@ -99,12 +448,14 @@ def create_google_sheet(dataframes, sheet_titles, spreadsheet_name, spreadsheet_
             ).execute()
             spreadsheet_id = spreadsheet["spreadsheetId"]
 
-        # Add each DataFrame to a separate sheet
-        for df, title in zip(dataframes, sheet_titles):
-            create_and_populate_google_sheet(service, spreadsheet_id, df, title)
+        # Add each DataFrame to a separate sheet; keyed tabs only get their changed rows. The
+        # metadata is read once for every tab, rewritten or synced
+        sheet_ids = read_sheet_ids(service, spreadsheet_id)
+        populate_google_sheets(service_factory, spreadsheet_id, dataframes, sheet_titles, max_workers=max_workers,
+                               sync_keys=sync_keys, sheet_ids=sheet_ids)
 
         # Set permissions to make the spreadsheet accessible
-        drive_service = build('drive', 'v3', credentials=creds)
+        drive_service = drive_service or get_service('drive', 'v3')
         permission_body = {
             'type': 'anyone',   # Makes it accessible to anyone
             'role': 'writer'    # Sets the permission to read-only
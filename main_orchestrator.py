@@ -1,9 +1,11 @@
+import importlib.util
 import logging
-import time
-from datetime import datetime
-import subprocess
-import sys
 import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 
 # Configure logging
 logging.basicConfig(
@@ -12,55 +14,260 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-class ScriptOrchestrator:
-    def __init__(self):
-        self.scripts = [
-            'main.py',
-            'tc_payroll/main.py',
-            'daily_contract_count/main.py',
-            'tc_daily_update/main.py'
-        ]
-        self.script_dir = os.path.dirname(os.path.abspath(__file__))
-
-    def run_script(self, script_name):
-        """Run a single Python script and return success status"""
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Report jobs run after ingest, in parallel: (task name, script, module name)
+REPORTS = [
+    ('tc_payroll', 'tc_payroll/main.py', 'tc_payroll_main'),
+    ('daily_contract_count', 'daily_contract_count/main.py', 'daily_contract_count_main'),
+    ('tc_daily_update', 'tc_daily_update/main.py', 'tc_daily_update_main'),
+]
+INGEST_TIMEOUT = 4 * 60 * 60
+REPORT_TIMEOUT = 60 * 60
+REPORT_RETRIES = 1
+
+
+@dataclass
+class Task:
+    """
+    One job of a run.
+
+    :param name: Task name; other tasks depend on it by this name.
+    :param func: Callable taking the results of the tasks it depends on (dictionary of task name to result).
+    :param depends_on: Names of the tasks that must succeed first.
+    :param timeout: Seconds one attempt may take, or None for no limit.
+    :param retries: Attempts made after a failed one.
+    """
+    name: str
+    func: object
+    depends_on: tuple = ()
+    timeout: float = None
+    retries: int = 0
+
+
+@dataclass
+class TaskResult:
+    """How a task ended: status is 'ok', 'failed', 'timeout' or 'skipped' (a dependency did not succeed)."""
+    name: str
+    status: str
+    stage: int
+    attempts: int = 0
+    started: float = None
+    seconds: float = 0.0
+    error: str = None
+    result: object = field(default=None, repr=False)
+
+
+def call_with_timeout(func, args, timeout):
+    """
+    Runs func(*args) and returns its result, raising TimeoutError when it takes longer than
+    `timeout` seconds. Python threads cannot be stopped, so a timed-out call is left running
+    in the background on a daemon thread.
+    """
+    if timeout is None:
+        return func(*args)
+    outcome = {}
+
+    def target():
         try:
-            script_path = os.path.join(self.script_dir, script_name)
-            logging.info(f"Starting {script_name}")
-            
-            # Run script using Python interpreter
-            process = subprocess.run(
-                [sys.executable, script_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            logging.info(f"Successfully completed {script_name}")
-            return True
-            
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Error running {script_name}: {str(e)}")
-            logging.error(f"Script output: {e.output}")
-            return False
-        except Exception as e:
-            logging.error(f"Unexpected error running {script_name}: {str(e)}")
-            return False
-
-    def run_sequence(self):
-        """Run all scripts in sequence"""
-        logging.info("Starting script sequence")
-        
-        for script in self.scripts:
-            success = self.run_script(script)
-            if not success:
-                logging.error(f"Sequence failed at {script}")
-                return False
-            
-        logging.info("Successfully completed full sequence")
-        return True
+            outcome['result'] = func(*args)
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"timed out after {timeout:g} seconds")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome.get('result')
+
+
+class DagOrchestrator:
+    """
+    Runs tasks in one process, each as soon as the tasks it depends on have succeeded.
+
+    Independent tasks run in parallel on worker threads, so they can share what an earlier
+    task loaded (e.g. the property dataset) instead of each reloading it. A failed attempt is
+    retried up to the task's `retries` after `retry_delay` seconds; a timed-out attempt is not
+    retried, since it may still be running. Tasks whose dependencies did not succeed are skipped.
+
+    :param tasks: List of Task.
+    :param max_workers: Tasks running at the same time.
+    """
+
+    def __init__(self, tasks, max_workers=3, retry_delay=5.0, sleep=time.sleep):
+        self.tasks = {}
+        for task in tasks:
+            if task.name in self.tasks:
+                raise ValueError(f"Duplicate task {task.name!r}")
+            self.tasks[task.name] = task
+        for task in tasks:
+            for dependency in task.depends_on:
+                if dependency not in self.tasks:
+                    raise ValueError(f"Task {task.name!r} depends on unknown task {dependency!r}")
+        self.stages = self.stage_numbers()
+        self.max_workers = max_workers
+        self.retry_delay = retry_delay
+        self.sleep = sleep
+
+    def stage_numbers(self):
+        """Stage of each task: 0 without dependencies, else one more than its latest dependency."""
+        stages = {}
+        visiting = set()
+
+        def stage(name):
+            if name not in stages:
+                if name in visiting:
+                    raise ValueError(f"Dependency cycle through task {name!r}")
+                visiting.add(name)
+                stages[name] = 1 + max((stage(dependency) for dependency in self.tasks[name].depends_on), default=-1)
+                visiting.discard(name)
+            return stages[name]
+
+        for name in self.tasks:
+            stage(name)
+        return stages
+
+    def run_task(self, task, inputs):
+        result = TaskResult(task.name, 'failed', self.stages[task.name], started=time.perf_counter())
+        while True:
+            result.attempts += 1
+            logging.info(f"Starting {task.name} (attempt {result.attempts})")
+            try:
+                result.result = call_with_timeout(task.func, (inputs,), task.timeout)
+                result.status = 'ok'
+                logging.info(f"Successfully completed {task.name}")
+                break
+            except TimeoutError as e:
+                result.status, result.error = 'timeout', str(e)
+                logging.error(f"Error running {task.name}: {e}")
+                break
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+                logging.error(f"Error running {task.name}: {result.error}")
+                if result.attempts > task.retries:
+                    break
+                self.sleep(self.retry_delay)
+        result.seconds = time.perf_counter() - result.started
+        return result
+
+    def run(self):
+        """
+        Runs every task.
+
+        :return: Dictionary of task name to TaskResult, in task order.
+        """
+        results = {}
+        pending = list(self.tasks.values())
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            while pending or running:
+                for task in list(pending):
+                    dependencies = [results.get(name) for name in task.depends_on]
+                    if any(dependency is None for dependency in dependencies):
+                        continue
+                    pending.remove(task)
+                    failed = [dependency.name for dependency in dependencies if dependency.status != 'ok']
+                    if failed:
+                        results[task.name] = TaskResult(task.name, 'skipped', self.stages[task.name],
+                                                        error=f"dependency failed: {', '.join(failed)}")
+                        logging.error(f"Skipping {task.name}: {results[task.name].error}")
+                        continue
+                    inputs = {dependency.name: dependency.result for dependency in dependencies}
+                    running[executor.submit(self.run_task, task, inputs)] = task
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    results[task.name] = future.result()
+        return {name: results[name] for name in self.tasks}
+
+    def summary(self, results, wall_seconds, quotas=None):
+        """
+        Run summary: every task's outcome and the wall time of each stage, then how each Google
+        API quota was used.
+
+        :param quotas: Dictionary of quota name to its metrics (see google_quota.QuotaScheduler.snapshot).
+        """
+        lines = [f"Run finished in {wall_seconds:.2f} seconds"]
+        for stage in sorted(set(self.stages.values())):
+            stage_results = [result for result in results.values() if result.stage == stage]
+            started = [result for result in stage_results if result.started is not None]
+            stage_seconds = (max(result.started + result.seconds for result in started) -
+                             min(result.started for result in started)) if started else 0.0
+            lines.append(f"  stage {stage}: {stage_seconds:.2f} seconds")
+            for result in stage_results:
+                line = f"    {result.name:<24} {result.status:<8} {result.seconds:8.2f}s  {result.attempts} attempt(s)"
+                lines.append(line + (f"  {result.error}" if result.error and result.status != 'ok' else ""))
+        if quotas:
+            lines.append("  Google API quotas:")
+        for quota, metrics in sorted((quotas or {}).items()):
+            lines.append(f"    {quota:<24} {metrics['requests']} requests, {metrics['retries']} retries, "
+                         f"{metrics['failures']} failures, throttled {metrics['throttle_wait_seconds']:.2f}s, "
+                         f"backed off {metrics['retry_wait_seconds']:.2f}s, max queue {metrics['max_queue_depth']}, "
+                         f"p95 latency {metrics['p95_latency_seconds']:.2f}s")
+        return "\n".join(lines)
+
+    def run_and_report(self):
+        """Runs every task, logs and prints the summary. :return: True when every task succeeded."""
+        logging.info("Starting run")
+        start_time = time.perf_counter()
+        from google_quota import get_scheduler
+
+        results = self.run()
+        summary = self.summary(results, time.perf_counter() - start_time, get_scheduler().snapshot())
+        logging.info(summary)
+        print(summary)
+        return all(result.status == 'ok' for result in results.values())
+
+
+def load_report_module(relative_path, name):
+    """Imports a report script (e.g. 'tc_payroll/main.py') as a module, with its folder importable as when run directly."""
+    script_path = os.path.join(BASE_DIR, relative_path)
+    if os.path.dirname(script_path) not in sys.path:
+        sys.path.append(os.path.dirname(script_path))
+    spec = importlib.util.spec_from_file_location(name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def report_task(name, module, dataset_task='dataset', timeout=REPORT_TIMEOUT, retries=REPORT_RETRIES):
+    """Task running a report module's `run_report` on the shared dataset; a report that wrote no spreadsheet fails."""
+    def run(inputs):
+        spreadsheet_id = module.run_report(inputs[dataset_task])
+        if spreadsheet_id is None:
+            raise RuntimeError(f"{name} did not write its spreadsheet")
+        return spreadsheet_id
+    return Task(name, run, depends_on=(dataset_task,), timeout=timeout, retries=retries)
+
+
+def build_report_tasks(ingest=None, dataset_path=None):
+    """
+    The daily run: ingest, then the property dataset loaded once, then every report in parallel on it.
+
+    :param ingest: Callable fetching the properties (defaults to main.run_pipeline).
+    :param dataset_path: Parquet glob of the properties (defaults to report_dataset.DATASET_PATTERN).
+    """
+    from report_dataset import DATASET_PATTERN, PropertyDataset
+
+    if ingest is None:
+        from main import run_pipeline as ingest
+    dataset_path = dataset_path or DATASET_PATTERN
+    tasks = [
+        Task('ingest', lambda inputs: ingest(), timeout=INGEST_TIMEOUT),
+        Task('dataset', lambda inputs: PropertyDataset(dataset_path), depends_on=('ingest',)),
+    ]
+    for name, relative_path, module_name in REPORTS:
+        tasks.append(report_task(name, load_report_module(relative_path, module_name)))
+    return tasks
 
 
 if __name__ == "__main__":
-    orchestrator = ScriptOrchestrator()
-    orchestrator.run_sequence()
\ No newline at end of file
+    # Report paths (datas/, tc_daily_update/...) are relative to the repository root
+    os.chdir(BASE_DIR)
+    orchestrator = DagOrchestrator(build_report_tasks(), max_workers=len(REPORTS))
+    sys.exit(0 if orchestrator.run_and_report() else 1)
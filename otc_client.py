@@ -0,0 +1,208 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_ROOT = "https://api.opentoclose.com/v1"
+
+# Status codes worth retrying: rate limiting and transient server-side failures
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class OTCAPIError(Exception):
+    """Raised when an OpenToClose request still fails after every retry."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls so no more than `max_rps` start per second
+    across every thread sharing the instance. `max_rps=None` disables the limit.
+    """
+
+    def __init__(self, max_rps=None):
+        self.interval = 1.0 / max_rps if max_rps else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return max(slot - now, 0.0)
+
+
+class ClientMetrics:
+    """Thread-safe counters describing how much retrying and waiting a client has done."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.retry_wait_seconds = 0.0
+        self.throttle_wait_seconds = 0.0
+        self.status_counts = {}
+
+    def record_response(self, status_code):
+        with self.lock:
+            self.requests += 1
+            self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+
+    def record_retry(self, wait_seconds):
+        with self.lock:
+            self.retries += 1
+            self.retry_wait_seconds += wait_seconds
+
+    def record_throttle(self, wait_seconds):
+        with self.lock:
+            self.throttle_wait_seconds += wait_seconds
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retries,
+                'failures': self.failures,
+                'retry_wait_seconds': round(self.retry_wait_seconds, 3),
+                'throttle_wait_seconds': round(self.throttle_wait_seconds, 3),
+                'status_counts': dict(self.status_counts),
+            }
+
+    def __str__(self):
+        stats = self.snapshot()
+        return (
+            f"{stats['requests']} requests, {stats['retries']} retries, {stats['failures']} failures, "
+            f"{stats['retry_wait_seconds']:.2f}s waiting on retries, "
+            f"{stats['throttle_wait_seconds']:.2f}s waiting on rate limit"
+        )
+
+
+def parse_retry_after(value):
+    """
+    Converts a Retry-After header (delta-seconds or HTTP-date) into seconds to wait.
+
+    :param value: Raw header value, or None.
+    :return: Seconds to wait, or None when the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class OTCClient:
+    """
+    Keep-alive HTTP client for the OpenToClose API shared by every fetcher.
+
+    Requests go through one pooled `requests.Session` (gzip negotiated), are paced by an
+    optional global rate limit, and are retried on connection errors, 429 and 5xx with
+    jittered exponential backoff. A Retry-After header, when present, overrides the backoff.
+    """
+
+    def __init__(self, pool_size=16, max_retries=5, backoff_base=0.5, backoff_max=60.0,
+                 max_rps=None, timeout=60, sleep=time.sleep):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.sleep = sleep
+        self.limiter = RateLimiter(max_rps)
+        self.metrics = ClientMetrics()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+    def backoff_delay(self, attempt):
+        # Full jitter: uniform over [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get_json(self, url, params=None):
+        """
+        GETs `url` and returns the decoded JSON body.
+
+        :param url: Endpoint URL.
+        :param params: Query parameters.
+        :return: Decoded JSON.
+        :raises OTCAPIError: When the request still fails after `max_retries` retries.
+        """
+        attempt = 0
+        while True:
+            self.metrics.record_throttle(self.limiter.wait())
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response = None
+                error = f"{type(e).__name__}: {e}"
+                status_code = None
+            else:
+                status_code = response.status_code
+                self.metrics.record_response(status_code)
+                if status_code == 200:
+                    return response.json()
+                error = f"API request failed with status code {status_code}"
+
+            retryable = response is None or status_code in RETRY_STATUS_CODES
+            if not retryable or attempt >= self.max_retries:
+                self.metrics.record_failure()
+                raise OTCAPIError(f"{error} ({url}, params={_redact(params)})", status_code)
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+            delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+            print(f"Retrying in {delay:.2f}s after: {error}")
+            self.metrics.record_retry(delay)
+            self.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self.session.close()
+
+
+def _redact(params):
+    if not params or "api_token" not in params:
+        return params
+    return {**params, "api_token": "***"}
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the process-wide client, creating it on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = OTCClient()
+        return _default_client
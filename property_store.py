@@ -0,0 +1,300 @@
+import glob
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+DATA_FOLDER = 'datas'
+# field_values makes rows wide (tens of KB each), so row groups are sized in the low
+# thousands to keep the write buffer bounded while still giving readers large scans
+DEFAULT_ROW_GROUP_SIZE = 2000
+MANIFEST_FILE = '_manifest.parquet'
+SYNC_STATE_FILE = '_sync_state.json'
+
+# Define a consistent schema
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("created", pa.string()),
+    ("timezone", pa.string()),
+    ("field_values", pa.string()),
+    ("team_id", pa.int64()),
+    ("team_name", pa.string()),
+    ("team_user_id", pa.int64()),
+    ("team_user_name", pa.string()),
+    ("agent_id", pa.int64()),  # Force `agent_id` to be int64
+    ("agent_name", pa.string()),
+    ("brokerage", pa.string()),
+    ("api_data", pa.string()),
+    ("inbound_email_address", pa.string()),
+])
+
+MANIFEST_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("content_hash", pa.string()),
+    ("created", pa.string()),
+])
+
+
+def records_to_table(records):
+    """
+    Converts raw /v1/properties records into an Arrow table matching SCHEMA.
+
+    :param records: List of property dictionaries as returned by the API.
+    :return: pyarrow.Table.
+    """
+    # Convert list of records to DataFrame
+    df = pd.DataFrame(records)
+
+    # Convert nested structures to JSON strings
+    for column in df.columns:
+        if df[column].dtype == "object":
+            df[column] = df[column].apply(
+                lambda x: json.dumps(x) if isinstance(x, (dict, list)) else x
+            )
+
+    # Standardize column types to match the schema
+    for field in SCHEMA:
+        column = field.name
+        if column in df.columns:
+            if pa.types.is_int64(field.type):
+                df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int64')
+            elif pa.types.is_string(field.type):
+                df[column] = df[column].astype('string')
+
+    # Convert DataFrame to PyArrow Table
+    return pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+
+
+def content_hash(record):
+    """Stable hash of a raw property record, used to detect changed properties."""
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def dataset_files(folder=DATA_FOLDER, filename_prefix="all_properties"):
+    return sorted(glob.glob(os.path.join(folder, f"{filename_prefix}_*.parquet")))
+
+
+def new_dataset_filename(folder=DATA_FOLDER, filename_prefix="all_properties"):
+    # Microsecond timestamps keep names in write order; the random suffix keeps them unique
+    # even when several files are written at the same instant
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    return os.path.join(folder, f"{filename_prefix}_{timestamp}_{uuid.uuid4().hex[:8]}.parquet")
+
+
+def load_manifest(folder=DATA_FOLDER):
+    """
+    Reads the per-property content hashes recorded by the last sync.
+
+    :param folder: Dataset folder.
+    :return: Dictionary of property id to (content hash, created); empty when no sync has run yet.
+    """
+    path = os.path.join(folder, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    table = pq.read_table(path)
+    return {
+        id_: (hash_, created)
+        for id_, hash_, created in zip(
+            table['id'].to_pylist(), table['content_hash'].to_pylist(), table['created'].to_pylist()
+        )
+    }
+
+
+def save_manifest(entries, folder=DATA_FOLDER):
+    """
+    Writes the manifest atomically.
+
+    :param entries: Dictionary of property id to (content hash, created).
+    :param folder: Dataset folder.
+    """
+    ids = list(entries)
+    table = pa.table({
+        'id': pa.array(ids, pa.int64()),
+        'content_hash': pa.array([entries[i][0] for i in ids], pa.string()),
+        'created': pa.array([entries[i][1] for i in ids], pa.string()),
+    }, schema=MANIFEST_SCHEMA)
+    path = os.path.join(folder, MANIFEST_FILE)
+    pq.write_table(table, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def load_sync_state(folder=DATA_FOLDER):
+    path = os.path.join(folder, SYNC_STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_sync_state(state, folder=DATA_FOLDER):
+    path = os.path.join(folder, SYNC_STATE_FILE)
+    with open(path + '.tmp', 'w') as file:
+        json.dump(state, file, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def full_sync_due(state, full_sync_interval_days):
+    last_full_sync = state.get('last_full_sync')
+    if not last_full_sync:
+        return True
+    if full_sync_interval_days is None:
+        return False
+    return (datetime.now() - datetime.fromisoformat(last_full_sync)).days >= full_sync_interval_days
+
+
+class DatasetWriter:
+    """
+    Streams property pages into a single Parquet file with row groups of `row_group_size` rows.
+
+    Pages are buffered and flushed as full row groups, so a crawl produces one file instead
+    of one tiny file per page. The file is written under a temporary name and only published
+    (optionally replacing the existing dataset files) when the writer is closed without error.
+    Use as a context manager.
+    """
+
+    def __init__(self, folder=DATA_FOLDER, filename_prefix="all_properties",
+                 row_group_size=DEFAULT_ROW_GROUP_SIZE, replace_existing=True):
+        self.folder = folder
+        self.filename_prefix = filename_prefix
+        self.row_group_size = row_group_size
+        self.replace_existing = replace_existing
+        self.path = new_dataset_filename(folder, filename_prefix)
+        self.buffer = []
+        self.buffered_rows = 0
+        self.rows = 0
+        self.writer = pq.ParquetWriter(self.path + '.tmp', SCHEMA, compression='snappy')
+
+    def write_records(self, records):
+        if records:
+            self.write_table(records_to_table(records))
+
+    def write_table(self, table):
+        if not table.num_rows:
+            return
+        self.buffer.append(table)
+        self.buffered_rows += table.num_rows
+        if self.buffered_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        table = pa.concat_tables(self.buffer)
+        self.writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows += table.num_rows
+        self.buffer = []
+        self.buffered_rows = 0
+
+    def close(self):
+        """Flushes the buffer and publishes the file; returns its path."""
+        self.flush()
+        self.writer.close()
+        superseded = dataset_files(self.folder, self.filename_prefix) if self.replace_existing else []
+        os.replace(self.path + '.tmp', self.path)
+        for path in superseded:
+            os.remove(path)
+        print(f"Written {self.rows} records to {self.path}"
+              + (f", replacing {len(superseded)} files" if superseded else ""))
+        return self.path
+
+    def abort(self):
+        self.writer.close()
+        os.remove(self.path + '.tmp')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def replace_dataset(new_path, folder=DATA_FOLDER, filename_prefix="all_properties",
+                    keep_existing=False, exclude_ids=(), row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Publishes `new_path` as the dataset, optionally merged over the existing dataset files.
+
+    With `keep_existing`, rows of the current dataset are carried over except those whose id
+    is in `exclude_ids` (stale versions of updated properties and deleted properties), which
+    gives upsert semantics. Everything is streamed through a DatasetWriter into one new file,
+    so readers never see a half-written dataset; the superseded files and `new_path` are
+    removed afterwards.
+
+    :param new_path: Parquet file holding the new or changed rows.
+    :param folder: Dataset folder.
+    :param filename_prefix: Dataset file prefix.
+    :param keep_existing: Merge over the existing dataset instead of replacing it.
+    :param exclude_ids: Property ids to drop from the existing dataset.
+    :param row_group_size: Rows per row group in the new file.
+    :return: Path of the new dataset file.
+    """
+    excluded = pa.array(sorted(exclude_ids), pa.int64())
+    with DatasetWriter(folder, filename_prefix, row_group_size) as writer:
+        for path in (dataset_files(folder, filename_prefix) if keep_existing else []):
+            table = pq.read_table(path, schema=SCHEMA)
+            if len(excluded):
+                table = table.filter(pc.invert(pc.is_in(table['id'], value_set=excluded)))
+            writer.write_table(table)
+        writer.write_table(pq.read_table(new_path, schema=SCHEMA))
+    os.remove(new_path)
+    return writer.path
+
+
+def compact_dataset(folder=DATA_FOLDER, filename_prefix="all_properties", row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Rewrites every dataset file in `folder` (e.g. one file per 50-record page left by older
+    runs) into a single file with `row_group_size`-row row groups.
+
+    Duplicate property ids are resolved in favour of the row from the newest file.
+
+    :param folder: Dataset folder.
+    :param filename_prefix: Dataset file prefix.
+    :param row_group_size: Rows per row group in the compacted file.
+    :return: Path of the compacted file, or None if there was nothing to compact.
+    """
+    paths = dataset_files(folder, filename_prefix)
+    if not paths:
+        print(f"No '{filename_prefix}_*.parquet' files found in '{folder}'.")
+        return None
+
+    # File names start with a sortable timestamp, so later files hold the newer copies.
+    # A first pass over the id column alone works out which rows newer files supersede,
+    # so the second pass can stream one file at a time.
+    seen_ids = set()
+    superseded_ids = {}
+    for path in reversed(paths):
+        ids = set(pq.read_table(path, columns=['id'])['id'].to_pylist())
+        superseded_ids[path] = ids & seen_ids
+        seen_ids |= ids
+
+    with DatasetWriter(folder, filename_prefix, row_group_size) as writer:
+        for path in paths:
+            table = pq.read_table(path, schema=SCHEMA)
+            if superseded_ids[path]:
+                excluded = pa.array(sorted(superseded_ids[path]), pa.int64())
+                table = table.filter(pc.invert(pc.is_in(table['id'], value_set=excluded)))
+            writer.write_table(table)
+    return writer.path
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintenance commands for the local property dataset.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compact_parser = subparsers.add_parser('compact', help='merge every dataset file into one compacted file')
+    compact_parser.add_argument('folder', nargs='?', default=DATA_FOLDER)
+    compact_parser.add_argument('--prefix', default='all_properties')
+    compact_parser.add_argument('--row-group-size', type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    args = parser.parse_args()
+
+    if args.command == 'compact':
+        compact_dataset(args.folder, args.prefix, args.row_group_size)
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import duckdb
+import pandas as pd
+
+from field_values import extract_fields
+
+# Where the property store keeps the raw dataset
+DATASET_PATTERN = 'datas/all_properties_*.parquet'
+
+
+class PropertyDataset:
+    """
+    Raw property rows loaded once per run and shared by every report job.
+
+    The Parquet files are scanned once into memory. field_values documents are parsed on
+    demand and each parsed field is kept, so reports asking for the same fields (the
+    transaction schema of tc_payroll and tc_daily_update) share one parse. Thread-safe: a
+    report asking for fields another one is parsing waits for that parse instead of repeating it.
+    """
+
+    def __init__(self, parquet_file_path=DATASET_PATTERN, df=None):
+        start_time = time.time()
+        if df is None:
+            conn = duckdb.connect(database=":memory:")
+            try:
+                df = conn.execute(f"SELECT * FROM read_parquet('{parquet_file_path}')").fetchdf()
+            finally:
+                conn.close()
+        self.df = df
+        self.parquet_file_path = parquet_file_path
+        self.lock = threading.Lock()
+        self.parsed = {}
+        print(f"Loaded {len(self.df)} properties from {parquet_file_path} in {time.time() - start_time:.2f} seconds")
+
+    def fields(self, fields, by='label'):
+        """
+        Field values of every property, as `field_values.extract_fields` returns them.
+
+        :param fields: Field labels (or keys, see `by`).
+        :param by: Item attribute to match fields on, 'label' or 'key'.
+        :return: pandas.DataFrame with one object column per field, indexed like the properties.
+        """
+        fields = list(dict.fromkeys(fields))
+        with self.lock:
+            missing = [field for field in fields if (by, field) not in self.parsed]
+            if missing:
+                extracted = extract_fields(self.df['field_values'], missing, by)
+                for field in missing:
+                    self.parsed[(by, field)] = extracted[field]
+            columns = {field: self.parsed[(by, field)] for field in fields}
+        return pd.DataFrame(columns, index=self.df.index, columns=fields)
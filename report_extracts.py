@@ -0,0 +1,218 @@
+import importlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from field_values import query_fields
+from report_dataset import DATASET_PATTERN, PropertyDataset
+from schemas import EXTRACT_CTC_TEAM_LIST, EXTRACT_PREFERRED_TEAM_LIST, get_registry
+
+# Windows: which dates of the date key a sheet keeps, relative to the run day
+#   last_month    - the previous calendar month
+#   current_month - the current calendar month
+#   next_month    - the following calendar month
+#   future        - the following calendar month and everything after it
+WINDOWS = ("last_month", "current_month", "next_month", "future")
+
+
+@dataclass(frozen=True)
+class ExtractSpec:
+    """
+    One extract sheet: the properties whose date key falls in a window, without field_values.
+
+    :param name: Script producing the sheet.
+    :param sheet_name: Title of the Google Sheet (the title prefix for close_paid_data).
+    :param date_key: Date field key the rows are filtered on; it is added as a column.
+    :param window: One of WINDOWS.
+    :param teams: Schema name of the team list to restrict to (schemas.EXTRACT_CTC_TEAM_LIST or
+                  schemas.EXTRACT_PREFERRED_TEAM_LIST), or None for every team.
+    :param statuses: Contract statuses to restrict to, or None.
+    :param client_type: Contract client type to restrict to, or None; contract_client_type is then added as a column.
+    :param flags: (column, status) pairs; each adds a boolean column, True where contract_status is that status.
+    """
+    name: str
+    sheet_name: str
+    date_key: str
+    window: str
+    teams: str = None
+    statuses: tuple = None
+    client_type: str = None
+    flags: tuple = ()
+
+
+# Every extract script's sheet. Adding a sheet here does not add a pass over the data.
+EXTRACT_SPECS = [
+    ExtractSpec("closing_data_current_month", "Closings-Current Month", "closing_date", "current_month"),
+    ExtractSpec("closing_data_preferred_seller", "Preferred - Seller Closed", "closing_date", "current_month",
+                EXTRACT_PREFERRED_TEAM_LIST, client_type="Seller"),
+    ExtractSpec("close_paid_data", "Closed Properties", "closing_date", "last_month", EXTRACT_CTC_TEAM_LIST,
+                flags=(("is_closed_paid", "CTC - Closed - PAID"),)),
+    ExtractSpec("data_last_month_compliance_paid_date", "Last Month Compliance Paid", "compliance_paid_date",
+                "last_month"),
+    ExtractSpec("data_last_month_compliance_started_empower", "Last Month Compliance Empower Started",
+                "compliance_started_with_empower", "last_month"),
+    ExtractSpec("data_last_month_listing_empower_started", "Last Month Listing Empower Started",
+                "listing_started_with_empower", "last_month"),
+    ExtractSpec("data_last_month_listing_paid", "Last Month Listing Paid", "listing_paid_date", "last_month"),
+    ExtractSpec("future_closing_data_ctc", "Future Closings-CTC, All Other Months", "closing_date", "future",
+                EXTRACT_CTC_TEAM_LIST),
+    ExtractSpec("future_closing_data_ctc_next_month", "Future Closings-CTC, Next Month", "closing_date",
+                "next_month", EXTRACT_CTC_TEAM_LIST),
+    ExtractSpec("future_closing_data_prefered", "Future Closings-Preferred, All Other Months", "closing_date",
+                "future", EXTRACT_PREFERRED_TEAM_LIST),
+    ExtractSpec("future_closing_data_preferred_next_month", "Future Closings-Preferred, Next Month", "closing_date",
+                "next_month", EXTRACT_PREFERRED_TEAM_LIST),
+]
+
+
+def extract_spec(name):
+    """The ExtractSpec of a script, by script name."""
+    for spec in EXTRACT_SPECS:
+        if spec.name == name:
+            return spec
+    raise KeyError(f"No extract spec named {name!r}")
+
+
+def window_bounds(window, today):
+    """
+    Dates a window covers, as a [start, end) pair of midnights (end is None for 'future').
+
+    Whole days are compared, so a date on the first day of the window is kept whatever the
+    time of day the report runs at.
+    """
+    if window not in WINDOWS:
+        raise ValueError(f"window must be one of {WINDOWS}, got: {window}")
+    first_of_month = datetime(today.year, today.month, 1)
+    first_of_next_month = (first_of_month + timedelta(days=32)).replace(day=1)
+    if window == "last_month":
+        return (first_of_month - timedelta(days=1)).replace(day=1), first_of_month
+    if window == "current_month":
+        return first_of_month, first_of_next_month
+    if window == "next_month":
+        return first_of_next_month, (first_of_next_month + timedelta(days=32)).replace(day=1)
+    return first_of_next_month, None
+
+
+def spec_keys(spec):
+    """Field keys a spec needs parsed out of field_values."""
+    keys = [spec.date_key]
+    if spec.client_type is not None:
+        keys.append("contract_client_type")
+    if spec.statuses is not None or spec.flags:
+        keys.append("contract_status")
+    return keys
+
+
+def parse_extract_fields(dataset, specs=EXTRACT_SPECS):
+    """
+    Extracts every field the specs need in one DuckDB pass over the dataset (see
+    field_values.query_fields); the documents are not parsed in Python.
+
+    :return: pandas.DataFrame with one column per field key, indexed like the properties.
+    """
+    keys = [key for spec in specs for key in spec_keys(spec)]
+    fields = query_fields(dataset.df, keys, by="key", columns=())
+    fields.index = dataset.df.index
+    return fields
+
+
+def extract_reports(specs, dataset, today=None):
+    """
+    Builds the rows of several extract sheets from one parse of the dataset.
+
+    The fields of all specs are extracted together and each date key converted once; every
+    distinct window, team list (read through the schema registry), status set and client
+    type is matched once and shared by the specs using it. Each sheet has the top-level
+    property columns (without field_values) followed by the spec's extracted columns, with
+    datetimes formatted as strings.
+
+    :param specs: List of ExtractSpec.
+    :param dataset: report_dataset.PropertyDataset.
+    :param today: Day the windows are relative to (defaults to now).
+    :return: Dictionary of spec name to pandas.DataFrame (empty when nothing matches).
+    """
+    today = today or datetime.now()
+    fields = parse_extract_fields(dataset, specs)
+    df = dataset.df
+    dates = {}
+    masks = {}
+
+    def parsed_date(key):
+        if key not in dates:
+            dates[key] = pd.to_datetime(fields[key], errors="coerce")
+        return dates[key]
+
+    def mask(kind, value, build):
+        if (kind, value) not in masks:
+            masks[(kind, value)] = np.asarray(build(), dtype=bool)
+        return masks[(kind, value)]
+
+    def window_mask(key, window):
+        start, end = window_bounds(window, today)
+        values = parsed_date(key)
+        selected = values >= start
+        if end is not None:
+            selected &= values < end
+        return selected
+
+    column_positions = [index for index, name in enumerate(df.columns) if name != "field_values"]
+    results = {}
+    for spec in specs:
+        selected = mask("window", (spec.date_key, spec.window), lambda: window_mask(spec.date_key, spec.window))
+        if spec.teams is not None:
+            selected = selected & mask("teams", spec.teams,
+                                       lambda: df["team_name"].isin(get_registry().columns(spec.teams)))
+        if spec.statuses is not None:
+            selected = selected & mask("statuses", frozenset(spec.statuses),
+                                       lambda: fields["contract_status"].isin(spec.statuses))
+        if spec.client_type is not None:
+            selected = selected & mask("client_type", spec.client_type,
+                                       lambda: fields["contract_client_type"] == spec.client_type)
+        rows = np.flatnonzero(selected)
+
+        frame = df.iloc[rows, column_positions].copy()
+        frame[spec.date_key] = parsed_date(spec.date_key).to_numpy()[rows]
+        if spec.client_type is not None:
+            frame["contract_client_type"] = fields["contract_client_type"].to_numpy()[rows]
+        for column, status in spec.flags:
+            frame[column] = mask("status", status, lambda: fields["contract_status"] == status)[rows]
+
+        # Convert datetime columns to string
+        for col in frame.select_dtypes(include=["datetime64"]).columns:
+            frame[col] = frame[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+        results[spec.name] = frame
+    return results
+
+
+def extract_report(spec, dataset, today=None):
+    """Rows of one extract sheet (see extract_reports)."""
+    return extract_reports([spec], dataset, today)[spec.name]
+
+
+def run_extract_reports(dataset=None, parquet_file_path=DATASET_PATTERN, names=None):
+    """
+    Creates every extract sheet from one load and one parse of the dataset.
+
+    The rows of all sheets are extracted together (see extract_reports), then each script
+    creates its sheet from its rows as when run on its own.
+
+    :param dataset: report_dataset.PropertyDataset; loaded from `parquet_file_path` when None.
+    :param names: Scripts to run (defaults to every spec in EXTRACT_SPECS).
+    :return: Dictionary of script name to what its read_parquet_and_create_google_sheets returned.
+    """
+    specs = [spec for spec in EXTRACT_SPECS if names is None or spec.name in names]
+    dataset = dataset or PropertyDataset(parquet_file_path)
+    extracted = extract_reports(specs, dataset)
+    results = {}
+    for spec in specs:
+        module = importlib.import_module(spec.name)
+        results[spec.name] = module.read_parquet_and_create_google_sheets(
+            dataset.parquet_file_path, spec.sheet_name, rows=extracted[spec.name]
+        )
+    return results
+
+
+if __name__ == "__main__":
+    run_extract_reports()
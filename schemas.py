@@ -0,0 +1,222 @@
+import csv
+import os
+import sys
+import threading
+from dataclasses import dataclass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Column lists, by schema name
+TRX_ORDER = 'trx_order'
+TRX_DATE_COLUMNS = 'trx_date_columns'
+TRX_FILLNA_0 = 'trx_columns_need_fillna_0'
+TRX_FILLNA_NONE = 'trx_columns_need_fillna_none'
+TRANSACTION_SOURCE = 'transaction_source'
+DAILY_UPDATE_SOURCE = 'daily_update_source'
+AGENT_ACCOUNT_SOURCE = 'agent_account_source'
+CTC_TEAM_LIST = 'ctc_teams'
+PREFERRED_TEAM_LIST = 'preferred_teams'
+EXTRACT_CTC_TEAM_LIST = 'extract_ctc_teams'
+EXTRACT_PREFERRED_TEAM_LIST = 'extract_preferred_teams'
+
+# Where each list is looked for, relative to every folder of the search path; the first file found wins
+SCHEMA_FILES = {
+    TRX_ORDER: ('trx_order.csv',),
+    TRX_DATE_COLUMNS: ('trx_date_columns.csv',),
+    TRX_FILLNA_0: ('trx_columns_need_fillna_0.csv',),
+    TRX_FILLNA_NONE: ('trx_columns_need_fillna_none.csv',),
+    TRANSACTION_SOURCE: ('Columns_Transaction_Source.csv', os.path.join('tc_daily_update', 'Columns_Transaction_Source.csv')),
+    DAILY_UPDATE_SOURCE: (os.path.join('tc_daily_update', 'Columns_Transaction_Source.csv'),),
+    AGENT_ACCOUNT_SOURCE: ('Columns_Agent_Account_Source.csv',),
+    CTC_TEAM_LIST: ('ctc_teams.csv', os.path.join('daily_contract_count', 'ctc_teams.csv')),
+    PREFERRED_TEAM_LIST: ('preferred_teams.csv', os.path.join('daily_contract_count', 'preferred_teams.csv')),
+    # The extract sheets' own team lists, committed with the repository
+    EXTRACT_CTC_TEAM_LIST: ('extract_ctc_teams.csv',),
+    EXTRACT_PREFERRED_TEAM_LIST: ('extract_preferred_teams.csv',),
+}
+# Lists of field labels, checked against the labels of the dataset by `validate`
+LABEL_SCHEMAS = (TRANSACTION_SOURCE, DAILY_UPDATE_SOURCE, AGENT_ACCOUNT_SOURCE)
+# Folders searched before the repository, separated by os.pathsep
+SCHEMA_PATH_VARIABLE = 'OTC_SCHEMA_PATH'
+
+# Kinds of the formatted transaction columns and their pandas dtypes
+DTYPES = {'date': 'datetime64[ns]', 'number': 'float64', 'string': 'object'}
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """
+    One column of the formatted transaction table (trx_order.csv).
+
+    :param name: Column name.
+    :param kind: One of DTYPES: 'date' (trx_date_columns.csv), 'number' (trx_columns_need_fillna_0.csv)
+                 or 'string'.
+    :param fill: Value missing and '' values are replaced with: 0 (trx_columns_need_fillna_0.csv),
+                 'none' (trx_columns_need_fillna_none.csv) or None. Dates are filled with the na_filler
+                 of the module formatting them.
+    """
+    name: str
+    kind: str = 'string'
+    fill: object = None
+
+    @property
+    def dtype(self):
+        return DTYPES[self.kind]
+
+
+def schema_search_path():
+    """Folders the column lists are looked for in: OTC_SCHEMA_PATH, then the repository."""
+    folders = [folder for folder in os.getenv(SCHEMA_PATH_VARIABLE, '').split(os.pathsep) if folder]
+    return folders + [BASE_DIR]
+
+
+class SchemaRegistry:
+    """
+    The CSV column lists, read once per process.
+
+    Paths are resolved against `search_path` rather than the working directory, so the reports
+    find their lists wherever they are run from. Each list is read on first use and kept;
+    the typed transaction columns and their dtype map are built once from them. Thread-safe.
+
+    :param search_path: Folders to look for the lists in (defaults to `schema_search_path()`).
+    """
+
+    def __init__(self, search_path=None):
+        self.search_path = list(search_path or schema_search_path())
+        # Reentrant: transaction_columns reads the lists it is built from while holding it
+        self.lock = threading.RLock()
+        self.lists = {}
+        self.transaction_specs = None
+
+    def path(self, name):
+        """
+        Path of a column list.
+
+        :raises KeyError: For an unknown schema name.
+        :raises FileNotFoundError: When no folder of the search path has the list.
+        """
+        candidates = SCHEMA_FILES[name]
+        for folder in self.search_path:
+            for candidate in candidates:
+                path = os.path.join(folder, candidate)
+                if os.path.exists(path):
+                    return path
+        raise FileNotFoundError(f"No {' or '.join(candidates)} for schema {name!r} in {', '.join(self.search_path)}")
+
+    def columns(self, name):
+        """The entries of a column list (first CSV column of every non-empty row), as a tuple."""
+        with self.lock:
+            if name not in self.lists:
+                with open(self.path(name), newline='') as file:
+                    rows = csv.reader(file)
+                    self.lists[name] = tuple(row[0] for row in rows if row)
+            return self.lists[name]
+
+    def transaction_columns(self):
+        """
+        Typed columns of the formatted transaction table, in trx_order.csv order.
+
+        :raises ValueError: When a date or fill list names a column missing from trx_order.csv.
+        """
+        with self.lock:
+            if self.transaction_specs is None:
+                order = self.columns(TRX_ORDER)
+                dates = set(self.columns(TRX_DATE_COLUMNS))
+                fill_0 = set(self.columns(TRX_FILLNA_0))
+                fill_none = set(self.columns(TRX_FILLNA_NONE))
+                for name, listed in ((TRX_DATE_COLUMNS, dates), (TRX_FILLNA_0, fill_0), (TRX_FILLNA_NONE, fill_none)):
+                    unknown = sorted(listed.difference(order))
+                    if unknown:
+                        raise ValueError(f"Schema {name!r} lists columns missing from {TRX_ORDER!r}: {unknown}")
+                self.transaction_specs = tuple(
+                    ColumnSpec(
+                        column,
+                        'date' if column in dates else 'number' if column in fill_0 else 'string',
+                        0 if column in fill_0 else 'none' if column in fill_none else None,
+                    )
+                    for column in order
+                )
+            return self.transaction_specs
+
+    def transaction_dtypes(self):
+        """Dictionary of transaction column to its pandas dtype (see DTYPES)."""
+        return {spec.name: spec.dtype for spec in self.transaction_columns()}
+
+    def validate(self, labels, names=LABEL_SCHEMAS):
+        """
+        Checks lists of field labels against the labels seen in the dataset and prints what does
+        not match (a misspelt or renamed label is otherwise an empty column).
+
+        :param labels: Field labels present in the dataset (see `observed_labels`).
+        :param names: Schemas to check; lists that cannot be found are reported and skipped.
+        :return: Dictionary of schema name to its entries that are not labels of any property.
+        """
+        labels = set(labels)
+        unknown = {}
+        for name in names:
+            try:
+                columns = self.columns(name)
+            except OSError as e:
+                print(f"Schema {name}: {e}")
+                continue
+            unknown[name] = [column for column in columns if column not in labels]
+            if unknown[name]:
+                print(f"Schema {name} ({self.path(name)}): {len(unknown[name])} of {len(columns)} columns are "
+                      f"not field labels of any property: {unknown[name]}")
+        return unknown
+
+
+def observed_labels(source, conn=None):
+    """
+    Field labels present in the properties, extracted in DuckDB.
+
+    :param source: Parquet path or glob of the raw property dataset, or a DataFrame of raw properties.
+    :param conn: DuckDB connection (a temporary in-memory one is used otherwise).
+    :return: Set of labels.
+    """
+    import duckdb
+    from field_values import PROPERTIES_VIEW, quote_literal
+
+    frame = None if isinstance(source, str) else source
+    table = PROPERTIES_VIEW if frame is not None else f"read_parquet({quote_literal(source)})"
+    sql = (f"SELECT DISTINCT label FROM (SELECT unnest(json_extract_string(field_values, '$[*].label')) AS label "
+           f"FROM {table}) WHERE label IS NOT NULL")
+    own_conn = conn is None
+    conn = conn or duckdb.connect(database=":memory:")
+    try:
+        if frame is not None:
+            conn.register(PROPERTIES_VIEW, frame[['field_values']])
+        return {row[0] for row in conn.execute(sql).fetchall()}
+    finally:
+        if own_conn:
+            conn.close()
+        elif frame is not None:
+            conn.unregister(PROPERTIES_VIEW)
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Returns the process-wide registry, creating it on first use."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = SchemaRegistry()
+        return _default_registry
+
+
+def set_registry(registry):
+    """Replaces the process-wide registry (e.g. with one searching other folders); returns the previous one."""
+    global _default_registry
+    with _default_registry_lock:
+        previous, _default_registry = _default_registry, registry
+        return previous
+
+
+if __name__ == '__main__':
+    # python schemas.py [dataset glob]: checks the label lists against the property dataset
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(BASE_DIR, 'datas', 'all_properties_*.parquet')
+    problems = get_registry().validate(observed_labels(source))
+    sys.exit(1 if any(problems.values()) else 0)
@@ -0,0 +1,200 @@
+import os
+import shutil
+import time
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from field_values import quote_identifier, quote_literal, typed_array
+from property_store import DATA_FOLDER
+from schemas import get_registry
+
+STAGING_FOLDER = os.path.join(DATA_FOLDER, 'staging')
+# Tables of data_preparation.create_staging_layer, in the order it returns them
+STAGING_TABLES = ('transaction', 'error_transaction', 'agent_account', 'duplicated_agent_account')
+# Each table is a folder of Hive partitions (created_month=YYYY-MM) by the month of its Date Created
+PARTITION_COLUMN = 'created_month'
+# Partition holding the schema-only file of a table without rows
+EMPTY_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+CREATED_COLUMN = 'Date Created'
+# Amounts apply_staging_rules computes with that are not in the fillna_0 list
+AMOUNT_COLUMNS = ['Billing Amount', 'Other Amount']
+
+
+def staging_column_types():
+    """
+    Storage type of the typed staging columns: 'date' (timestamp) or 'number' (float64), from
+    the typed transaction columns of the schema registry. Every other column is stored as a string.
+    """
+    column_types = {CREATED_COLUMN: 'date'}
+    column_types.update((spec.name, spec.kind) for spec in get_registry().transaction_columns() if spec.kind != 'string')
+    column_types.update((column, 'number') for column in AMOUNT_COLUMNS)
+    return column_types
+
+
+def typed_staging_table(df, column_types):
+    """
+    Converts a staging DataFrame into a typed Arrow table with its partition column.
+
+    Dates (datetime64 already in the formatted transactions, raw strings in the other tables)
+    become timestamps, numbers float64 and everything else strings; values that do not parse
+    as their type become null. The index is not kept.
+
+    :param df: One of the create_staging_layer tables.
+    :param column_types: Dictionary of column to 'date' or 'number' (see staging_column_types).
+    :return: pyarrow.Table.
+    """
+    arrays = []
+    fields = []
+    for column in df.columns:
+        values = df[column]
+        column_type = column_types.get(column)
+        if column_type == 'date':
+            dates = pd.to_datetime(values, errors='coerce', format='mixed')
+            arrays.append(pa.array(dates, type=pa.timestamp('us'), from_pandas=True))
+            fields.append(pa.field(column, pa.timestamp('us')))
+        else:
+            # Missing values (None, NaN from the agent-account join) are stored as null
+            arrays.append(typed_array(values.astype(object).where(values.notna(), None).tolist(), column_type))
+            fields.append(pa.field(column, pa.float64() if column_type == 'number' else pa.string()))
+    created = pd.to_datetime(df[CREATED_COLUMN], errors='coerce')
+    arrays.append(pa.array(created.dt.strftime('%Y-%m'), type=pa.string(), from_pandas=True))
+    fields.append(pa.field(PARTITION_COLUMN, pa.string()))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def table_folder(name, folder=STAGING_FOLDER):
+    if name not in STAGING_TABLES:
+        raise ValueError(f"name must be one of {STAGING_TABLES}, got: {name}")
+    return os.path.join(folder, name)
+
+
+def save_staging_tables(tables, folder=STAGING_FOLDER):
+    """
+    Persists the staging tables as typed Parquet, partitioned by month of Date Created.
+
+    Each table is written to a temporary folder which then replaces the previous one, so
+    readers never see a half-written table. A table without rows is stored as one empty
+    typed file, so it still reads back with its columns.
+
+    :param tables: Dictionary of STAGING_TABLES name to DataFrame (create_staging_layer's tables).
+    :param folder: Staging store folder.
+    """
+    start_time = time.time()
+    column_types = staging_column_types()
+    os.makedirs(folder, exist_ok=True)
+    for name, df in tables.items():
+        path = table_folder(name, folder)
+        table = typed_staging_table(df, column_types)
+        for stale in (path + '.tmp', path + '.old'):
+            shutil.rmtree(stale, ignore_errors=True)
+        if table.num_rows:
+            # Rows keep their staging order within each month
+            pq.write_to_dataset(table, path + '.tmp', partition_cols=[PARTITION_COLUMN],
+                                basename_template='part-{i}.parquet')
+        else:
+            # write_to_dataset writes nothing for no rows; an empty typed file keeps the table readable
+            empty_partition = os.path.join(path + '.tmp', f'{PARTITION_COLUMN}={EMPTY_PARTITION}')
+            os.makedirs(empty_partition)
+            pq.write_table(table.drop_columns([PARTITION_COLUMN]), os.path.join(empty_partition, 'part-0.parquet'))
+        # The previous table is only moved aside once the new one is complete
+        if os.path.exists(path):
+            os.replace(path, path + '.old')
+        os.replace(path + '.tmp', path)
+        shutil.rmtree(path + '.old', ignore_errors=True)
+        months = len(table[PARTITION_COLUMN].unique())
+        print(f"Staging store: {len(df)} rows of {name} in {months} months")
+    print(f"Staging store written to {folder} in {time.time() - start_time:.2f} seconds")
+
+
+def staging_source(name, folder=STAGING_FOLDER):
+    """DuckDB read_parquet call over a staging table, with its partition column."""
+    pattern = os.path.join(table_folder(name, folder), '*', '*.parquet')
+    return f"read_parquet({quote_literal(pattern)}, hive_partitioning = true, hive_types = {{'{PARTITION_COLUMN}': VARCHAR}})"
+
+
+def staging_connection(folder=STAGING_FOLDER, conn=None):
+    """
+    DuckDB connection with one view per persisted staging table (named as in STAGING_TABLES),
+    for reports that query the staging layer in SQL. Filters on created_month only read the
+    matching partitions.
+    """
+    conn = conn or duckdb.connect(database=":memory:")
+    for name in STAGING_TABLES:
+        if os.path.isdir(table_folder(name, folder)):
+            conn.execute(f"CREATE OR REPLACE VIEW {quote_identifier(name)} AS SELECT * FROM {staging_source(name, folder)}")
+    return conn
+
+
+def read_staging_table(name, columns=None, months=None, folder=STAGING_FOLDER):
+    """
+    Reads a persisted staging table into pandas, in staging order (newest Date Created first).
+
+    :param name: One of STAGING_TABLES.
+    :param columns: Columns to load; None for all.
+    :param months: 'YYYY-MM' months of Date Created to load; None for all. Other months are not read.
+    :param folder: Staging store folder.
+    :return: pandas.DataFrame with datetime64[ns] dates, float64 numbers and object strings.
+    """
+    selected = '*' if columns is None else ', '.join(quote_identifier(column) for column in
+                                                     dict.fromkeys(list(columns) + [CREATED_COLUMN]))
+    query = f"SELECT {selected} FROM {staging_source(name, folder)}"
+    if months is not None:
+        query += f" WHERE {PARTITION_COLUMN} IN ({', '.join(quote_literal(month) for month in months) or 'NULL'})"
+    conn = duckdb.connect(database=":memory:")
+    try:
+        df = conn.execute(query).fetchdf()
+    finally:
+        conn.close()
+    df = df.drop(columns=PARTITION_COLUMN, errors='ignore')
+    for column in df.columns[df.dtypes.map(pd.api.types.is_datetime64_any_dtype)]:
+        df[column] = df[column].astype('datetime64[ns]')
+    # Partitions are read oldest month first; the stable sort keeps the staging order within a month
+    df = df.sort_values(CREATED_COLUMN, ascending=False, kind='mergesort', ignore_index=True)
+    return df if columns is None else df[list(columns)]
+
+
+# Columns of the monthly summary: rows counted per staging table
+SUMMARY_COUNT_COLUMNS = {
+    'transaction': 'Transactions',
+    'error_transaction': 'Error Transactions',
+    'agent_account': 'Agent Accounts',
+    'duplicated_agent_account': 'Duplicated Agent Accounts',
+}
+
+
+def monthly_staging_summary(folder=STAGING_FOLDER):
+    """
+    Rows of every persisted staging table per month of Date Created, and the transactions'
+    Billing Amount, newest month first. Counted in DuckDB from the store, without loading the
+    tables into pandas.
+
+    :param folder: Staging store folder.
+    :return: pandas.DataFrame with a Month column, one count column per table (see SUMMARY_COUNT_COLUMNS)
+             and Billing Amount.
+    """
+    conn = staging_connection(folder)
+    try:
+        views = {row[0] for row in conn.execute("SELECT view_name FROM duckdb_views() WHERE NOT internal").fetchall()}
+        tables = [name for name in STAGING_TABLES if name in views]
+        if not tables:
+            return pd.DataFrame(columns=['Month', *SUMMARY_COUNT_COLUMNS.values(), 'Billing Amount'])
+        # Only the transactions have an amount to sum
+        amounts = {name: quote_identifier('Billing Amount') if name == 'transaction' else 'NULL::DOUBLE' for name in tables}
+        rows = " UNION ALL ".join(
+            f"SELECT {quote_literal(name)} AS name, {PARTITION_COLUMN} AS month, {amounts[name]} AS amount "
+            f"FROM {quote_identifier(name)}"
+            for name in tables
+        )
+        counts = ", ".join(
+            f"count(*) FILTER (WHERE name = {quote_literal(name)}) AS {quote_identifier(title)}"
+            for name, title in SUMMARY_COUNT_COLUMNS.items()
+        )
+        return conn.execute(
+            f"SELECT month AS \"Month\", {counts}, coalesce(sum(amount), 0) AS \"Billing Amount\" "
+            f"FROM ({rows}) GROUP BY month ORDER BY month DESC NULLS LAST"
+        ).fetchdf()
+    finally:
+        conn.close()
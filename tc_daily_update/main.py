@@ -1,7 +1,6 @@
 import duckdb
-import csv
+import numpy as np
 import pandas as pd
-import json
 import logging
 from datetime import datetime
 import time
@@ -12,6 +11,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from gsheetapi import *
+from field_values import extract_fields
+from schemas import DAILY_UPDATE_SOURCE, get_registry
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -21,16 +22,72 @@ logger = logging.getLogger(__name__)
 
 na_filler = datetime(1990, 1, 1, 0, 0, 0)
 
+CTC_CONTRACT_STATUS = (
+    'CTC - Closed - PAID', 'CTC - Pending', 'CTC - PAID',
+    'CTC - Terminated - No Charge', 'CTC - Withdrawn',
+    'CTC - Terminated - Compliance - PAID'
+)
 
-def extract_field_values(field_values, label):
-    try:
-        values = json.loads(field_values)
-        for item in values:
-            if isinstance(item, dict) and item.get("label") == label:
-                return item.get("value")
-    except json.JSONDecodeError:
-        pass
-    return None
+PREFERRED_CONTRACT_STATUS = (
+    'CTC - Preferred - Closed - PAID', 'CTC - Preferred - Pending',
+    'CTC - Preferred - PAID', 'CTC - Preferred - Terminated - No Change',
+    'CTC - Preferred - Withdrawn'
+)
+
+LOST_AGENTS_RETURN_TO_SALES = (
+    'Lost  Reassigned', 'Lost  Left Empower', 'Return to Sales',
+    'Lost - Do Not Contact', 'Lost  Do Not Contact', 'Lost - Left Empower',
+    'Lost  Left Empower', 'Lost - Reassigned'
+)
+
+DATE_COLUMNS = [
+    'CTC Started with Empower', 'Closing', 'Listing Started with Empower', 'Listing PAID Date',
+    'Compliance Started with Empower', 'Offer Started with Empower', 'Onboard Call Complete Date',
+    '1st Transaction Date'
+]
+
+REPORT_COLUMNS = [
+    'Empower TC Name',
+    'Total ACTIVE Files - CTC',
+    'Total ACTIVE Files - CTC Preferred',
+    'CTC Started for this month', 'CTC - Preferred Started',
+    'Closings for this month', 'CTC - Preferred Closings',
+    'CTC Pending for this month', 'CTC - Preferred Pending for this month',
+    'CTC Pending for next month', 'CTC - Preferred Pending for next month',
+    'CTC Pending for other months', 'CTC - Preferred Pending for other months',
+    'Offers Started this month', 'Compliance Started this month',
+    'Listing Started', 'Listing PAID', 'TC Generated Agents',
+    'SALES Generated Agents', 'TOTAL Agents', '1st Transaction Agents',
+    'Lost Agents/return to Sales', 'OB for This Month', '1st Transactions for This Month'
+]
+
+# (date column a record is bucketed by, column matched against the TC names, flags counted);
+# a record counts towards the period its bucket date falls in
+REPORT_BLOCKS = [
+    ('CTC Started with Empower', 'Empower TC Name', ['CTC Started for this month', 'CTC - Preferred Started']),
+    ('Closing', 'Empower TC Name', [
+        'Total ACTIVE Files - CTC', 'Total ACTIVE Files - CTC Preferred',
+        'Closings for this month', 'CTC - Preferred Closings',
+        'CTC Pending for this month', 'CTC - Preferred Pending for this month',
+        'CTC Pending for next month', 'CTC - Preferred Pending for next month',
+        'CTC Pending for other months', 'CTC - Preferred Pending for other months'
+    ]),
+    ('Listing Started with Empower', 'Empower TC Name', ['Listing Started']),
+    ('Listing PAID Date', 'Empower TC Name', ['Listing PAID']),
+    ('Offer Started with Empower', 'Empower TC Name', ['Offers Started this month']),
+    ('Compliance Started with Empower', 'Empower TC Name', ['Compliance Started this month']),
+    ('Onboard Call Complete Date', 'Transaction Coordinator', ['OB for This Month', '1st Transactions for This Month']),
+]
+
+# Counted for every period starting on or after the onboard call, by Transaction Coordinator
+AGENT_COLUMNS = [
+    'TC Generated Agents', 'SALES Generated Agents', 'TOTAL Agents',
+    '1st Transaction Agents', 'Lost Agents/return to Sales'
+]
+
+
+def read_main_source_schema():
+    return list(get_registry().columns(DAILY_UPDATE_SOURCE))
 
 
 def generate_source(properties_file_path):
@@ -42,15 +99,10 @@ def generate_source(properties_file_path):
 
         # Main Data Source
         logger.info('Generating Main Data Source...')
-        main_source_schema = list()
-        with open('tc_daily_update/Columns_Transaction_Source.csv') as file:
-            rows = csv.reader(file)
-            for row in rows:
-                main_source_schema.append(row[0])
+        main_source_schema = read_main_source_schema()
 
-        main_source_df = pd.DataFrame()
-        for field in main_source_schema:
-            main_source_df[field] = df['field_values'].apply(lambda x: extract_field_values(x, field))
+        # Parse each document once and fill every schema column from it
+        main_source_df = extract_fields(df['field_values'], main_source_schema)
 
         # main_source_df.to_csv('main_source.csv', index=False)
 
@@ -154,6 +206,82 @@ def expand_periode_dim(periode):
         raise ValueError(f"Invalid period format. Expected 'Month YYYY' (e.g., 'January 2024'), got: {periode}")
 
 
+def flag_masks(df, periode_dim):
+    """
+    Boolean masks behind the daily update report's indicator columns.
+
+    Every flag is a vectorized comparison on the datetime64 columns and an `isin` on the
+    status columns; missing dates (NaT) compare False, as they did row by row. The period
+    boundaries may be scalars (one period for every row) or Series aligned with `df`
+    (each row compared against its own period).
+
+    :param df: Main data source with the date columns already converted.
+    :param periode_dim: Period boundaries, as returned by `expand_periode_dim`.
+    :return: Dictionary of flag column name to boolean Series, in report order.
+    """
+    start_periode = periode_dim['start_periode']
+    end_periode = periode_dim['end_periode']
+    start_periode_m1 = periode_dim['start_periode_m1']
+    end_periode_m1 = periode_dim['end_periode_m1']
+
+    def in_periode(column):
+        return (df[column] >= start_periode) & (df[column] <= end_periode)
+
+    status = df['Contract Status']
+    is_ctc = status.isin(CTC_CONTRACT_STATUS)
+    is_preferred = status.isin(PREFERRED_CONTRACT_STATUS)
+    is_ctc_pending = status == 'CTC - Pending'
+    is_preferred_pending = status == 'CTC - Preferred - Pending'
+
+    closing = df['Closing']
+    closing_active = closing >= periode_dim['current_periode']
+    closing_this_month = in_periode('Closing')
+    closing_next_month = (closing > start_periode_m1) & (closing <= end_periode_m1)
+    closing_other_months = closing > end_periode_m1
+    started_this_month = in_periode('CTC Started with Empower')
+    onboarded_before = df['Onboard Call Complete Date'] <= start_periode
+    agent_provided_by = df['Agent Provided by']
+
+    return {
+        'Total ACTIVE Files - CTC': closing_active & is_ctc,
+        'Total ACTIVE Files - CTC Preferred': closing_active & is_preferred,
+        'CTC Started for this month': started_this_month & is_ctc,
+        'CTC - Preferred Started': started_this_month & is_preferred,
+        'Closings for this month': closing_this_month & is_ctc,
+        'CTC - Preferred Closings': closing_this_month & is_preferred,
+        'CTC Pending for this month': closing_this_month & is_ctc_pending,
+        'CTC - Preferred Pending for this month': closing_this_month & is_preferred_pending,
+        'CTC Pending for next month': closing_next_month & is_ctc_pending,
+        'CTC - Preferred Pending for next month': closing_next_month & is_preferred_pending,
+        'CTC Pending for other months': closing_other_months & is_ctc_pending,
+        'CTC - Preferred Pending for other months': closing_other_months & is_preferred_pending,
+        'Listing Started': in_periode('Listing Started with Empower'),
+        'Listing PAID': in_periode('Listing PAID Date'),
+        'Offers Started this month': in_periode('Offer Started with Empower'),
+        'Compliance Started this month': in_periode('Compliance Started with Empower'),
+        'TC Generated Agents': onboarded_before & (agent_provided_by == 'TC'),
+        'SALES Generated Agents': onboarded_before & (agent_provided_by == 'Empower'),
+        'TOTAL Agents': onboarded_before & agent_provided_by.isin(('Empower', 'TC')),
+        '1st Transaction Agents': onboarded_before & (df['Onboarding Status'] == '1st Transaction'),
+        'Lost Agents/return to Sales': onboarded_before & df['Other Status'].isin(LOST_AGENTS_RETURN_TO_SALES),
+        'OB for This Month': in_periode('Onboard Call Complete Date'),
+        '1st Transactions for This Month': in_periode('1st Transaction Date'),
+    }
+
+
+def add_flags(df, periode_dim):
+    """
+    Adds the 0/1 indicator columns summed by the daily update report for one period.
+
+    :param df: Main data source with the date columns already converted.
+    :param periode_dim: Period boundaries from `expand_periode_dim`.
+    :return: The same DataFrame, with the flag columns added.
+    """
+    for column, mask in flag_masks(df, periode_dim).items():
+        df[column] = mask.astype('int64')
+    return df
+
+
 def transform_main_source(df, periode):
     print('Transforming main data source...', end='')
     df = df[
@@ -166,24 +294,6 @@ def transform_main_source(df, periode):
         ]
     ]
 
-    ctc_contract_status = (
-        'CTC - Closed - PAID', 'CTC - Pending', 'CTC - PAID',
-        'CTC - Terminated - No Charge', 'CTC - Withdrawn',
-        'CTC - Terminated - Compliance - PAID'
-    )
-
-    preferred_contract_status = (
-        'CTC - Preferred - Closed - PAID', 'CTC - Preferred - Pending',
-        'CTC - Preferred - PAID', 'CTC - Preferred - Terminated - No Change',
-        'CTC - Preferred - Withdrawn'
-    )
-
-    lost_agents_return_to_sales = (
-        'Lost  Reassigned', 'Lost  Left Empower', 'Return to Sales',
-        'Lost - Do Not Contact', 'Lost  Do Not Contact', 'Lost - Left Empower',
-        'Lost  Left Empower', 'Lost - Reassigned'
-    )
-
     global na_filler
 
     df['CTC Started with Empower'] = pd.to_datetime(df['CTC Started with Empower'])
@@ -206,249 +316,189 @@ def transform_main_source(df, periode):
     df = add_period(df)
     periode_dim = expand_periode_dim(periode)
 
-    df['Total ACTIVE Files - CTC'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['current_periode'] and x['Contract Status'] in (ctc_contract_status) else 0, axis=1)
-    df['Total ACTIVE Files - CTC Preferred'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['current_periode'] and x['Contract Status'] in (preferred_contract_status) else 0, axis=1)
-    df['CTC Started for this month'] = df.apply(lambda x: 1 if x['CTC Started with Empower'] >= periode_dim['start_periode'] and x['CTC Started with Empower'] <= periode_dim['end_periode'] and x['Contract Status'] in (ctc_contract_status) else 0, axis=1)
-    df['CTC - Preferred Started'] = df.apply(lambda x: 1 if x['CTC Started with Empower'] >= periode_dim['start_periode'] and x['CTC Started with Empower'] <= periode_dim['end_periode'] and x['Contract Status'] in (preferred_contract_status) else 0, axis=1)
-    df['Closings for this month'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['start_periode'] and x['Closing'] <= periode_dim['end_periode'] and x['Contract Status'] in (ctc_contract_status) else 0, axis=1)
-    df['CTC - Preferred Closings'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['start_periode'] and x['Closing'] <= periode_dim['end_periode'] and x['Contract Status'] in (preferred_contract_status)else 0, axis=1)
-    df['CTC Pending for this month'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['start_periode'] and x['Closing'] <= periode_dim['end_periode'] and x['Contract Status'] == 'CTC - Pending' else 0, axis=1)
-    df['CTC - Preferred Pending for this month'] = df.apply(lambda x: 1 if x['Closing'] >= periode_dim['start_periode'] and x['Closing'] <= periode_dim['end_periode'] and x['Contract Status'] == 'CTC - Preferred - Pending' else 0, axis=1)
-    df['CTC Pending for next month'] = df.apply(lambda x: 1 if x['Closing'] > periode_dim['start_periode_m1'] and x['Closing'] <= periode_dim['end_periode_m1'] and x['Contract Status'] == 'CTC - Pending' else 0, axis=1)
-    df['CTC - Preferred Pending for next month'] = df.apply(lambda x: 1 if x['Closing'] > periode_dim['start_periode_m1'] and x['Closing'] <= periode_dim['end_periode_m1'] and x['Contract Status'] == 'CTC - Preferred - Pending' else 0, axis=1)
-    df['CTC Pending for other months'] = df.apply(lambda x: 1 if x['Closing'] > periode_dim['end_periode_m1'] and x['Contract Status'] == 'CTC - Pending' else 0, axis=1)
-    df['CTC - Preferred Pending for other months'] = df.apply(lambda x: 1 if x['Closing'] > periode_dim['end_periode_m1'] and x['Contract Status'] == 'CTC - Preferred - Pending' else 0, axis=1)
-    df['CTC - Preferred Pending for other months'] = df.apply(lambda x: 1 if x['Closing'] > periode_dim['end_periode_m1'] and x['Contract Status'] == 'CTC - Preferred - Pending' else 0, axis=1)
-    df['Listing Started'] = df.apply(lambda x: 1 if x['Listing Started with Empower'] >= periode_dim['start_periode'] and x['Listing Started with Empower'] <= periode_dim['end_periode'] else 0, axis=1)
-    df['Listing PAID'] = df.apply(lambda x: 1 if x['Listing PAID Date'] >= periode_dim['start_periode'] and x['Listing PAID Date'] <= periode_dim['end_periode'] else 0, axis=1)
-    df['Offers Started this month'] = df.apply(lambda x: 1 if x['Offer Started with Empower'] >= periode_dim['start_periode'] and x['Offer Started with Empower'] <= periode_dim['end_periode'] else 0, axis=1)
-    df['Compliance Started this month'] = df.apply(lambda x: 1 if x['Compliance Started with Empower'] >= periode_dim['start_periode'] and x['Compliance Started with Empower'] <= periode_dim['end_periode'] else 0, axis=1)
-    df['TC Generated Agents'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Agent Provided by'] == 'TC' else 0, axis=1)
-    df['SALES Generated Agents'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Agent Provided by'] == 'Empower' else 0, axis=1)
-    df['TOTAL Agents'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Agent Provided by'] in ('Empower', 'TC') else 0, axis=1)
-    df['1st Transaction Agents'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Onboarding Status'] == '1st Transaction' else 0, axis=1)
-    df['Lost Agents/return to Sales'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] <= periode_dim['start_periode'] and x['Other Status'] in (lost_agents_return_to_sales) else 0, axis=1)
-    df['OB for This Month'] = df.apply(lambda x: 1 if x['Onboard Call Complete Date'] >= periode_dim['start_periode'] and x['Onboard Call Complete Date'] <= periode_dim['end_periode'] else 0, axis=1)
-    df['1st Transactions for This Month'] = df.apply(lambda x: 1 if x['1st Transaction Date'] >= periode_dim['start_periode'] and x['1st Transaction Date'] <= periode_dim['end_periode'] else 0, axis=1)
+    df = add_flags(df, periode_dim)
 
     print('Done')
     return df
 
 
-def generate_daily_update_report(df):
-    print('Generating report...', end='')
-    # try:
+def month_ordinal(periode):
+    """Months since January 1970 for a 'MONTH YYYY' period label."""
+    periode_date = datetime.strptime(periode, '%B %Y')
+    return (periode_date.year - 1970) * 12 + periode_date.month - 1
+
+
+def monthly_periode_dim(months):
+    """
+    Period boundaries, as in `expand_periode_dim`, for an array of months (datetime64[M]).
+
+    :param months: numpy datetime64[M] array, one month per record.
+    :return: Dictionary of numpy datetime64[ns] arrays.
+    """
+    one_second = np.timedelta64(1, 's')
+    start_periode = months.astype('datetime64[ns]')
+    start_periode_m1 = (months + 1).astype('datetime64[ns]')
+    end_periode = start_periode_m1 - one_second
+    end_periode_m1 = (months + 2).astype('datetime64[ns]') - one_second
+    now = np.datetime64(datetime.now(), 'ns')
+    return {
+        'start_periode': start_periode,
+        'end_periode': end_periode,
+        'start_periode_m1': start_periode_m1,
+        'end_periode_m1': end_periode_m1,
+        'current_periode': np.where(now < end_periode, end_periode, now)
+    }
+
+
+def select_periodes(df, year=None, start_periode=None, end_periode=None):
+    """
+    Picks the report periods: the months in which CTC files started, in order of appearance.
+
+    :param df: Main data source with 'CTC Started with Empower' converted to datetime.
+    :param year: Keep the periods of this year (defaults to the current year, unless a range is given).
+    :param start_periode: First period to keep, as 'MONTH YYYY'.
+    :param end_periode: Last period to keep, as 'MONTH YYYY'.
+    :return: List of 'MONTH YYYY' labels.
+    """
+    if year is None and start_periode is None and end_periode is None:
+        year = datetime.now().year
+    all_periodes = df['CTC Started with Empower'].dt.strftime('%B %Y').str.upper().unique().tolist()
+    periodes = []
+    for periode in all_periodes:
+        ordinal = month_ordinal(periode)
+        if year is not None and ordinal // 12 + 1970 != int(year):
+            continue
+        if start_periode is not None and ordinal < month_ordinal(start_periode):
+            continue
+        if end_periode is not None and ordinal > month_ordinal(end_periode):
+            continue
+        periodes.append(periode)
+    return periodes
+
+
+def build_periode_reports(df, periodes):
+    """
+    Builds the per-TC report of every period in one pass over the records.
+
+    Each record is assigned to the period its bucket date falls in (see REPORT_BLOCKS) and its
+    flags are evaluated against that period's boundaries, so all periods are counted by a
+    single bincount over (period, TC, column) codes. The agent columns are cumulative: a
+    record is assigned to the first period starting on or after its onboard call, and the
+    counts are summed forward across periods.
+
+    :param df: Main data source with the date columns converted and NaT filled with `na_filler`.
+    :param periodes: 'MONTH YYYY' labels to report.
+    :return: List of report DataFrames (REPORT_COLUMNS, one row per Empower TC Name), one per period.
+    """
     specific_team = df['Empower TC Name'].unique().tolist()
-
-    dfs = list()
-    sheet_titles = list()
-    df_report_template = pd.DataFrame(
-        index=specific_team
-    )
-
-    global na_filler
-
-    df['CTC Started with Empower'] = pd.to_datetime(df['CTC Started with Empower'])
-    df['CTC Started with Empower'].fillna(na_filler, inplace=True)
-    df['CTC Started with Empower Periode'] = df['CTC Started with Empower'].apply(lambda x: x.strftime('%B %Y').upper())
-
-    all_periodes = df['CTC Started with Empower Periode'].unique().tolist()
-    periodes = [x for x in all_periodes if "2024" in x]
-
-    for periode in periodes:
-        enriched_df = transform_main_source(df, periode)
-        dateformat_periode = datetime.strptime(periode, '%B %Y')
-        report_df = df_report_template.copy()
-        selected_team_df = enriched_df[enriched_df["Empower TC Name"].isin(specific_team)].copy()
-
-        started_df = selected_team_df[selected_team_df["CTC Started with Empower Periode"] == periode].copy()
-        summary_started_df = started_df.pivot_table(
-            values=[
-                'CTC Started for this month',
-                'CTC - Preferred Started'],
-            index='Empower TC Name',
-            aggfunc='sum',
-            fill_value=0
-        )
-
-        closing_df = selected_team_df[selected_team_df["Closing Periode"] == periode].copy()
-        summary_closing_df = closing_df.pivot_table(
-            values=[
-                'Total ACTIVE Files - CTC',
-                'Total ACTIVE Files - CTC Preferred',
-                'Closings for this month',
-                'CTC - Preferred Closings',
-                'CTC Pending for this month',
-                'CTC - Preferred Pending for this month',
-                'CTC Pending for next month',
-                'CTC - Preferred Pending for next month',
-                'CTC Pending for other months',
-                'CTC - Preferred Pending for other months'
-            ],
-            index='Empower TC Name',
-            aggfunc='sum',
-            fill_value=0
-        )
-
-        listing_started_df = selected_team_df[selected_team_df["Listing Started Periode"] == periode].copy()
-        if listing_started_df.empty:
-            summary_listing_started_df = pd.DataFrame(
-                index=pd.Index(specific_team, name='Empower TC Name'),
-                data={'Listing Started': [0] * len(specific_team)}
-            )
-        else:
-            summary_listing_started_df = listing_started_df.pivot_table(
-                values='Listing Started',
-                index='Empower TC Name',
-                aggfunc='sum',
-                fill_value=0
-            )
-
-        listing_paid_df = selected_team_df[selected_team_df["Listing Paid Periode"] == periode].copy()
-        if listing_paid_df.empty:
-            summary_listing_paid_df = pd.DataFrame(
-                index=pd.Index(specific_team, name='Empower TC Name'),
-                data={'Listing PAID': [0] * len(specific_team)}
-            )
-        else:
-            summary_listing_paid_df = listing_paid_df.pivot_table(
-                values='Listing PAID',
-                index='Empower TC Name',
-                aggfunc='sum',
-                fill_value=0
+    if not periodes:
+        return []
+
+    ordinals = [month_ordinal(periode) for periode in periodes]
+    base = min(ordinals)
+    periode_count = max(ordinals) - base + 1
+    team_count = len(specific_team)
+    flag_columns = REPORT_COLUMNS[1:]
+    column_count = len(flag_columns)
+    column_index = {column: index for index, column in enumerate(flag_columns)}
+
+    team_index = pd.Index(specific_team)
+    team_codes = {}
+    for key in ('Empower TC Name', 'Transaction Coordinator'):
+        # TCs without a name are left out, as pivot_table drops missing keys
+        codes = team_index.get_indexer(df[key])
+        team_codes[key] = np.where(df[key].notna().to_numpy(), codes, -1)
+
+    codes = []
+
+    def add_codes(masks, columns, key, periode_codes, in_range):
+        for column in columns:
+            selected = masks[column].to_numpy() & in_range & (team_codes[key] >= 0)
+            codes.append(
+                (periode_codes[selected] * team_count + team_codes[key][selected]) * column_count
+                + column_index[column]
             )
 
-        offer_started_df = selected_team_df[selected_team_df["Offer Started Periode"] == periode].copy()
-        if offer_started_df.empty:
-            summary_offer_started_df = pd.DataFrame(
-                index=pd.Index(specific_team, name='Empower TC Name'),
-                data={'Offers Started this month': [0] * len(specific_team)}
-            )
-        else:
-            summary_offer_started_df = offer_started_df.pivot_table(
-                values='Offers Started this month',
-                index='Empower TC Name',
-                aggfunc='sum',
-                fill_value=0
-            )
-
-        compliance_started_df = selected_team_df[selected_team_df["Compliance Started Periode"] == periode].copy()
-        if compliance_started_df.empty:
-            summary_compliance_started_df = pd.DataFrame(
-                index=pd.Index(specific_team, name='Empower TC Name'),
-                data={'Compliance Started this month': [0] * len(specific_team)}
-            )
-        else:
-            summary_compliance_started_df = compliance_started_df.pivot_table(
-                values='Compliance Started this month',
-                index='Empower TC Name',
-                aggfunc='sum',
-                fill_value=0
-            )
-
-        onboard_call_complete_date_df = selected_team_df[selected_team_df["Onboard Periode Start"] <= dateformat_periode].copy()
-        if onboard_call_complete_date_df.empty:
-            summary_onboard_call_complete_date_df = pd.DataFrame(
-                index=pd.Index(specific_team, name='Transaction Coordinator'),
-                data={
-                    'TC Generated Agents': [0] * len(specific_team),
-                    'SALES Generated Agents': [0] * len(specific_team),
-                    'TOTAL Agents': [0] * len(specific_team),
-                    '1st Transaction Agents': [0] * len(specific_team),
-                    'Lost Agents/return to Sales': [0] * len(specific_team)
-                }
-            )
-        else:
-            summary_onboard_call_complete_date_df = onboard_call_complete_date_df.pivot_table(
-                values=[
-                    'TC Generated Agents', 'SALES Generated Agents', 'TOTAL Agents',
-                    '1st Transaction Agents', 'Lost Agents/return to Sales'
-                ],
-                index='Transaction Coordinator',
-                aggfunc='sum',
-                fill_value=0
-            )
-
-        ob_date_df = selected_team_df[selected_team_df["Onboard Periode"] == periode].copy()
-        if ob_date_df.empty:
-            summary_ob_date_df = pd.DataFrame(
-                index=pd.Index(specific_team, name='Transaction Coordinator'),
-                data={
-                    'OB for This Month': [0] * len(specific_team)
-                }
-            )
-        else:
-            summary_ob_date_df = ob_date_df.pivot_table(
-                values='OB for This Month',
-                index='Transaction Coordinator',
-                aggfunc='sum',
-                fill_value=0
-            )
+    for date_column, key, columns in REPORT_BLOCKS:
+        months = df[date_column].to_numpy().astype('datetime64[M]')
+        periode_codes = months.astype('int64') - base
+        in_range = (periode_codes >= 0) & (periode_codes < periode_count) & ~np.isnat(months)
+        masks = flag_masks(df, monthly_periode_dim(months))
+        add_codes(masks, columns, key, periode_codes, in_range)
+
+    # First period starting on or after the onboard call; earlier ones count from the first period
+    onboard = df['Onboard Call Complete Date'].to_numpy()
+    months = onboard.astype('datetime64[M]')
+    months = months + (onboard > months.astype('datetime64[ns]'))
+    periode_codes = np.maximum(months.astype('int64') - base, 0)
+    in_range = (periode_codes < periode_count) & ~np.isnat(months)
+    masks = flag_masks(df, monthly_periode_dim(months))
+    add_codes(masks, AGENT_COLUMNS, 'Transaction Coordinator', periode_codes, in_range)
+
+    counts = np.bincount(
+        np.concatenate(codes), minlength=periode_count * team_count * column_count
+    ).reshape(periode_count, team_count, column_count)
+    agent_indices = [column_index[column] for column in AGENT_COLUMNS]
+    counts[:, :, agent_indices] = counts[:, :, agent_indices].cumsum(axis=0)
+
+    reports = []
+    for ordinal in ordinals:
+        report_df = pd.DataFrame(counts[ordinal - base], columns=flag_columns).astype('int64')
+        report_df.insert(0, 'Empower TC Name', specific_team)
+        reports.append(report_df)
+    return reports
+
+
+def generate_daily_update_report(df, year=None, start_periode=None, end_periode=None):
+    """
+    Builds the per-TC daily update report of every selected period and writes one sheet per period.
+
+    :param df: Main data source from `generate_source`.
+    :param year: Report the periods of this year (defaults to the current year, unless a range is given).
+    :param start_periode: First period to report, as 'MONTH YYYY'.
+    :param end_periode: Last period to report, as 'MONTH YYYY'.
+    """
+    print('Generating report...', end='')
 
-        first_transaction_date_df = selected_team_df[selected_team_df["Onboard Periode"] == periode].copy()
-        if first_transaction_date_df.empty:
-            summary_first_transaction_date_df = pd.DataFrame(
-                index=pd.Index(specific_team, name='Transaction Coordinator'),
-                data={
-                    '1st Transactions for This Month': [0] * len(specific_team)
-                }
-            )
-        else:
-            summary_first_transaction_date_df = ob_date_df.pivot_table(
-                values='1st Transactions for This Month',
-                index='Transaction Coordinator',
-                aggfunc='sum',
-                fill_value=0
-            )
+    global na_filler
 
-        report_df.reset_index(inplace=True, names='Empower TC Name')
-        report_df = report_df.merge(summary_started_df, how='left', on='Empower TC Name')
-        report_df = report_df.merge(summary_closing_df, how='left', on='Empower TC Name')
-        report_df = report_df.merge(summary_listing_started_df, how='left', on='Empower TC Name')
-        report_df = report_df.merge(summary_listing_paid_df, how='left', on='Empower TC Name')
-        report_df = report_df.merge(summary_offer_started_df, how='left', on='Empower TC Name')
-        report_df = report_df.merge(summary_compliance_started_df, how='left', on='Empower TC Name')
-        report_df = report_df.merge(summary_onboard_call_complete_date_df, how='left', left_on='Empower TC Name', right_on='Transaction Coordinator')
-        report_df = report_df.merge(summary_ob_date_df, how='left', left_on='Empower TC Name', right_on='Transaction Coordinator')
-        report_df = report_df.merge(summary_first_transaction_date_df, how='left', left_on='Empower TC Name', right_on='Transaction Coordinator')
-
-        report_df.fillna(0, inplace=True)
-        report_df = report_df.astype('int64', errors='ignore')
-
-        report_df = report_df[
-            [
-                'Empower TC Name',
-                'Total ACTIVE Files - CTC',
-                'Total ACTIVE Files - CTC Preferred',
-                'CTC Started for this month', 'CTC - Preferred Started',
-                'Closings for this month', 'CTC - Preferred Closings',
-                'CTC Pending for this month', 'CTC - Preferred Pending for this month',
-                'CTC Pending for next month', 'CTC - Preferred Pending for next month',
-                'CTC Pending for other months', 'CTC - Preferred Pending for other months',
-                'Offers Started this month', 'Compliance Started this month',
-                'Listing Started', 'Listing PAID', 'TC Generated Agents',
-                'SALES Generated Agents', 'TOTAL Agents', '1st Transaction Agents',
-                'Lost Agents/return to Sales', 'OB for This Month', '1st Transactions for This Month'
-            ]
-        ]
+    df = df.copy()
+    for column in DATE_COLUMNS:
+        df[column] = pd.to_datetime(df[column]).fillna(na_filler)
 
-        dfs.append(report_df.copy())
-        sheet_titles.append(periode)
+    periodes = select_periodes(df, year, start_periode, end_periode)
+    dfs = build_periode_reports(df, periodes)
+    sheet_titles = list(periodes)
 
     spreadsheet_name = "tc_daily_update"
     spreadsheet_id = '1weGRTk5Tzg1VDVDYVuYHpQru-_-oG7l-FpLyZeq3bsU'
 
     print('Done')
     print('len of dfs = {}, len of sheet title = {}'.format(len(dfs), len(sheet_titles)))
-    create_google_sheet(dfs, sheet_titles, spreadsheet_name, spreadsheet_id)
+    # Period tabs keep one row per TC, so only the TCs whose counts changed are rewritten
+    sync_keys = {title: ['Empower TC Name'] for title in sheet_titles}
+    return create_google_sheet(dfs, sheet_titles, spreadsheet_name, spreadsheet_id, sync_keys=sync_keys)
+
+
+def run_report(dataset=None, properties_file_path='all_properties.parquet'):
+    """
+    Builds the tc_daily_update spreadsheet.
+
+    :param dataset: Shared report_dataset.PropertyDataset; the properties are read from
+                    `properties_file_path` when omitted.
+    """
+    if dataset is not None:
+        df = dataset.fields(read_main_source_schema())
+    else:
+        df = generate_source(properties_file_path)
+    # df = pd.read_csv('main_source.csv')
+    return generate_daily_update_report(df)
 
 
 if __name__ == '__main__':
     script_start_time = time.time()
 
-    df = generate_source('all_properties.parquet')
-    # df = pd.read_csv('main_source.csv')
-    generate_daily_update_report(df)
+    run_report()
 
     script_end_time = time.time()
     total_execution_time = script_end_time - script_start_time
@@ -1,9 +1,8 @@
 import duckdb
 import time
-import json
+import numpy as np
 import pandas as pd
 from datetime import datetime, date
-import csv
 from openpyxl import load_workbook
 # from google.auth.transport.requests import Request
 # from google.oauth2.service_account import Credentials
@@ -11,53 +10,20 @@ from openpyxl import load_workbook
 # from googleapiclient.discovery import build
 import sys
 import os
+import hashlib
 
 # setting path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from gsheetapi import *
+from field_values import extract_fields
+from report_dataset import PropertyDataset
+from schemas import TRANSACTION_SOURCE, get_registry
 
 na_filler = datetime(1990, 1, 1, 0, 0, 0)
 
 
-def extract_field_values(field_values, key):
-    try:
-        values = json.loads(field_values)
-        for item in values:
-            if isinstance(item, dict) and item.get("label") == key:
-                return item.get("value")
-    except json.JSONDecodeError:
-        pass
-    return None
-
-
-def extract_transaction_source(properties_file_path_pattern):
-    print('Extracting transaction data source...', end='')
-    conn = duckdb.connect(database=":memory:")
-    try:
-        conn = duckdb.connect(database=":memory:")
-        query = f"SELECT * FROM read_parquet('{properties_file_path_pattern}')"
-        df = conn.execute(query).fetchdf()
-        print("Data extraction complete.")
-
-        transaction_schema = list()
-        with open('Columns_Transaction_Source.csv') as file:
-            rows = csv.reader(file)
-            for row in rows:
-                transaction_schema.append(row[0])
-
-        transaction_df = pd.DataFrame()
-        for field in transaction_schema:
-            transaction_df[field] = df['field_values'].apply(lambda x: extract_field_values(x, field))
-
-        print('Done')
-        return transaction_df
-
-    except Exception as e:
-        print(f"Error processing data: {e}")
-        return None
-
-    finally:
-        conn.close()
+def read_transaction_schema():
+    return list(get_registry().columns(TRANSACTION_SOURCE))
 
 
 def update_agent_provided_by(transaction_df, agents_file_path):
@@ -114,78 +80,136 @@ def get_period(selected_date, mode):
     return result
 
 
-def add_period(transaction_df):
-    transaction_df['closing_period_start'] = transaction_df['Closing'].apply(lambda x: get_period(x, mode='start'))
-    transaction_df['closing_period_end'] = transaction_df['Closing'].apply(lambda x: get_period(x, mode='end'))
-    transaction_df['closing_periode'] = transaction_df.apply(lambda x: x['closing_period_start'].strftime('%Y/%m/%d').upper() + ' - ' + x['closing_period_end'].strftime('%Y/%m/%d').upper(), axis=1)
+# Semimonthly period columns: (date column, prefix of its <prefix>_period_start/_period_end/_periode columns)
+PERIOD_COLUMNS = [
+    ('Closing', 'closing'),
+    ('Listing PAID Date', 'listing'),
+    ('CTC PAID Date', 'ctc'),
+    ('Compliance PAID Date', 'compliance'),
+    ('Offer Prep PAID Date', 'offer_prep'),
+]
+
+
+def semimonthly_periods(dates):
+    """
+    Vectorized `get_period` for a whole column: the 1-15 / 16-end of month period of each date.
+
+    Boundaries come from month arithmetic on the underlying datetime64 values, so December
+    rolls over to January like any other month, and the `na_filler` sentinel simply falls in
+    its own period (1990/01/01 - 1990/01/15), as it did row by row. NaT stays NaT, with a
+    None label. Labels are formatted once per distinct period and then broadcast.
+
+    :param dates: pandas.Series of dates (datetime64 or parseable values).
+    :return: (start, end, label) tuple of pandas.Series indexed like `dates`.
+    """
+    dates = pd.to_datetime(dates)
+    values = dates.to_numpy(dtype='datetime64[ns]')
+    month_start = values.astype('datetime64[M]').astype('datetime64[ns]')
+    next_month = (values.astype('datetime64[M]') + 1).astype('datetime64[ns]')
+    first_half = values < month_start + np.timedelta64(15, 'D')
+    second = np.timedelta64(1, 's')
+
+    start = np.where(first_half, month_start, month_start + np.timedelta64(15, 'D'))
+    end = np.where(first_half, month_start + np.timedelta64(15, 'D') - second, next_month - second)
+    start = pd.Series(start, index=dates.index)
+    end = pd.Series(end, index=dates.index)
+
+    # NaT gets code -1, which picks the trailing None label
+    codes, uniques = pd.factorize(start)
+    unique_codes, first_rows = np.unique(codes, return_index=True)
+    first_rows = first_rows[unique_codes >= 0]
+    labels = pd.Series(uniques).dt.strftime('%Y/%m/%d') + ' - ' + end.iloc[first_rows].dt.strftime('%Y/%m/%d').to_numpy()
+    labels = np.append(labels.to_numpy(dtype=object), None)
+    label = pd.Series(labels[codes], index=dates.index, dtype=object)
+    return start, end, label
 
-    transaction_df['listing_period_start'] = transaction_df['Listing PAID Date'].apply(lambda x: get_period(x, mode='start'))
-    transaction_df['listing_period_end'] = transaction_df['Listing PAID Date'].apply(lambda x: get_period(x, mode='end'))
-    transaction_df['listing_periode'] = transaction_df.apply(lambda x: x['listing_period_start'].strftime('%Y/%m/%d').upper() + ' - ' + x['listing_period_end'].strftime('%Y/%m/%d').upper(), axis=1)
 
-    transaction_df['ctc_period_start'] = transaction_df['CTC PAID Date'].apply(lambda x: get_period(x, mode='start'))
-    transaction_df['ctc_period_end'] = transaction_df['CTC PAID Date'].apply(lambda x: get_period(x, mode='end'))
-    transaction_df['ctc_periode'] = transaction_df.apply(lambda x: x['ctc_period_start'].strftime('%Y/%m/%d').upper() + ' - ' + x['ctc_period_end'].strftime('%Y/%m/%d').upper(), axis=1)
+def add_period(transaction_df):
+    for date_column, prefix in PERIOD_COLUMNS:
+        start, end, label = semimonthly_periods(transaction_df[date_column])
+        transaction_df[f'{prefix}_period_start'] = start
+        transaction_df[f'{prefix}_period_end'] = end
+        transaction_df[f'{prefix}_periode'] = label
 
-    transaction_df['compliance_period_start'] = transaction_df['Compliance PAID Date'].apply(lambda x: get_period(x, mode='start'))
-    transaction_df['compliance_period_end'] = transaction_df['Compliance PAID Date'].apply(lambda x: get_period(x, mode='end'))
-    transaction_df['compliance_periode'] = transaction_df.apply(lambda x: x['compliance_period_start'].strftime('%Y/%m/%d').upper() + ' - ' + x['compliance_period_end'].strftime('%Y/%m/%d').upper(), axis=1)
+    return transaction_df
 
-    transaction_df['offer_prep_period_start'] = transaction_df['Offer Prep PAID Date'].apply(lambda x: get_period(x, mode='start'))
-    transaction_df['offer_prep_period_end'] = transaction_df['Offer Prep PAID Date'].apply(lambda x: get_period(x, mode='end'))
-    transaction_df['offer_prep_periode'] = transaction_df.apply(lambda x: x['offer_prep_period_start'].strftime('%Y/%m/%d').upper() + ' - ' + x['offer_prep_period_end'].strftime('%Y/%m/%d').upper(), axis=1)
 
+def in_window(transaction_df, date_column, prefix):
+    """
+    Boolean mask of rows whose `date_column` is set (not `na_filler`) and falls inside the
+    `<prefix>_period_start` / `<prefix>_period_end` window.
+    """
+    dates = transaction_df[date_column]
+    return ((dates != na_filler)
+            & (dates >= transaction_df[f'{prefix}_period_start'])
+            & (dates <= transaction_df[f'{prefix}_period_end']))
+
+
+def add_amount_in_window(transaction_df, column, amounts, date_column, prefix):
+    """
+    Sets `column` to `amounts` on the rows inside the window (see `in_window`) and 0 elsewhere.
+
+    The column is (re)added at the end of the frame, where the rename/apply/drop sequence
+    used to leave it; no temporary column is created.
+
+    :param amounts: pandas.Series aligned with `transaction_df`, or the name of a column.
+    """
+    if isinstance(amounts, str):
+        amounts = transaction_df.pop(amounts) if amounts == column else transaction_df[amounts]
+    elif column in transaction_df.columns:
+        del transaction_df[column]
+    amounts = amounts.where(in_window(transaction_df, date_column, prefix), 0)
+    if pd.api.types.is_float_dtype(amounts):
+        # Row-wise results always came back as float64, even from float32 sums
+        amounts = amounts.astype('float64')
+    transaction_df[column] = amounts
     return transaction_df
 
 
 def add_listing_paid_amount(transaction_df):
-    global na_filler
-    transaction_df.rename({'Listing PAID Amount': 'Listing PAID Amount_1'}, axis=1, inplace=True)
-    transaction_df['Listing PAID Amount'] = transaction_df.apply(lambda x: x['Listing PAID Amount_1'] if ((x['Listing PAID Date'] != na_filler) & (x['Listing PAID Date'] >= x['listing_period_start']) & (x['Listing PAID Date'] <= x['listing_period_end'])) else 0, axis=1)
-    transaction_df.drop(columns='Listing PAID Amount_1', inplace=True)
-
-    return transaction_df
+    return add_amount_in_window(transaction_df, 'Listing PAID Amount', 'Listing PAID Amount', 'Listing PAID Date', 'listing')
 
 
 def add_ctc_paid_amount(transaction_df):
-    global na_filler
-    transaction_df.rename({'CTC PAID Amount': 'CTC PAID Amount_1'}, axis=1, inplace=True)
-    transaction_df['CTC PAID Amount'] = transaction_df.apply(lambda x: x['CTC PAID Amount_1'] if ((x['CTC PAID Date'] != na_filler) & (x['CTC PAID Date'] >= x['ctc_period_start']) & (x['CTC PAID Date'] <= x['ctc_period_end'])) else 0, axis=1)
-    transaction_df.drop(columns='CTC PAID Amount_1', inplace=True)
-
-    return transaction_df
+    return add_amount_in_window(transaction_df, 'CTC PAID Amount', 'CTC PAID Amount', 'CTC PAID Date', 'ctc')
 
 
 def add_compliance_paid_amount(transaction_df):
-    global na_filler
-    transaction_df.rename({'Compliance PAID Amount': 'Compliance PAID Amount_1'}, axis=1, inplace=True)
-    transaction_df['Compliance PAID Amount'] = transaction_df.apply(lambda x: x['Compliance PAID Amount_1'] if ((x['Compliance PAID Date'] != na_filler) & (x['Compliance PAID Date'] >= x['compliance_period_start']) & (x['Compliance PAID Date'] <= x['compliance_period_end'])) else 0, axis=1)
-    transaction_df.drop(columns='Compliance PAID Amount_1', inplace=True)
-
-    return transaction_df
+    return add_amount_in_window(transaction_df, 'Compliance PAID Amount', 'Compliance PAID Amount', 'Compliance PAID Date', 'compliance')
 
 
 def add_offer_prep_paid_amount(transaction_df):
-    global na_filler
-    transaction_df.rename({'Offer Prep PAID Amount': 'Offer Prep PAID Amount_1'}, axis=1, inplace=True)
-    transaction_df['Offer Prep PAID Amount'] = transaction_df.apply(lambda x: x['Offer Prep PAID Amount_1'] if ((x['Offer Prep PAID Date'] != na_filler) & (x['Offer Prep PAID Date'] >= x['offer_prep_period_start']) & (x['Offer Prep PAID Date'] <= x['offer_prep_period_end'])) else 0, axis=1)
-    transaction_df.drop(columns='Offer Prep PAID Amount_1', inplace=True)
-
-    return transaction_df
+    return add_amount_in_window(transaction_df, 'Offer Prep PAID Amount', 'Offer Prep PAID Amount', 'Offer Prep PAID Date', 'offer_prep')
 
 
 def add_projected_amount(transaction_df):
-    transaction_df['Projected Amount'] = transaction_df.apply(lambda x: x['TC Commission Amount'] if ((x['Closing'] != na_filler) & (x['Closing'] >= x['closing_period_start']) & (x['Closing'] <= x['closing_period_end'])) else 0, axis=1)
-    return transaction_df
+    return add_amount_in_window(transaction_df, 'Projected Amount', 'TC Commission Amount', 'Closing', 'closing')
 
 
 def add_actual_amount(transaction_df):
-    transaction_df['Actual Amount'] = transaction_df.apply(lambda x: x['TC Revenue'] * x['TC Commission Rate'] if ((x['CTC PAID Date'] != na_filler) & (x['CTC PAID Date'] >= x['ctc_period_start']) & (x['CTC PAID Date'] <= x['ctc_period_end'])) else 0, axis=1)
-    return transaction_df
+    amounts = transaction_df['TC Revenue'] * transaction_df['TC Commission Rate']
+    return add_amount_in_window(transaction_df, 'Actual Amount', amounts, 'CTC PAID Date', 'ctc')
 
 
 def add_tc_revenue_amount(transaction_df):
-    transaction_df['TC Revenue Amount'] = transaction_df.apply(lambda x: x['TC Revenue'] if ((x['CTC PAID Date'] != na_filler) & (x['CTC PAID Date'] >= x['ctc_period_start']) & (x['CTC PAID Date'] <= x['ctc_period_end'])) else 0, axis=1)
+    return add_amount_in_window(transaction_df, 'TC Revenue Amount', 'TC Revenue', 'CTC PAID Date', 'ctc')
+
+
+# Projection flags: (flag column, date column, period prefix of the window it must fall in)
+PROJECTION_COLUMNS = [
+    ('Listing Projection', 'Listing Started with Empower', 'listing'),
+    ('Offer Projection', 'Offer Started with Empower', 'offer_prep'),
+    ('Compliance Projection', 'Compliance Started with Empower', 'compliance'),
+]
+
+
+def add_projections(transaction_df):
+    transaction_df['CTC Projection'] = (transaction_df['Closing'] != na_filler).astype('int64')
+    for column, date_column, prefix in PROJECTION_COLUMNS:
+        transaction_df[column] = in_window(transaction_df, date_column, prefix).astype('int64')
+    transaction_df['Projection Condition'] = (
+        transaction_df[['CTC Projection'] + [column for column, _, _ in PROJECTION_COLUMNS]] == 1
+    ).any(axis=1).astype('int64')
     return transaction_df
 
 
@@ -222,11 +246,7 @@ def transform_transaction_source(transaction_df):
     transaction_df = add_ctc_paid_amount(transaction_df)
     transaction_df = add_compliance_paid_amount(transaction_df)
     transaction_df = add_offer_prep_paid_amount(transaction_df)
-    transaction_df['CTC Projection'] = transaction_df['Closing'].apply(lambda x: 0 if x == na_filler else 1)
-    transaction_df['Listing Projection'] = transaction_df.apply(lambda x: 1 if (x['Listing Started with Empower'] != na_filler and x['Listing Started with Empower'] >= x['listing_period_start'] and x['Listing Started with Empower'] <= x['listing_period_end']) else 0, axis=1)
-    transaction_df['Offer Projection'] = transaction_df.apply(lambda x: 1 if (x['Offer Started with Empower'] != na_filler and x['Offer Started with Empower'] >= x['offer_prep_period_start'] and x['Offer Started with Empower'] <= x['offer_prep_period_end']) else 0, axis=1)
-    transaction_df['Compliance Projection'] = transaction_df.apply(lambda x: 1 if (x['Compliance Started with Empower'] != na_filler and x['Compliance Started with Empower'] >= x['compliance_period_start'] and x['Compliance Started with Empower'] <= x['compliance_period_end']) else 0, axis=1)
-    transaction_df['Projection Condition'] = transaction_df.apply(lambda x: 1 if (x['CTC Projection'] == 1 or x['Listing Projection'] == 1 or x['Offer Projection'] == 1 or x['Compliance Projection'] == 1) else 0, axis=1)
+    transaction_df = add_projections(transaction_df)
     transaction_df['Listing PAID Amount'] = pd.to_numeric(transaction_df['Listing PAID Amount'], errors='coerce', downcast='float')
     transaction_df['CTC PAID Amount'] = pd.to_numeric(transaction_df['CTC PAID Amount'], errors='coerce', downcast='float')
     transaction_df['Offer Prep PAID Amount'] = pd.to_numeric(transaction_df['Offer Prep PAID Amount'], errors='coerce', downcast='float')
@@ -242,35 +262,129 @@ def transform_transaction_source(transaction_df):
     return transaction_df
 
 
+PAYROLL_TEAMS = [
+    "Christianna Velazquez",
+    "Kimberly Lewis",
+    "Stephanie Kleinman",
+    "Molly Kelley",
+    "Jenn McKinley"
+]
+
+# Report mode: (amount column, period label column it is pivoted on)
+PAYROLL_REPORTS = {
+    'p': ('Projected Amount', 'closing_periode'),
+    'a': ('Actual Amount', 'ctc_periode'),
+}
+
+
+def select_periods(labels, start_period=None, end_period=None, latest=None):
+    """
+    Picks the periods to report out of sorted 'YYYY/MM/DD - YYYY/MM/DD' labels.
+
+    :param labels: numpy array of period labels, sorted (oldest first).
+    :param start_period: Keep periods containing or after this date (anything `pd.to_datetime` takes).
+    :param end_period: Keep periods containing or before this date.
+    :param latest: Keep only the latest N of the remaining periods.
+    :return: Boolean numpy array over `labels`.
+    """
+    keep = np.ones(len(labels), dtype=bool)
+    if len(labels) and (start_period is not None or end_period is not None):
+        period_starts = pd.to_datetime(pd.Series(labels).str[:10], format='%Y/%m/%d').to_numpy()
+        if start_period is not None:
+            keep &= period_starts >= semimonthly_periods(pd.Series([start_period]))[0].to_numpy()[0]
+        if end_period is not None:
+            keep &= period_starts <= pd.to_datetime(end_period).to_datetime64()
+    if latest is not None:
+        kept = np.flatnonzero(keep)
+        keep[kept[:max(len(kept) - latest, 0)]] = False
+    return keep
+
+
+def build_payroll_reports(enriched_transaction_df, modes=('p', 'a'), start_period=None, end_period=None,
+                          latest=None):
+    """
+    Builds the payroll pivots of several modes (see PAYROLL_REPORTS) in one grouped aggregation.
+
+    The team filter is applied once, the period labels of every mode are factorized together,
+    and the amounts are summed by a single weighted bincount over (mode, TC, period) codes.
+    Rows outside the selected periods are never aggregated, so `latest=N` only sums the
+    latest N periods. The 'Total Result' column and row come from the aggregated matrix.
+
+    :param enriched_transaction_df: Output of `transform_transaction_source`.
+    :param modes: Report modes, 'p' (projected) and/or 'a' (actual).
+    :param start_period: See `select_periods`.
+    :param end_period: See `select_periods`.
+    :param latest: See `select_periods`; applied to each mode's own periods.
+    :return: Dictionary of mode to report DataFrame (one row per Empower TC Name, one column per
+             period, plus the totals), laid out like the former pivot_table output.
+    """
+    for mode in modes:
+        if mode not in PAYROLL_REPORTS:
+            raise ValueError(f"Mode is undefined: {mode!r}")
+
+    selected = enriched_transaction_df[enriched_transaction_df["Empower TC Name"].isin(PAYROLL_TEAMS)]
+    row_count = len(selected)
+    team_codes, teams = pd.factorize(selected["Empower TC Name"], sort=True)
+    period_codes, labels = pd.factorize(
+        np.concatenate([selected[PAYROLL_REPORTS[mode][1]].to_numpy(dtype=object) for mode in modes]), sort=True
+    )
+    team_count, label_count = len(teams), len(labels)
+
+    codes = []
+    weights = []
+    for index, mode in enumerate(modes):
+        amount_column, period_column = PAYROLL_REPORTS[mode]
+        mode_codes = period_codes[index * row_count:(index + 1) * row_count]
+        # Periods with no rows in this mode are not candidates for its latest N
+        present = np.bincount(mode_codes[mode_codes >= 0], minlength=label_count) > 0
+        keep = np.zeros(label_count, dtype=bool)
+        keep[present] = select_periods(labels[present], start_period, end_period, latest)
+        # Rows without a period are left out, as pivot_table drops missing keys
+        rows = (mode_codes >= 0) & keep[mode_codes]
+        codes.append((index * team_count + team_codes[rows]) * label_count + mode_codes[rows])
+        weights.append(np.nan_to_num(selected[amount_column].to_numpy(dtype='float64')[rows]))
+
+    codes = np.concatenate(codes)
+    size = len(modes) * team_count * label_count
+    shape = (len(modes), team_count, label_count)
+    sums = np.bincount(codes, weights=np.concatenate(weights), minlength=size).reshape(shape)
+    counts = np.bincount(codes, minlength=size).reshape(shape)
+
+    reports = {}
+    for index, mode in enumerate(modes):
+        period_column = PAYROLL_REPORTS[mode][1]
+        team_rows = counts[index].any(axis=1)
+        period_columns = counts[index].any(axis=0)
+        table = sums[index][team_rows][:, period_columns]
+        table = np.column_stack([table, table.sum(axis=1)])
+        table = np.vstack([table, table.sum(axis=0)])
+        summary_df = pd.DataFrame(
+            table,
+            index=pd.Index(list(teams[team_rows]) + ['Total Result'], name="Empower TC Name"),
+            columns=pd.Index(list(labels[period_columns]) + ['Total Result'], name=period_column),
+        )
+        summary_df.reset_index(inplace=True)
+        reports[mode] = summary_df
+    return reports
+
+
+def generate_payroll_reports(enriched_transaction_df, start_period=None, end_period=None, latest=None):
+    print('Generating reports...', end='')
+    try:
+        reports = build_payroll_reports(enriched_transaction_df, start_period=start_period, end_period=end_period,
+                                        latest=latest)
+        print('Done')
+        return reports
+
+    except Exception as e:
+        print(f"Error processing data: {e}")
+        return None
+
+
 def generate_payroll_report(enriched_transaction_df, mode):
     print('Generating report...', end='')
     try:
-        # enriched_transaction_df = pd.read_excel('tc_payroll.xlsx', sheet_name='transaction_source')
-        # print(enriched_transaction_df)
-
-        specific_teams = [
-            "Christianna Velazquez",
-            "Kimberly Lewis",
-            "Stephanie Kleinman",
-            "Molly Kelley",
-            "Jenn McKinley"
-        ]
-
-        selected_team_transaction_df = enriched_transaction_df[enriched_transaction_df["Empower TC Name"].isin(specific_teams)]
-        if mode == 'p':
-            values_name = 'Projected Amount'
-            columns_name = 'closing_periode'
-        elif mode == 'a':
-            values_name = 'Actual Amount'
-            columns_name = 'ctc_periode'
-        else:
-            print("Mode is undefined!")
-        summary_df = selected_team_transaction_df.pivot_table(values=values_name, index="Empower TC Name", columns=columns_name, aggfunc='sum', fill_value=0)
-
-        summary_df['Total Result'] = summary_df.sum(axis=1)
-        summary_df.loc['Total Result'] = summary_df.sum()
-        summary_df.reset_index(inplace=True)
-
+        summary_df = build_payroll_reports(enriched_transaction_df, modes=(mode,))[mode]
         print('Done')
         return summary_df
 
@@ -278,8 +392,178 @@ def generate_payroll_report(enriched_transaction_df, mode):
         print(f"Error processing data: {e}")
         return None
 
+
+LEDGER_FOLDER = 'datas'
+# One cell per (mode, TC, semimonthly period): amount, contributing row count and their content hash
+LEDGER_FILE = 'payroll_ledger.parquet'
+# Per-transaction contributions to the cells, with the content hash of the row they came from
+LEDGER_ROWS_FILE = '_payroll_ledger_rows.parquet'
+# Enriched transactions (transform_transaction_source output) of every property, with its id and content hash
+LEDGER_TRANSACTIONS_FILE = '_payroll_transactions.parquet'
+LEDGER_KEYS = ['mode', 'tc', 'period']
+LEDGER_COLUMNS = LEDGER_KEYS + ['amount', 'row_count', 'content_hash']
+LEDGER_ROW_COLUMNS = ['id', 'row_hash'] + LEDGER_KEYS + ['amount']
+LEDGER_TRANSACTION_KEYS = ['id', 'row_hash']
+
+
+def concat_frames(frames, columns):
+    """pd.concat that skips empty frames, and returns an empty frame with `columns` when all are."""
+    frames = [frame for frame in frames if len(frame)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def empty_payroll_ledger():
+    """(ledger, rows, transactions) of a ledger built from no properties."""
+    return (pd.DataFrame(columns=LEDGER_COLUMNS), pd.DataFrame(columns=LEDGER_ROW_COLUMNS),
+            pd.DataFrame(columns=LEDGER_TRANSACTION_KEYS))
+
+
+def load_payroll_ledger(folder=LEDGER_FOLDER):
+    """
+    Reads the persisted payroll ledger.
+
+    :param folder: Ledger folder.
+    :return: (ledger, rows, transactions) DataFrames; empty when no ledger has been built yet.
+    """
+    paths = [os.path.join(folder, filename) for filename in (LEDGER_FILE, LEDGER_ROWS_FILE, LEDGER_TRANSACTIONS_FILE)]
+    if not all(os.path.exists(path) for path in paths):
+        return empty_payroll_ledger()
+    return tuple(pd.read_parquet(path) for path in paths)
+
+
+def save_payroll_ledger(ledger, rows, transactions, folder=LEDGER_FOLDER):
+    """Writes the ledger, its rows and the enriched transactions atomically."""
+    os.makedirs(folder, exist_ok=True)
+    for frame, filename in ((ledger, LEDGER_FILE), (rows, LEDGER_ROWS_FILE), (transactions, LEDGER_TRANSACTIONS_FILE)):
+        path = os.path.join(folder, filename)
+        frame.to_parquet(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+
+
+def ledger_rows(enriched_transaction_df, ids, row_hashes):
+    """
+    Turns enriched transactions into ledger rows: one per transaction and mode (see
+    PAYROLL_REPORTS), with the TC, the period label and the amount it adds to that cell.
+    """
+    frames = []
+    for mode, (amount_column, period_column) in PAYROLL_REPORTS.items():
+        frames.append(pd.DataFrame({
+            'id': ids,
+            'row_hash': row_hashes,
+            'mode': mode,
+            'tc': enriched_transaction_df['Empower TC Name'].to_numpy(dtype=object),
+            'period': enriched_transaction_df[period_column].to_numpy(dtype=object),
+            'amount': enriched_transaction_df[amount_column].to_numpy(dtype='float64'),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def ledger_cells(rows):
+    """
+    Sums ledger rows into cells. Rows without a TC or period are left out, as pivot_table
+    drops missing keys; each cell's content hash covers the hashes of its contributing rows.
+    """
+    rows = rows.dropna(subset=['tc', 'period'])
+    if rows.empty:
+        return pd.DataFrame(columns=LEDGER_COLUMNS)
+    grouped = rows.groupby(LEDGER_KEYS, sort=True)
+    cells = grouped['amount'].sum().to_frame()
+    cells['row_count'] = grouped.size()
+    cells['content_hash'] = grouped['row_hash'].agg(
+        lambda hashes: hashlib.sha1(''.join(sorted(hashes)).encode()).hexdigest()
+    )
+    return cells.reset_index()
+
+
+def property_hashes(properties_df, salt=''):
+    """
+    Content hash of every property: DuckDB's 64-bit hash of `salt` and its field_values,
+    computed without parsing the JSON. It only tells changed documents apart; a DuckDB
+    version hashing differently makes every property look changed once.
+
+    :param properties_df: Raw property rows (id and field_values columns).
+    :param salt: Text hashed along with every document, so the hashes change with it.
+    :return: DataFrame of id and row_hash (hex string), in the order of `properties_df`.
+    """
+    conn = duckdb.connect(database=":memory:")
+    try:
+        conn.register('properties', properties_df[['id', 'field_values']])
+        return conn.execute(
+            "SELECT id, printf('%016x', hash(?, field_values)) AS row_hash FROM properties", [salt]
+        ).fetchdf()
     finally:
-        pass
+        conn.close()
+
+
+def update_payroll_ledger(properties_df, folder=LEDGER_FOLDER, full=False):
+    """
+    Brings the persisted payroll ledger and enriched transactions up to date with the property dataset.
+
+    Every property is keyed by its id and the content hash of its field_values and of the
+    transaction schema (see `property_hashes`), computed without parsing the JSON. Only new or
+    changed properties are parsed and transformed; every other enriched transaction comes from
+    the previous run. The ledger rows of changed and removed properties are replaced, and only
+    the cells (mode, TC, period) they touch are re-summed. Property ids are assumed unique, as
+    in the property store. After a change to `transform_transaction_source`, rebuild with `full`.
+
+    :param properties_df: Raw property rows (e.g. report_dataset.PropertyDataset.df).
+    :param folder: Ledger folder.
+    :param full: Ignore the persisted ledger and rebuild it from every property.
+    :return: (ledger, enriched_transaction_df): the ledger DataFrame (LEDGER_COLUMNS) and the
+             `transform_transaction_source` output of every property, indexed like `properties_df`.
+    """
+    start_time = time.time()
+    ledger, rows, transactions = empty_payroll_ledger() if full else load_payroll_ledger(folder)
+
+    schema = read_transaction_schema()
+    hashes = property_hashes(properties_df, salt='\n'.join(schema))
+    known = transactions[LEDGER_TRANSACTION_KEYS]
+    merged = hashes.merge(known, on='id', how='left', suffixes=('', '_known'))
+    changed = (merged['row_hash'] != merged['row_hash_known']).to_numpy()
+    changed_ids = hashes.loc[changed, 'id']
+    removed_ids = known.loc[~known['id'].isin(hashes['id']), 'id']
+
+    fresh = pd.DataFrame(columns=LEDGER_ROW_COLUMNS)
+    fresh_transactions = pd.DataFrame(columns=LEDGER_TRANSACTION_KEYS)
+    if changed.any():
+        changed_values = properties_df['field_values'].iloc[np.flatnonzero(changed)].reset_index(drop=True)
+        enriched = transform_transaction_source(extract_fields(changed_values, schema))
+        changed_hashes = hashes.loc[changed].reset_index(drop=True)
+        fresh = ledger_rows(enriched, changed_hashes['id'].to_numpy(), changed_hashes['row_hash'].to_numpy())
+        fresh_transactions = pd.concat([changed_hashes, enriched], axis=1)
+
+    stale = rows['id'].isin(changed_ids) | rows['id'].isin(removed_ids)
+    touched = pd.MultiIndex.from_frame(concat_frames([rows.loc[stale, LEDGER_KEYS], fresh[LEDGER_KEYS]], LEDGER_KEYS))
+    touched = touched.unique()
+    if len(changed_ids) or len(removed_ids):
+        rows = concat_frames([rows[~stale], fresh], LEDGER_ROW_COLUMNS)
+        recomputed = ledger_cells(rows[pd.MultiIndex.from_frame(rows[LEDGER_KEYS]).isin(touched)])
+        kept = ledger[~pd.MultiIndex.from_frame(ledger[LEDGER_KEYS]).isin(touched)]
+        ledger = concat_frames([kept, recomputed], LEDGER_COLUMNS).sort_values(LEDGER_KEYS, ignore_index=True)
+        unchanged = ~(transactions['id'].isin(changed_ids) | transactions['id'].isin(removed_ids))
+        transactions = concat_frames([transactions[unchanged], fresh_transactions], LEDGER_TRANSACTION_KEYS)
+        save_payroll_ledger(ledger, rows, transactions, folder)
+
+    # Enriched transactions in the order of the properties
+    enriched_transaction_df = transactions.set_index('id').loc[hashes['id']].drop(columns='row_hash')
+    enriched_transaction_df.index = properties_df.index
+
+    print(f"Payroll ledger: {len(changed_ids)} of {len(hashes)} transactions new or changed (parsed and "
+          f"transformed), {len(removed_ids)} removed, {len(touched)} cells recomputed "
+          f"in {time.time() - start_time:.2f} seconds")
+    return ledger, enriched_transaction_df
+
+
+def ledger_payroll_reports(ledger, modes=('p', 'a'), start_period=None, end_period=None, latest=None):
+    """
+    Builds the payroll reports of `build_payroll_reports` from ledger cells instead of transactions.
+    """
+    columns = {"Empower TC Name": ledger['tc'].to_numpy(dtype=object)}
+    for mode, (amount_column, period_column) in PAYROLL_REPORTS.items():
+        in_mode = (ledger['mode'] == mode).to_numpy()
+        columns[period_column] = np.where(in_mode, ledger['period'].to_numpy(dtype=object), None)
+        columns[amount_column] = np.where(in_mode, ledger['amount'].to_numpy(dtype='float64'), np.nan)
+    return build_payroll_reports(pd.DataFrame(columns), modes, start_period, end_period, latest)
 
 
 # def create_and_populate_google_sheet(service, spreadsheet_id, df, sheet_title):
@@ -381,14 +665,25 @@ def generate_payroll_report(enriched_transaction_df, mode):
 #         return None
 
 
-if __name__ == "__main__":
-    script_start_time = time.time()
+def run_report(dataset=None, properties_file_path_pattern='datas/all_properties_*.parquet', ledger_mode=None):
+    """
+    Builds the tc_payroll spreadsheet: the enriched transactions and the projected and actual payroll.
 
-    transaction_df = extract_transaction_source('datas/all_properties_*.parquet')
+    Only the properties that are new or changed since the last run are parsed and transformed
+    (see `update_payroll_ledger`); the reports are read from the ledger.
 
-    enriched_transaction_df = transform_transaction_source(transaction_df)
-    projected_payroll_report_df = generate_payroll_report(enriched_transaction_df, mode='p')
-    actual_payroll_report_df = generate_payroll_report(enriched_transaction_df, mode='a')
+    :param dataset: Shared report_dataset.PropertyDataset; loaded from `properties_file_path_pattern`
+                    when omitted.
+    :param ledger_mode: 'full' rebuilds the payroll ledger from every property (defaults to
+                        TC_PAYROLL_LEDGER_MODE, else 'incremental').
+    """
+    # TC_PAYROLL_LEDGER_MODE=full rebuilds the payroll ledger from every property
+    ledger_mode = ledger_mode or os.getenv('TC_PAYROLL_LEDGER_MODE', 'incremental')
+    dataset = dataset or PropertyDataset(properties_file_path_pattern)
+    ledger, enriched_transaction_df = update_payroll_ledger(dataset.df, full=(ledger_mode == 'full'))
+    payroll_reports = ledger_payroll_reports(ledger)
+    projected_payroll_report_df = payroll_reports.get('p')
+    actual_payroll_report_df = payroll_reports.get('a')
 
     # sheet_id = create_google_sheet(all_summaries)
     dataframes = [enriched_transaction_df, projected_payroll_report_df, actual_payroll_report_df]
@@ -396,8 +691,16 @@ if __name__ == "__main__":
     spreadsheet_name = "tc_payroll"
     spreadsheet_id = '1KSmBLfhdCtir3FPad1afDRK4Zrfa1VXEbeHx9Ry36vU'
 
-    create_google_sheet(dataframes, sheet_titles, spreadsheet_name, spreadsheet_id)
+    # Only the transactions that changed since the last run are written to the sheet
+    return create_google_sheet(dataframes, sheet_titles, spreadsheet_name, spreadsheet_id,
+                               sync_keys={'transaction_data': ['Contract Title']})
+
+
+if __name__ == "__main__":
+    script_start_time = time.time()
+
+    run_report()
 
     script_end_time = time.time()
     total_execution_time = script_end_time - script_start_time
-    print(f"Total script execution time: {total_execution_time:.2f} seconds")
\ No newline at end of file
+    print(f"Total script execution time: {total_execution_time:.2f} seconds")
@@ -0,0 +1,258 @@
+"""
+In-memory stand-ins for the Google Sheets and Drive services, for exercising gsheetapi and the
+report scripts offline (tests and benchmark.py).
+"""
+import collections
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from google_quota import quota_name
+
+
+class FakeHttpError(Exception):
+    """Raised by the fake services where the real client would raise googleapiclient's HttpError."""
+
+    def __init__(self, status, message):
+        super().__init__(f"<HttpError {status}: {message}>")
+        self.status = status
+
+
+class FakeRequest:
+    def __init__(self, service, method, body, handler):
+        self.service = service
+        self.method = method
+        self.body = body
+        self.handler = handler
+
+    def execute(self, num_retries=0):
+        # Paced and counted like ScheduledHttpRequest when the fake service was given a QuotaScheduler
+        scheduler = getattr(self.service, 'scheduler', None)
+        if scheduler is None:
+            return self.service.execute(self.method, self.body, self.handler)
+        return scheduler.run(quota_name(f"{self.service.api}.{self.method}"),
+                             lambda: self.service.execute(self.method, self.body, self.handler))
+
+
+class FakeSheetsService:
+    """
+    In-memory stand-in for the Sheets v4 service, for exercising gsheetapi offline.
+
+    Supports the calls the writers make (spreadsheets create/get/batchUpdate with addSheet,
+    values update/batchUpdate/clear/batchClear) and keeps the cells of every tab, so results
+    can be compared with `grid()`. Each request body is JSON-encoded like the real client does
+    (unserializable values fail the same way) and rejected with a 400 when it is larger than
+    `max_request_bytes`; it then takes `latency` plus `seconds_per_cell` for every cell written.
+    With `keep_cells=False` writes are validated but not stored, for timing runs.
+    Thread-safe; `calls` counts requests per method.
+    """
+
+    def __init__(self, latency=0.0, seconds_per_cell=0.0, max_request_bytes=None, keep_cells=True):
+        self.latency = latency
+        self.seconds_per_cell = seconds_per_cell
+        self.max_request_bytes = max_request_bytes
+        self.keep_cells = keep_cells
+        self.lock = threading.Lock()
+        self.spreadsheets_data = {}
+        self.calls = collections.Counter()
+        self.largest_request_bytes = 0
+        self.next_sheet_id = 1
+
+    def execute(self, method, body, handler):
+        size = len(json.dumps(body)) if body is not None else 0
+        with self.lock:
+            self.calls[method] += 1
+            self.largest_request_bytes = max(self.largest_request_bytes, size)
+        if self.max_request_bytes and size > self.max_request_bytes:
+            raise FakeHttpError(400, f"Request payload size exceeds the limit: {self.max_request_bytes} bytes.")
+        cells = sum(len(row) for data in (body or {}).get('data', [body or {}]) for row in data.get('values', []))
+        time.sleep(self.latency + cells * self.seconds_per_cell)
+        with self.lock:
+            return handler()
+
+    def request(self, method, body, handler):
+        return FakeRequest(self, method, body, handler)
+
+    def spreadsheets(self):
+        def values():
+            return SimpleNamespace(
+                update=lambda spreadsheetId, range, valueInputOption, body: self.request(
+                    'values.update', body, lambda: self.write(spreadsheetId, range, body['values'])),
+                batchUpdate=lambda spreadsheetId, body: self.request(
+                    'values.batchUpdate', body,
+                    lambda: [self.write(spreadsheetId, data['range'], data['values']) for data in body['data']]),
+                clear=lambda spreadsheetId, range: self.request(
+                    'values.clear', None, lambda: self.clear(spreadsheetId, range)),
+                batchClear=lambda spreadsheetId, body: self.request(
+                    'values.batchClear', body, lambda: [self.clear(spreadsheetId, range) for range in body['ranges']]),
+            )
+
+        return SimpleNamespace(
+            create=lambda body: self.request('create', body, lambda: self.create(body)),
+            get=lambda spreadsheetId, **kwargs: self.request('get', None, lambda: self.metadata(spreadsheetId)),
+            batchUpdate=lambda spreadsheetId, body: self.request(
+                'batchUpdate', body, lambda: self.batch_update(spreadsheetId, body)),
+            values=values,
+        )
+
+    def create(self, body):
+        spreadsheet_id = f"fake-spreadsheet-{len(self.spreadsheets_data) + 1}"
+        self.spreadsheets_data[spreadsheet_id] = {}
+        self.add_sheet(spreadsheet_id, 'Sheet1')
+        return {'spreadsheetId': spreadsheet_id, 'properties': body.get('properties', {})}
+
+    def add_sheet(self, spreadsheet_id, title):
+        sheets = self.spreadsheets_data.setdefault(spreadsheet_id, {})
+        if title in sheets:
+            raise FakeHttpError(400, f"A sheet with the name \"{title}\" already exists.")
+        sheets[title] = {'sheetId': self.next_sheet_id, 'cells': {}}
+        self.next_sheet_id += 1
+        return {'addSheet': {'properties': {'title': title, 'sheetId': sheets[title]['sheetId']}}}
+
+    def delete_rows(self, spreadsheet_id, ranges):
+        """Applies deleteDimension row ranges ((sheetId, startIndex, endIndex), zero-based) in order."""
+        sheets = {sheet['sheetId']: sheet for sheet in self.spreadsheets_data.get(spreadsheet_id, {}).values()}
+        for sheet_id in {sheet_id for sheet_id, _, _ in ranges}:
+            if sheet_id not in sheets:
+                raise FakeHttpError(400, f"No grid with id: {sheet_id}")
+            cells = sheets[sheet_id]['cells']
+            rows = [cells.get(row) for row in range(1, max(cells, default=0) + 1)]
+            for _, start_index, end_index in [item for item in ranges if item[0] == sheet_id]:
+                del rows[start_index:end_index]
+            sheets[sheet_id]['cells'] = {row: values for row, values in enumerate(rows, start=1) if values}
+
+    def metadata(self, spreadsheet_id):
+        return {'spreadsheetId': spreadsheet_id, 'sheets': [
+            {'properties': {'title': title, 'sheetId': sheet['sheetId']}}
+            for title, sheet in self.spreadsheets_data.setdefault(spreadsheet_id, {}).items()
+        ]}
+
+    def batch_update(self, spreadsheet_id, body):
+        replies = []
+        deletes = []
+        for request in body['requests']:
+            if 'addSheet' in request:
+                replies.append(self.add_sheet(spreadsheet_id, request['addSheet']['properties']['title']))
+            elif 'deleteDimension' in request and request['deleteDimension']['range']['dimension'] == 'ROWS':
+                grid_range = request['deleteDimension']['range']
+                deletes.append((grid_range['sheetId'], grid_range['startIndex'], grid_range['endIndex']))
+                replies.append({})
+            else:
+                raise FakeHttpError(400, f"Unsupported request: {list(request)}")
+        if deletes:
+            self.delete_rows(spreadsheet_id, deletes)
+        return {'spreadsheetId': spreadsheet_id, 'replies': replies}
+
+    def parse_range(self, spreadsheet_id, range_name):
+        match = re.match(r"^(?:'((?:[^']|'')*)'|([^!]+))!([A-Z]+)(\d+)(?::([A-Z]+)(\d*))?$", range_name)
+        if not match:
+            raise FakeHttpError(400, f"Unable to parse range: {range_name}")
+        title = match.group(1).replace("''", "'") if match.group(1) is not None else match.group(2)
+        sheets = self.spreadsheets_data.get(spreadsheet_id, {})
+        if title not in sheets:
+            raise FakeHttpError(400, f"Unable to parse range: {range_name}")
+
+        def column_number(letters):
+            number = 0
+            for letter in letters:
+                number = number * 26 + ord(letter) - ord('A') + 1
+            return number
+
+        end_column = column_number(match.group(5)) if match.group(5) else None
+        end_row = int(match.group(6)) if match.group(6) else None
+        return sheets[title]['cells'], int(match.group(4)), column_number(match.group(3)), end_row, end_column
+
+    def write(self, spreadsheet_id, range_name, values):
+        cells, row, column, _, _ = self.parse_range(spreadsheet_id, range_name)
+        if not self.keep_cells:
+            return
+        for row_offset, row_values in enumerate(values):
+            row_cells = cells.setdefault(row + row_offset, {})
+            for column_offset, value in enumerate(row_values):
+                row_cells[column + column_offset] = value
+
+    def clear(self, spreadsheet_id, range_name):
+        cells, row, column, end_row, end_column = self.parse_range(spreadsheet_id, range_name)
+        for cell_row, row_cells in cells.items():
+            if cell_row >= row and (end_row is None or cell_row <= end_row):
+                for cell_column in [cell_column for cell_column in row_cells
+                                    if cell_column >= column and (end_column is None or cell_column <= end_column)]:
+                    del row_cells[cell_column]
+
+    def grid(self, spreadsheet_id, title):
+        """Cell values of a tab as a list of rows, without trailing empty cells."""
+        cells = {row: row_cells for row, row_cells in
+                 self.spreadsheets_data[spreadsheet_id][title]['cells'].items() if row_cells}
+        if not cells:
+            return []
+        rows = [[] for _ in range(max(cells))]
+        for row, row_cells in cells.items():
+            for column, value in sorted(row_cells.items()):
+                rows[row - 1].extend([""] * (column - 1 - len(rows[row - 1])))
+                rows[row - 1].append(value)
+        return rows
+
+
+class FakeDriveService:
+    """In-memory stand-in for the Drive v3 service; records permission grants and folder moves."""
+
+    def __init__(self):
+        self.permissions_created = []
+        self.folders = {}
+        self.parents = {}
+
+    def permissions(self):
+        def create(fileId, body, **kwargs):
+            self.permissions_created.append((fileId, body))
+            return FakeRequest(self, 'permissions.create', body, lambda: {'id': 'anyoneWithLink'})
+
+        return SimpleNamespace(create=create)
+
+    def files(self):
+        def list_files(q, **kwargs):
+            name = re.search(r"name='([^']*)'", q).group(1)
+            return FakeRequest(self, 'files.list', None, lambda: {'files': [
+                {'id': folder_id, 'name': name} for folder_id, folder_name in self.folders.items() if folder_name == name
+            ]})
+
+        def create(body, **kwargs):
+            def handler():
+                folder_id = f"fake-folder-{len(self.folders) + 1}"
+                self.folders[folder_id] = body['name']
+                return {'id': folder_id}
+            return FakeRequest(self, 'files.create', body, handler)
+
+        def update(fileId, addParents, removeParents, **kwargs):
+            def handler():
+                self.parents[fileId] = [addParents]
+                return {'id': fileId, 'parents': [addParents]}
+            return FakeRequest(self, 'files.update', None, handler)
+
+        return SimpleNamespace(
+            list=list_files,
+            create=create,
+            get=lambda fileId, **kwargs: FakeRequest(
+                self, 'files.get', None, lambda: {'parents': self.parents.get(fileId, ['root'])}),
+            update=update,
+        )
+
+    def execute(self, method, body, handler):
+        return handler()
+
+
+class FakeClientRegistry:
+    """
+    google_clients.ClientRegistry stand-in handing out one shared FakeSheetsService / FakeDriveService,
+    whose requests go through `scheduler` (a google_quota.QuotaScheduler) when one is given.
+    """
+
+    def __init__(self, latency=0.0, scheduler=None):
+        self.sheets = FakeSheetsService(latency)
+        self.drive = FakeDriveService()
+        self.sheets.api, self.drive.api = 'sheets', 'drive'
+        self.sheets.scheduler = self.drive.scheduler = scheduler
+
+    def service(self, service_name, version, scopes=None):
+        return self.sheets if service_name == 'sheets' else self.drive
@@ -0,0 +1,24 @@
+import importlib.util
+import json
+import os
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_script(relative_path, name):
+    """Imports one of the report scripts (e.g. 'tc_payroll/main.py') as a module."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BASE_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def properties(rows):
+    """Raw property rows, as read from the dataset, from (id, {label: value}) pairs."""
+    return pd.DataFrame({
+        'id': [property_id for property_id, _ in rows],
+        'field_values': [json.dumps([{'label': label, 'value': value} for label, value in values.items()])
+                         for _, values in rows],
+    })
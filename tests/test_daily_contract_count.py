@@ -0,0 +1,99 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import schemas
+from daily_contract_count.summary_dataset import SummaryDataset
+from daily_contract_count.summary_engine import SummarySpec, compute_summaries
+from field_values import write_flattened_dataset
+from property_store import DatasetWriter, records_to_table
+from schemas import CTC_TEAM_LIST, PREFERRED_TEAM_LIST
+
+SPECS = [
+    SummarySpec("CTC - Closing", "closing_date", ("CTC - Closed - PAID",), CTC_TEAM_LIST),
+    SummarySpec("All Closing", "closing_date", ("CTC - Closed - PAID",)),
+    SummarySpec("Client Type-Buyer", "closing_date", ("CTC - Closed - PAID",), CTC_TEAM_LIST, "Buyer"),
+    SummarySpec("Preferred Closing", "closing_date", ("CTC - Closed - PAID",), PREFERRED_TEAM_LIST),
+    SummarySpec("Next Month - CTC", "closing_date", ("CTC - Pending",), CTC_TEAM_LIST, window="next_month"),
+    SummarySpec("All Other Month - CTC", "closing_date", ("CTC - Pending",), CTC_TEAM_LIST, window="rest_of_year"),
+]
+
+
+@pytest.fixture
+def ctc_team_list(tmp_path):
+    """A registry with a CTC team list and no preferred one."""
+    (tmp_path / 'ctc_teams.csv').write_text('CTC Team\n')
+    previous = schemas.set_registry(schemas.SchemaRegistry([str(tmp_path)]))
+    yield
+    schemas.set_registry(previous)
+
+
+def records(rows):
+    """Raw property records of (team, status, client type, closing date) rows."""
+    return [{
+        'id': property_id,
+        'created': '2024-01-01 00:00:00',
+        'timezone': 'America/Chicago',
+        'team_id': 1,
+        'team_name': team,
+        'team_user_id': 1,
+        'team_user_name': 'User',
+        'agent_id': 1,
+        'agent_name': 'Agent',
+        'brokerage': 'Realty',
+        'api_data': None,
+        'inbound_email_address': None,
+        'field_values': [
+            {'label': 'Contract Status', 'key': 'contract_status', 'type': 'select', 'value': status},
+            {'label': 'Contract Client Type', 'key': 'contract_client_type', 'type': 'select', 'value': client_type},
+            {'label': 'Closing', 'key': 'closing_date', 'type': 'date', 'value': closing},
+        ],
+    } for property_id, (team, status, client_type, closing) in enumerate(rows, start=1)]
+
+
+PROPERTIES = records([
+    ('CTC Team', 'CTC - Closed - PAID', 'Buyer', '2024-01-15'),
+    ('CTC Team', 'CTC - Closed - PAID', 'Seller', '2024-03-02'),
+    ('Other Team', 'CTC - Closed - PAID', 'Buyer', '2024-02-01'),
+    ('CTC Team', 'CTC - Pending', 'Buyer', '2024-04-10'),
+    ('CTC Team', 'CTC - Pending', 'Seller', '2024-06-10'),
+    ('CTC Team', 'CTC - Pending', 'Seller', '2025-01-01'),
+    ('CTC Team', 'CTC - Pending', 'Seller', '2024-02-20'),
+    ('CTC Team', 'CTC - Pending', 'Seller', ''),
+])
+
+# The preferred team list is missing: its row is left out
+SUMMARIES = [
+    {'state': 'CTC - Closing', 'Jan 2024': 1, 'Feb 2024': 0, 'Mar 2024': 1},
+    {'state': 'All Closing', 'Jan 2024': 1, 'Feb 2024': 1, 'Mar 2024': 1},
+    {'state': 'Client Type-Buyer', 'Jan 2024': 1, 'Feb 2024': 0, 'Mar 2024': 0},
+    {'state': 'Next Month - CTC', 'Jan 2024': 1, 'Feb 2024': 0, 'Mar 2024': 1},
+    {'state': 'All Other Month - CTC', 'Jan 2024': 3, 'Feb 2024': 2, 'Mar 2024': 2},
+]
+
+
+def test_summaries(ctc_team_list):
+    df = SummaryDataset(records_to_table(PROPERTIES).to_pandas()).frame()
+
+    assert df['closing_date'].dtype == 'datetime64[ns]'
+    assert compute_summaries(df, SPECS, today=datetime(2024, 3, 10)) == SUMMARIES
+
+
+def test_summaries_from_the_flattened_table(ctc_team_list, tmp_path, capsys):
+    folder = str(tmp_path / 'datas')
+    os.makedirs(folder)
+    with DatasetWriter(folder) as writer:
+        writer.write_records(PROPERTIES)
+    write_flattened_dataset(folder)
+
+    df = SummaryDataset(os.path.join(folder, 'all_properties_*.parquet')).frame()
+    assert '(flattened table)' in capsys.readouterr().out
+    assert df['closing_date'].dtype == 'datetime64[ns]'
+    assert compute_summaries(df, SPECS, today=datetime(2024, 3, 10)) == SUMMARIES
+
+
+def test_unknown_window():
+    with pytest.raises(ValueError):
+        compute_summaries(pd.DataFrame(), [SummarySpec("Row", "closing_date", (), window="last_year")])
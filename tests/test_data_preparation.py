@@ -0,0 +1,77 @@
+import pandas as pd
+
+from data_preparation import apply_staging_rules, na_filler, update_agent_account_index
+
+
+def date(value=None):
+    return pd.Timestamp(value) if value else na_filler
+
+
+def transactions():
+    """Formatted transactions, one per staging rule."""
+    return pd.DataFrame({
+        'Contract Title': ['Test house', '1 Main St', '2 Main St', '3 Main St', 'TRAINING file', '5 Main St',
+                           '6 Main St', '7 Main St'],
+        'Empower TC Name': ['Molly Kelley', '', '', 'Molly Kelley', 'Molly Kelley', 'Molly Kelley', 'Molly Kelley',
+                            'Molly Kelley'],
+        'Empower Agent Name': ['Agent 1'] * 8,
+        'CTC Started with Empower': [date('2024-01-02'), date(), date('2022-05-01'), date(), date('2024-01-02'),
+                                     date('2024-01-02'), date('2024-01-02'), date('2024-01-02')],
+        'Listing Started with Empower': [date(), date(), date('2022-04-01'), date('2024-01-03'), date(), date(), date(),
+                                         date()],
+        'Offer Started with Empower': [date()] * 8,
+        'Compliance Started with Empower': [date()] * 8,
+        'Live on MLS Date': [date(), date(), date('2022-04-10'), date(), date(), date(), date(), date()],
+        'Listing PAID Date': [date(), date(), date('2022-04-20'), date(), date(), date(), date(), date()],
+        'Listing PAID Amount': [0, 0, 350, 0, 0, 0, 0, 0],
+        'Closing': [date(), date(), date('2024-01-05'), date('2024-01-06'), date(), date('2024-02-01'),
+                    date('2024-02-01'), date('2024-02-01')],
+        'Contract Status': ['CTC - Pending', 'CTC - Pending', 'CTC - Closed', 'Listing - PAID', 'CTC - Pending',
+                            'CTC - Closed', 'CTC - Closed', 'CTC - Closed'],
+        'Billing Status': ['none', 'none', 'none', 'Invoiced', 'none', 'none', 'none', 'none'],
+        'Billing Amount': [0, 0, 0, 0, 0, 0, 0, 250],
+        'Other Amount': [0, 0, 0, 0, 0, 150, 0, 0],
+        'Preferred  Ai  CTC': ['none', 'none', 'Yes', 'none', 'none', 'none', 'No', 'none'],
+    })
+
+
+def test_staging_rules():
+    staged = apply_staging_rules(transactions())
+
+    assert staged.index.tolist() == [2, 3, 5, 6, 7]
+    assert staged['Closing'].tolist() == [date('2024-01-05'), na_filler, date('2024-02-01'), date('2024-02-01'),
+                                          date('2024-02-01')]
+    assert staged.loc[2, ['Listing Started with Empower', 'Live on MLS Date', 'Listing PAID Date']].tolist() == \
+        [na_filler] * 3
+    assert staged.loc[2, 'Listing PAID Amount'] == 0
+    assert staged['Contract Status'].tolist() == ['CTC - Closed', 'Invoiced', 'CTC - Closed', 'CTC - Closed',
+                                                  'CTC - Closed']
+    assert staged['Billing Amount'].tolist() == [99, 0, 150, 400, 250]
+
+
+def agent_accounts(rows):
+    return pd.DataFrame(rows, columns=['id', 'row_hash', 'Contract Title', 'Date Created'])
+
+
+def test_agent_account_index(tmp_path):
+    rows = agent_accounts([
+        (1, 'a', 'Agent 1', pd.Timestamp('2024-01-01')),
+        (2, 'b', 'Agent 1', pd.Timestamp('2024-02-01')),
+        (3, 'c', 'Agent 2', pd.Timestamp('2024-01-15')),
+    ])
+    latest, duplicates = update_agent_account_index(rows, folder=tmp_path)
+    assert latest['id'].tolist() == [2, 3]
+    assert duplicates['id'].tolist() == [1]
+
+    # Agent 1's newest record is removed and Agent 2's changes; the index matches a rebuild
+    changed = agent_accounts([
+        (1, 'a', 'Agent 1', pd.Timestamp('2024-01-01')),
+        (3, 'd', 'Agent 2', pd.Timestamp('2024-03-01')),
+        (4, 'e', 'Agent 2', pd.Timestamp('2024-02-01')),
+    ])
+    latest, duplicates = update_agent_account_index(changed, folder=tmp_path)
+    assert latest['id'].tolist() == [3, 1]
+    assert duplicates['id'].tolist() == [4]
+    rebuilt, rebuilt_duplicates = update_agent_account_index(changed, folder=tmp_path, full=True)
+    pd.testing.assert_frame_equal(latest, rebuilt)
+    pd.testing.assert_frame_equal(duplicates, rebuilt_duplicates)
@@ -0,0 +1,43 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from fetch_properties import sync_properties
+from otc_client import OTCAPIError
+
+
+class PagedClient:
+    """Serves `records` a page at a time and fails every page from `fail_from` on."""
+
+    def __init__(self, records, fail_from=None):
+        self.records = records
+        self.fail_from = fail_from
+        self.metrics = SimpleNamespace(record_throttle=lambda seconds: None)
+
+    def get_json(self, url, params):
+        offset, limit = params['offset'], params['limit']
+        if self.fail_from is not None and offset >= self.fail_from:
+            raise OTCAPIError(f"GET {url} failed at offset {offset}", status_code=503)
+        return self.records[offset:offset + limit]
+
+
+def record(property_id):
+    return {
+        'id': property_id, 'created': '2024-01-03 10:00:00', 'timezone': 'UTC', 'team_id': 1, 'team_name': 'Team',
+        'team_user_id': 2, 'team_user_name': 'User', 'agent_id': 3, 'agent_name': 'Agent', 'brokerage': 'Brokerage',
+        'api_data': None, 'inbound_email_address': None, 'field_values': [],
+    }
+
+
+def test_failed_crawl_leaves_no_staging_file(tmp_path):
+    records = [record(property_id) for property_id in range(1, 11)]
+    sync_properties('token', folder=str(tmp_path), limit=2, max_workers=2, client=PagedClient(records), flatten=False)
+    published = sorted(os.listdir(tmp_path))
+
+    with pytest.raises(OTCAPIError):
+        sync_properties('token', folder=str(tmp_path), limit=2, max_workers=2, full=True,
+                        client=PagedClient(records, fail_from=4), flatten=False)
+    # The previous dataset, manifest and sync state are left as they were
+    assert sorted(os.listdir(tmp_path)) == published
+    assert '_staging.parquet' not in published
@@ -0,0 +1,126 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from field_values import (PROPERTY_COLUMNS, align_flattened_tables, extract_fields, flatten_table, query_fields, read_flattened_fields,
+                          update_flattened_dataset, write_flattened_dataset)
+from property_store import DatasetWriter, records_to_table, replace_dataset
+
+
+def field(label, key, field_type, value):
+    return {'label': label, 'key': key, 'type': field_type, 'value': value}
+
+
+def record(property_id, status, closing, team='Team A', commission=''):
+    return {
+        'id': property_id,
+        'created': '2024-01-02 10:00:00',
+        'timezone': 'America/Chicago',
+        'team_id': 1,
+        'team_name': team,
+        'team_user_id': 1,
+        'team_user_name': 'User',
+        'agent_id': property_id,
+        'agent_name': f'Agent {property_id}',
+        'brokerage': 'Realty',
+        'api_data': None,
+        'inbound_email_address': f'property{property_id}@example.com',
+        'field_values': [
+            field('Contract Status', 'contract_status', 'select', status),
+            field('Closing', 'closing_date', 'date', closing),
+            field('Commission', 'commission', 'decimal', commission),
+        ],
+    }
+
+
+RECORDS = [
+    record(1, 'CTC - Pending', '2024-03-10', commission='1,250.5'),
+    record(2, 'CTC - Closed - PAID', '03/20/2024', team='Team B'),
+    record(3, 'CTC - Pending', 'not a date'),
+]
+
+
+def raw_frame(records):
+    return records_to_table(records).to_pandas()
+
+
+def test_extract_fields():
+    df = raw_frame(RECORDS)
+    df.loc[2, 'field_values'] = 'not json'
+
+    fields = extract_fields(df['field_values'], ['Closing', 'Contract Status', 'Closing', 'Missing'])
+    assert fields.to_dict('list') == {
+        'Closing': ['2024-03-10', '03/20/2024', None],
+        'Contract Status': ['CTC - Pending', 'CTC - Closed - PAID', None],
+        'Missing': [None, None, None],
+    }
+    assert extract_fields(df['field_values'], ['closing_date'], by='key')['closing_date'].tolist() == \
+        ['2024-03-10', '03/20/2024', None]
+
+
+def test_query_fields():
+    df = raw_frame(RECORDS)
+
+    result = query_fields(df, ['Contract Status', 'Closing'], date_fields=['Closing'], columns=['id', 'team_name'])
+    assert result['id'].tolist() == [1, 2, 3]
+    assert result['Closing'].tolist()[:2] == [pd.Timestamp('2024-03-10'), pd.Timestamp('2024-03-20')]
+    assert pd.isna(result['Closing'][2])
+
+    filtered = query_fields(df, ['contract_status', 'closing_date'], by='key', date_fields=['closing_date'],
+                            columns=['id', 'team_name'],
+                            equals={'contract_status': ['CTC - Pending', 'CTC - Closed - PAID'], 'team_name': 'Team A'},
+                            date_range=('closing_date', datetime(2024, 3, 1), None))
+    assert filtered.to_dict('list') == {'id': [1], 'team_name': ['Team A'], 'contract_status': ['CTC - Pending'],
+                                        'closing_date': [pd.Timestamp('2024-03-10')]}
+
+
+def test_flatten_table_first_label_wins():
+    repeated = dict(RECORDS[0], field_values=RECORDS[0]['field_values'] +
+                    [field('Contract Status', 'contract_status', 'select', 'repeated')])
+    table = flatten_table(records_to_table([repeated] + RECORDS[1:]))
+
+    assert table.column_names == PROPERTY_COLUMNS + ['Contract Status', 'Closing', 'Commission']
+    assert table['Contract Status'].to_pylist() == ['CTC - Pending', 'CTC - Closed - PAID', 'CTC - Pending']
+    assert table.schema.field('Closing').type == pa.date32()
+    assert table['Closing'].to_pylist() == [datetime(2024, 3, 10).date(), datetime(2024, 3, 20).date(), None]
+    assert [str(value) if value is not None else None for value in table['Commission'].to_pylist()] == \
+        ['1250.5000', None, None]
+    assert table.schema.field('Closing').metadata == {b'key': b'closing_date', b'type': b'date'}
+
+
+def test_type_conflicts_become_strings():
+    as_date = flatten_table(records_to_table([dict(RECORDS[0], field_values=[field('Retyped', 'retyped', 'date',
+                                                                                  '2024-01-02')])]))
+    as_decimal = flatten_table(records_to_table([dict(RECORDS[1], field_values=[field('Retyped', 'retyped', 'decimal',
+                                                                                     '150')])]))
+
+    tables, schema = align_flattened_tables([as_date, as_decimal])
+    assert schema.field('Retyped').type == pa.string()
+    assert pa.concat_tables(tables)['Retyped'].to_pylist() == ['2024-01-02', '150.0000']
+
+
+def test_update_matches_a_full_rebuild(tmp_path):
+    folder = str(tmp_path)
+    with DatasetWriter(folder) as writer:
+        writer.write_records(RECORDS)
+    write_flattened_dataset(folder)
+
+    changed = [record(2, 'CTC - Pending', '2024-04-01', team='Team B'),
+               dict(record(4, 'CTC - Pending', '2024-05-01'), field_values=[field('New', 'new', 'text', 'x')])]
+    staging = os.path.join(folder, '_staging.parquet')
+    pq.write_table(records_to_table(changed), staging)
+    replace_dataset(staging, folder, keep_existing=True, exclude_ids={2, 3, 4})
+    update_flattened_dataset({2, 4}, deleted_ids={3}, folder=folder)
+    updated = pq.read_table(os.path.join(folder, 'properties_flat.parquet'))
+    write_flattened_dataset(folder)
+    rebuilt = pq.read_table(os.path.join(folder, 'properties_flat.parquet'))
+
+    assert updated.select(sorted(updated.column_names)).equals(rebuilt.select(sorted(rebuilt.column_names)))
+    fields = read_flattened_fields(['closing_date', 'new', 'unknown'], folder=folder)
+    assert fields['id'].tolist() == [1, 2, 4]
+    assert fields['closing_date'].tolist()[:2] == [pd.Timestamp('2024-03-10'), pd.Timestamp('2024-04-01')]
+    assert fields['new'].tolist()[2] == 'x'
+    assert fields['unknown'].isna().all()
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+
+from google_quota import QuotaScheduler, TokenBucket, error_retry_after, error_status, quota_name
+
+
+class FakeClock:
+    """Clock that only moves when slept on."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+class ApiError(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.resp = SimpleNamespace(status=status, get=lambda name: retry_after if name == 'retry-after' else None)
+
+
+def failing(status):
+    def call():
+        raise ApiError(status)
+    return call
+
+
+def scheduler(clock, **kwargs):
+    return QuotaScheduler(clock=clock, sleep=clock.sleep, rand=lambda: 0.0, **kwargs)
+
+
+def test_quota_name():
+    assert quota_name('sheets.spreadsheets.values.batchUpdate') == 'sheets.write'
+    assert quota_name('sheets.spreadsheets.get') == 'sheets.read'
+    assert quota_name('drive.files.list') == 'drive'
+    assert quota_name(None) == ''
+
+
+def test_error_status():
+    assert error_status(ApiError(503)) == 503
+    assert error_status(SimpleNamespace(status_code='429')) == 429
+    assert error_status(ValueError()) is None
+    assert error_retry_after(ApiError(429, '7')) == 7
+    assert error_retry_after(ValueError()) is None
+
+
+def test_token_bucket():
+    bucket = TokenBucket(60)
+
+    assert [bucket.reserve(0.0) for _ in range(6)] == [0.0] * 6
+    assert bucket.reserve(0.0) == pytest.approx(60 / 54)
+    assert bucket.reserve(60 / 54) == pytest.approx(60 / 54)
+
+
+def test_calls_are_paced():
+    clock = FakeClock()
+    quota = scheduler(clock, quotas={'sheets.write': 60})
+
+    for _ in range(8):
+        quota.run('sheets.write', lambda: None)
+    assert clock.sleeps == [1.111, 1.111]
+    assert quota.snapshot()['sheets.write']['max_queue_depth'] == 1
+
+
+def test_retries_and_back_off():
+    clock = FakeClock()
+    quota = scheduler(clock, quotas={})
+    errors = [ApiError(503), ApiError(429, '5')]
+
+    def call():
+        if errors:
+            raise errors.pop(0)
+        return 'done'
+
+    assert quota.run('sheets.write', call) == 'done'
+    # 1 second of backoff after the 503, then the Retry-After of the 429
+    assert clock.sleeps == [1.0, 5.0]
+    assert quota.blocked_until == {'sheets.write': 6.0}
+
+
+def test_errors_that_are_not_retried():
+    clock = FakeClock()
+    quota = scheduler(clock, quotas={}, max_retries=2)
+
+    with pytest.raises(ApiError):
+        quota.run('drive', failing(400))
+    assert clock.sleeps == []
+    with pytest.raises(ApiError):
+        quota.run('drive', failing(500))
+    assert clock.sleeps == [1.0, 2.0]
@@ -0,0 +1,103 @@
+import pandas as pd
+
+from gsheetapi import (create_google_sheet, plan_sheet_sync, populate_google_sheets, prepare_sheets, row_runs,
+                       sheet_snapshot, sync_google_sheet, value_chunks)
+from tests.fakes import FakeDriveService, FakeSheetsService
+
+
+def spreadsheet(**kwargs):
+    service = FakeSheetsService(**kwargs)
+    return service, service.create({})['spreadsheetId']
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['Contract Title', 'Billing Amount'])
+
+
+def test_value_chunks():
+    df = pd.DataFrame({
+        'Title': ['A', 'B', None, 'D', 'E'],
+        'Closing': pd.to_datetime(['2024-01-02', None, '2024-01-02 10:30', '2024-02-01', None], format='ISO8601'),
+    })
+
+    assert list(value_chunks(df, max_chunk_cells=4)) == [
+        (1, [['Title', 'Closing'], ['A', '2024-01-02 00:00:00']]),
+        (3, [['B', ''], ['', '2024-01-02 10:30:00']]),
+        (5, [['D', '2024-02-01 00:00:00'], ['E', '']]),
+    ]
+    assert list(value_chunks(df.iloc[:0])) == [(1, [['Title', 'Closing']])]
+    # A row wider than the limit still makes a piece
+    assert [row_number for row_number, _ in value_chunks(df, max_chunk_cells=1)] == [1, 2, 3, 4, 5, 6]
+
+
+def test_prepare_sheets():
+    service, spreadsheet_id = spreadsheet()
+    prepare_sheets(service, spreadsheet_id, ['existing'])
+    service.write(spreadsheet_id, "'existing'!A1", [['old', 'values']])
+    service.calls.clear()
+
+    sheet_ids = prepare_sheets(service, spreadsheet_id, ['new', 'existing', 'new'])
+    assert sheet_ids == {'Sheet1': 1, 'existing': 2, 'new': 3}
+    assert dict(service.calls) == {'get': 1, 'batchUpdate': 1, 'values.batchClear': 1}
+    assert service.grid(spreadsheet_id, 'existing') == []
+
+    service.calls.clear()
+    prepare_sheets(service, spreadsheet_id, ['new'], sheet_ids)
+    assert dict(service.calls) == {'values.batchClear': 1}
+
+
+def test_row_runs():
+    assert row_runs([0, 1, 2, 5, 7, 8]) == [(0, 2), (5, 5), (7, 8)]
+    assert row_runs([]) == []
+
+
+def test_plan_sheet_sync_with_repeated_keys():
+    previous = sheet_snapshot(frame([['A', 1], ['X', 2], ['B', 3], ['B', 4], ['D', 5]]), ['Contract Title'])
+    current = sheet_snapshot(frame([['A', 10], ['B', 3], ['D', 5], ['E', 6]]), ['Contract Title'])
+
+    deleted, updated, inserted, snapshot = plan_sheet_sync(previous, current)
+    # Rows sharing a key are told apart by occurrence: the second B is the one removed
+    assert previous['keys'] == ["['A']#1", "['X']#1", "['B']#1", "['B']#2", "['D']#1"]
+    assert deleted == [1, 3]
+    assert updated == [(0, 0)]
+    assert inserted == [3]
+    assert snapshot == current
+
+
+def test_sync_deletes_rows_bottom_up(tmp_path):
+    service, spreadsheet_id = spreadsheet()
+    yesterday = frame([['A', 1], ['X', 2], ['B', 3], ['B', 4], ['C', 5], ['D', 6]])
+    assert sync_google_sheet(service, spreadsheet_id, yesterday, 'tab', ['Contract Title'], tmp_path)['full']
+    service.calls.clear()
+
+    today = frame([['A', 10], ['B', 3], ['D', 6], ['E', 7]])
+    result = sync_google_sheet(service, spreadsheet_id, today, 'tab', ['Contract Title'], tmp_path)
+    assert result == {'inserted': 1, 'updated': 1, 'deleted': 3, 'requests': 2, 'full': False}
+    # Deleting X first would have shifted the second B and C up by one row
+    assert service.grid(spreadsheet_id, 'tab') == [['Contract Title', 'Billing Amount'], ['A', 10], ['B', 3], ['D', 6],
+                                                   ['E', 7]]
+    assert dict(service.calls) == {'get': 1, 'batchUpdate': 1, 'values.batchUpdate': 1}
+
+
+def test_failed_tabs_do_not_stop_the_others(capsys):
+    service, spreadsheet_id = spreadsheet(max_request_bytes=2000)
+    small = frame([['A', 1], ['B', 2]])
+    large = frame([[f"{i} Synthetic Street", i] for i in range(200)])
+
+    written = populate_google_sheets(lambda: service, spreadsheet_id, [large, small, small],
+                                     ['large', 'small', 'synced'], max_workers=2, sync_keys={'synced': ['Missing']})
+    assert written == ['small']
+    assert service.grid(spreadsheet_id, 'small') == [['Contract Title', 'Billing Amount'], ['A', 1], ['B', 2]]
+    out = capsys.readouterr().out
+    assert "Error working with Google Sheet 'large': <HttpError 400: Request payload size exceeds the limit" in out
+    assert "Error working with Google Sheet 'synced': 'Missing'" in out
+
+
+def test_create_google_sheet():
+    service = FakeSheetsService()
+    drive = FakeDriveService()
+
+    spreadsheet_id = create_google_sheet([frame([['A', 1]])], ['tab'], 'Report', service_factory=lambda: service,
+                                         drive_service=drive)
+    assert service.grid(spreadsheet_id, 'tab') == [['Contract Title', 'Billing Amount'], ['A', 1]]
+    assert drive.permissions_created == [(spreadsheet_id, {'type': 'anyone', 'role': 'writer'})]
@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from main_orchestrator import DagOrchestrator, Task, TaskResult
+
+
+def test_stages_and_inputs():
+    started = []
+    lock = threading.Lock()
+
+    def task(name, value):
+        def run(inputs):
+            with lock:
+                started.append(name)
+            return value + sum(inputs.values())
+        return run
+
+    orchestrator = DagOrchestrator([
+        Task('report', task('report', 100), depends_on=('dataset', 'ingest')),
+        Task('ingest', task('ingest', 1)),
+        Task('dataset', task('dataset', 10), depends_on=('ingest',)),
+        Task('other', task('other', 1000)),
+    ])
+    assert orchestrator.stages == {'report': 2, 'ingest': 0, 'dataset': 1, 'other': 0}
+
+    results = orchestrator.run()
+    assert list(results) == ['report', 'ingest', 'dataset', 'other']
+    assert {name: result.result for name, result in results.items()} == \
+        {'report': 112, 'ingest': 1, 'dataset': 11, 'other': 1000}
+    assert started.index('ingest') < started.index('dataset') < started.index('report')
+
+
+def test_retries_and_skipped_tasks():
+    attempts = []
+    sleeps = []
+
+    def flaky(inputs):
+        attempts.append('flaky')
+        if len(attempts) < 2:
+            raise RuntimeError('try again')
+        return 'ok'
+
+    def broken(inputs):
+        raise ValueError('broken')
+
+    results = DagOrchestrator([
+        Task('flaky', flaky, retries=1),
+        Task('broken', broken, retries=2),
+        Task('after_broken', lambda inputs: 'never', depends_on=('broken', 'flaky')),
+    ], retry_delay=5.0, sleep=sleeps.append).run()
+
+    assert [(result.status, result.attempts) for result in results.values()] == \
+        [('ok', 2), ('failed', 3), ('skipped', 0)]
+    assert results['broken'].error == 'ValueError: broken'
+    assert results['after_broken'].error == 'dependency failed: broken'
+    assert sleeps == [5.0, 5.0, 5.0]
+
+
+def test_timed_out_task_is_not_retried():
+    release = threading.Event()
+    results = DagOrchestrator([Task('slow', lambda inputs: release.wait(5), timeout=0.05, retries=2)]).run()
+    release.set()
+
+    assert (results['slow'].status, results['slow'].attempts) == ('timeout', 1)
+    assert results['slow'].error == 'timed out after 0.05 seconds'
+
+
+@pytest.mark.parametrize('tasks', [
+    [Task('a', None), Task('a', None)],
+    [Task('a', None, depends_on=('b',))],
+    [Task('a', None, depends_on=('b',)), Task('b', None, depends_on=('a',))],
+])
+def test_invalid_graphs(tasks):
+    with pytest.raises(ValueError):
+        DagOrchestrator(tasks)
+
+
+def test_summary():
+    orchestrator = DagOrchestrator([Task('ingest', None), Task('report', None, depends_on=('ingest',))])
+    results = {
+        'ingest': TaskResult('ingest', 'ok', 0, attempts=1, started=10.0, seconds=2.0),
+        'report': TaskResult('report', 'failed', 1, attempts=2, started=12.5, seconds=1.25, error='RuntimeError: x'),
+    }
+    quotas = {'sheets.write': {'requests': 12, 'retries': 1, 'failures': 0, 'throttle_wait_seconds': 0.5,
+                               'retry_wait_seconds': 1.0, 'max_queue_depth': 3, 'p95_latency_seconds': 0.2}}
+
+    assert orchestrator.summary(results, 4.0, quotas).splitlines() == [
+        "Run finished in 4.00 seconds",
+        "  stage 0: 2.00 seconds",
+        "    ingest                   ok           2.00s  1 attempt(s)",
+        "  stage 1: 1.25 seconds",
+        "    report                   failed       1.25s  2 attempt(s)  RuntimeError: x",
+        "  Google API quotas:",
+        "    sheets.write             12 requests, 1 retries, 0 failures, throttled 0.50s, backed off 1.00s, "
+        "max queue 3, p95 latency 0.20s",
+    ]
@@ -0,0 +1,74 @@
+import json
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import schemas
+from report_dataset import PropertyDataset
+from report_extracts import EXTRACT_SPECS, extract_reports, window_bounds
+
+
+@pytest.fixture
+def team_lists(tmp_path):
+    """A registry reading stand-in extract team lists."""
+    (tmp_path / 'extract_ctc_teams.csv').write_text('CTC Team\n')
+    (tmp_path / 'extract_preferred_teams.csv').write_text('Preferred Team\n')
+    previous = schemas.set_registry(schemas.SchemaRegistry([str(tmp_path)]))
+    yield
+    schemas.set_registry(previous)
+
+
+def dataset(rows):
+    """PropertyDataset of (id, team, {key: value}) rows."""
+    return PropertyDataset('properties', df=pd.DataFrame({
+        'id': [property_id for property_id, _, _ in rows],
+        'team_name': [team for _, team, _ in rows],
+        'field_values': [json.dumps([{'label': key.title(), 'key': key, 'value': value} for key, value in values.items()])
+                         for _, _, values in rows],
+    }))
+
+
+def test_window_bounds():
+    today = datetime(2024, 12, 20, 15, 30)
+
+    assert window_bounds('last_month', today) == (datetime(2024, 11, 1), datetime(2024, 12, 1))
+    assert window_bounds('current_month', today) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+    assert window_bounds('next_month', today) == (datetime(2025, 1, 1), datetime(2025, 2, 1))
+    assert window_bounds('future', today) == (datetime(2025, 1, 1), None)
+    assert window_bounds('last_month', datetime(2024, 1, 1)) == (datetime(2023, 12, 1), datetime(2024, 1, 1))
+    with pytest.raises(ValueError):
+        window_bounds('this_year', today)
+
+
+def test_extract_reports(team_lists):
+    properties = dataset([
+        (1, 'CTC Team', {'closing_date': '2024-03-05', 'contract_client_type': 'Seller'}),
+        (2, 'Preferred Team', {'closing_date': '2024-03-31', 'contract_client_type': 'Seller',
+                               'listing_paid_date': '2024-02-10'}),
+        (3, 'CTC Team', {'closing_date': '2024-02-29', 'contract_status': 'CTC - Closed - PAID'}),
+        (4, 'CTC Team', {'closing_date': '2024-04-01'}),
+        (5, 'Preferred Team', {'closing_date': '2024-06-01', 'contract_client_type': 'Buyer'}),
+        (6, 'Other Team', {'closing_date': '02/01/2024', 'contract_status': 'CTC - Closed - PAID'}),
+        (7, 'CTC Team', {'closing_date': 'not a date'}),
+    ])
+
+    reports = extract_reports(EXTRACT_SPECS, properties, today=datetime(2024, 3, 15, 9, 0))
+    assert {name: report['id'].tolist() for name, report in reports.items()} == {
+        'closing_data_current_month': [1, 2],
+        'closing_data_preferred_seller': [2],
+        'close_paid_data': [3],
+        'data_last_month_compliance_paid_date': [],
+        'data_last_month_compliance_started_empower': [],
+        'data_last_month_listing_empower_started': [],
+        'data_last_month_listing_paid': [2],
+        'future_closing_data_ctc': [4],
+        'future_closing_data_ctc_next_month': [4],
+        'future_closing_data_prefered': [5],
+        'future_closing_data_preferred_next_month': [],
+    }
+    current_month = reports['closing_data_current_month']
+    assert list(current_month.columns) == ['id', 'team_name', 'closing_date']
+    assert current_month['closing_date'].tolist() == ['2024-03-05 00:00:00', '2024-03-31 00:00:00']
+    assert reports['closing_data_preferred_seller']['contract_client_type'].tolist() == ['Seller']
+    assert reports['close_paid_data']['is_closed_paid'].tolist() == [True]
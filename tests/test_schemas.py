@@ -0,0 +1,76 @@
+import os
+
+import pandas as pd
+import pytest
+
+from schemas import (CTC_TEAM_LIST, SCHEMA_PATH_VARIABLE, TRANSACTION_SOURCE, TRX_ORDER, ColumnSpec, SchemaRegistry,
+                     observed_labels, schema_search_path)
+
+
+def write(folder, path, rows):
+    path = os.path.join(folder, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        file.write(''.join(f"{row}\n" for row in rows))
+
+
+def test_search_path(monkeypatch):
+    monkeypatch.setenv(SCHEMA_PATH_VARIABLE, os.pathsep.join(['first', '', 'second']))
+    assert schema_search_path()[:2] == ['first', 'second']
+    assert len(schema_search_path()) == 3
+
+
+def test_first_file_found_wins(tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    write(second, 'ctc_teams.csv', ['Second'])
+    write(first, 'daily_contract_count/ctc_teams.csv', ['First nested'])
+    write(second, 'daily_contract_count/ctc_teams.csv', ['Second nested'])
+
+    assert SchemaRegistry([str(first), str(second)]).columns(CTC_TEAM_LIST) == ('First nested',)
+    write(first, 'ctc_teams.csv', ['First', '', 'Team 2'])
+    assert SchemaRegistry([str(first), str(second)]).columns(CTC_TEAM_LIST) == ('First', 'Team 2')
+
+
+def test_lists_are_read_once(tmp_path):
+    write(tmp_path, 'ctc_teams.csv', ['Team 1'])
+    registry = SchemaRegistry([str(tmp_path)])
+    assert registry.columns(CTC_TEAM_LIST) == ('Team 1',)
+
+    write(tmp_path, 'ctc_teams.csv', ['Team 2'])
+    assert registry.columns(CTC_TEAM_LIST) == ('Team 1',)
+
+
+def test_missing_list(tmp_path):
+    registry = SchemaRegistry([str(tmp_path)])
+    with pytest.raises(FileNotFoundError):
+        registry.columns(CTC_TEAM_LIST)
+    with pytest.raises(KeyError):
+        registry.columns('unknown')
+
+
+def test_transaction_columns(tmp_path):
+    write(tmp_path, 'trx_order.csv', ['Contract Title', 'Closing', 'Billing Amount'])
+    write(tmp_path, 'trx_date_columns.csv', ['Closing'])
+    write(tmp_path, 'trx_columns_need_fillna_0.csv', ['Billing Amount'])
+    write(tmp_path, 'trx_columns_need_fillna_none.csv', ['Contract Title'])
+    registry = SchemaRegistry([str(tmp_path)])
+
+    assert registry.transaction_columns() == (ColumnSpec('Contract Title', 'string', 'none'),
+                                              ColumnSpec('Closing', 'date'), ColumnSpec('Billing Amount', 'number', 0))
+    assert registry.transaction_dtypes() == {'Contract Title': 'object', 'Closing': 'datetime64[ns]',
+                                             'Billing Amount': 'float64'}
+
+    write(tmp_path, 'trx_date_columns.csv', ['Closing', 'Opening'])
+    with pytest.raises(ValueError):
+        SchemaRegistry([str(tmp_path)]).transaction_columns()
+
+
+def test_validate(tmp_path):
+    write(tmp_path, 'Columns_Transaction_Source.csv', ['Contract Title', 'Closing Date'])
+    registry = SchemaRegistry([str(tmp_path)])
+    labels = observed_labels(pd.DataFrame({'field_values': [
+        '[{"label": "Contract Title", "value": "1 Main St"}, {"label": "Closing", "value": ""}]', None,
+    ]}))
+
+    assert labels == {'Contract Title', 'Closing'}
+    assert registry.validate(labels, [TRANSACTION_SOURCE, TRX_ORDER]) == {TRANSACTION_SOURCE: ['Closing Date']}
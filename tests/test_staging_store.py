@@ -0,0 +1,72 @@
+import os
+
+import pandas as pd
+
+from staging_store import monthly_staging_summary, read_staging_table, save_staging_tables, staging_connection
+
+
+def agent_accounts(rows):
+    return pd.DataFrame({
+        'Date Created': ['2024-01-03 10:00:00', '2024-02-05 09:30:00'][:rows],
+        'Title': ['Agent 1', 'Agent 2'][:rows],
+    })
+
+
+def transactions():
+    return pd.DataFrame({
+        'Date Created': ['2024-02-05 09:30:00', '2024-02-01 08:00:00', '2024-01-03 10:00:00'],
+        'Contract Title': ['3 Main St', '2 Main St', '1 Main St'],
+        'Contract Status': ['CTC - Pending', 'CTC - Closed', 'CTC - Closed'],
+        'Billing Amount': [0, '400', 99.5],
+    })
+
+
+def test_save_and_read_back(tmp_path):
+    save_staging_tables({'agent_account': agent_accounts(2)}, folder=tmp_path)
+
+    df = read_staging_table('agent_account', folder=tmp_path)
+    assert df['Title'].tolist() == ['Agent 2', 'Agent 1']
+    assert df['Date Created'].dtype == 'datetime64[ns]'
+
+
+def test_empty_table_replaces_the_previous_one(tmp_path):
+    save_staging_tables({'agent_account': agent_accounts(1)}, folder=tmp_path)
+    save_staging_tables({'agent_account': agent_accounts(0)}, folder=tmp_path)
+
+    assert sorted(os.listdir(tmp_path)) == ['agent_account']
+    df = read_staging_table('agent_account', folder=tmp_path)
+    assert df.empty
+    assert list(df.columns) == ['Date Created', 'Title']
+    assert df['Date Created'].dtype == 'datetime64[ns]'
+
+
+def test_monthly_summary_with_an_empty_table(tmp_path):
+    save_staging_tables({'agent_account': agent_accounts(2), 'error_transaction': agent_accounts(0)},
+                        folder=tmp_path)
+
+    summary = monthly_staging_summary(tmp_path)
+    assert summary['Month'].tolist() == ['2024-02', '2024-01']
+    assert summary['Agent Accounts'].tolist() == [1, 1]
+    assert summary['Error Transactions'].tolist() == [0, 0]
+
+
+def test_read_columns_of_one_month(tmp_path):
+    save_staging_tables({'transaction': transactions()}, folder=tmp_path)
+
+    df = read_staging_table('transaction', columns=['Contract Title', 'Billing Amount'], months=['2024-02'],
+                            folder=tmp_path)
+    assert df.to_dict('list') == {'Contract Title': ['3 Main St', '2 Main St'], 'Billing Amount': [0.0, 400.0]}
+    assert read_staging_table('transaction', months=[], folder=tmp_path).empty
+
+
+def test_query_in_sql(tmp_path):
+    save_staging_tables({'transaction': transactions()}, folder=tmp_path)
+
+    conn = staging_connection(tmp_path)
+    counts = conn.execute('SELECT created_month, "Contract Status", count(*) FROM "transaction" '
+                          'GROUP BY ALL ORDER BY ALL').fetchall()
+    conn.close()
+    assert counts == [('2024-01', 'CTC - Closed', 1), ('2024-02', 'CTC - Closed', 1), ('2024-02', 'CTC - Pending', 1)]
+    summary = monthly_staging_summary(tmp_path)
+    assert summary[['Month', 'Transactions', 'Billing Amount']].values.tolist() == [['2024-02', 2, 400.0],
+                                                                                  ['2024-01', 1, 99.5]]
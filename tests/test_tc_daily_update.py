@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+from tests.helpers import load_script
+
+tc_daily_update = load_script('tc_daily_update/main.py', 'tc_daily_update_main')
+
+
+def date(value=None):
+    return pd.Timestamp(value) if value else tc_daily_update.na_filler
+
+
+def main_source():
+    """Main data source of three files, with the dates converted and filled as the report has them."""
+    return pd.DataFrame({
+        'Empower TC Name': ['Kimberly Lewis', 'Molly Kelley', 'Kimberly Lewis'],
+        'Contract Status': ['CTC - Pending', 'CTC - Preferred - Pending', 'CTC - Pending'],
+        'Closing': [date('2024-03-10'), date('2024-04-15'), date('2099-01-01')],
+        'CTC Started with Empower': [date('2024-03-02'), date('2024-02-10'), date('2024-03-31 12:00')],
+        'Listing Started with Empower': [date('2024-03-05'), date(), date()],
+        'Listing PAID Date': [date(), date('2024-03-01'), date()],
+        'Live on MLS Date': [date(), date(), date()],
+        'Compliance Started with Empower': [date(), date(), date()],
+        'Offer Started with Empower': [date(), date(), date('2024-02-28')],
+        'Onboard Call Complete Date': [date('2024-02-01'), date('2024-03-15'), date('2024-04-02')],
+        'Onboarding Status': ['1st Transaction', 'Onboarded', None],
+        '1st Transaction Date': [date('2024-03-20'), date(), date()],
+        'Transaction Coordinator': ['Kimberly Lewis', 'Molly Kelley', 'Molly Kelley'],
+        'Agent Provided by': ['TC', 'Empower', None],
+        'Other Status': ['Return to Sales', None, 'Active'],
+    })
+
+
+def nonzero(report):
+    """{(TC, column): count} of the non-zero cells of a report."""
+    counts = report.set_index('Empower TC Name').stack()
+    return {key: value for key, value in counts.items() if value}
+
+
+def test_flags():
+    flags = tc_daily_update.add_flags(main_source(), tc_daily_update.expand_periode_dim('MARCH 2024'))
+
+    raised = [[column for column in tc_daily_update.REPORT_COLUMNS[1:] if row[column]] for _, row in flags.iterrows()]
+    assert raised == [
+        ['CTC Started for this month', 'Closings for this month', 'CTC Pending for this month', 'Listing Started',
+         'TC Generated Agents', 'TOTAL Agents', '1st Transaction Agents', 'Lost Agents/return to Sales',
+         '1st Transactions for This Month'],
+        ['CTC - Preferred Pending for next month', 'Listing PAID', 'OB for This Month'],
+        ['Total ACTIVE Files - CTC', 'CTC Started for this month', 'CTC Pending for other months'],
+    ]
+    assert flags['Listing PAID'].dtype == 'int64'
+
+
+def test_invalid_periode():
+    with pytest.raises(ValueError):
+        tc_daily_update.expand_periode_dim('2024-03')
+
+
+def test_periode_reports():
+    february, march, april = tc_daily_update.build_periode_reports(
+        main_source(), ['FEBRUARY 2024', 'MARCH 2024', 'APRIL 2024']
+    )
+
+    assert list(march.columns) == tc_daily_update.REPORT_COLUMNS
+    assert march['Empower TC Name'].tolist() == ['Kimberly Lewis', 'Molly Kelley']
+    # Agent columns count every period from the one starting on or after the onboard call
+    agents = {('Kimberly Lewis', column): 1 for column in ('TC Generated Agents', 'TOTAL Agents',
+                                                          '1st Transaction Agents', 'Lost Agents/return to Sales')}
+    assert nonzero(february) == {
+        ('Kimberly Lewis', 'Offers Started this month'): 1,
+        ('Molly Kelley', 'CTC - Preferred Started'): 1,
+        ('Kimberly Lewis', 'OB for This Month'): 1,
+        **agents,
+    }
+    assert nonzero(march) == {
+        ('Kimberly Lewis', 'CTC Started for this month'): 2,
+        ('Kimberly Lewis', 'Closings for this month'): 1,
+        ('Kimberly Lewis', 'CTC Pending for this month'): 1,
+        ('Kimberly Lewis', 'Listing Started'): 1,
+        ('Molly Kelley', 'Listing PAID'): 1,
+        ('Molly Kelley', 'OB for This Month'): 1,
+        **agents,
+    }
+    assert nonzero(april) == {
+        ('Molly Kelley', 'CTC - Preferred Closings'): 1,
+        ('Molly Kelley', 'CTC - Preferred Pending for this month'): 1,
+        ('Molly Kelley', 'SALES Generated Agents'): 1,
+        ('Molly Kelley', 'TOTAL Agents'): 1,
+        ('Molly Kelley', 'OB for This Month'): 1,
+        **agents,
+    }
+
+
+def test_select_periodes():
+    df = main_source()
+
+    assert tc_daily_update.select_periodes(df, year=2024) == ['MARCH 2024', 'FEBRUARY 2024']
+    assert tc_daily_update.select_periodes(df, start_periode='MARCH 2024') == ['MARCH 2024']
+    assert tc_daily_update.select_periodes(df, year=2023) == []
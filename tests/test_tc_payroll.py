@@ -0,0 +1,194 @@
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.helpers import load_script, properties
+
+tc_payroll = load_script('tc_payroll/main.py', 'tc_payroll_main')
+
+MARCH_1 = '2024/03/01 - 2024/03/15'
+MARCH_16 = '2024/03/16 - 2024/03/31'
+
+DAY_ONE = [
+    (1, {'Empower TC Name': 'Kimberly Lewis', 'Closing': '2024-03-05', 'Billing Amount': '400'}),
+    (2, {'Empower TC Name': 'Molly Kelley', 'Closing': '2024-03-20', 'Billing Amount': '350',
+         'CTC PAID Date': '2024-03-22', 'CTC PAID Amount': '350'}),
+    (3, {'Empower TC Name': 'Someone Else', 'Closing': '2024-03-05', 'Billing Amount': '400'}),
+]
+# Property 2 is billed more, property 1 is gone and property 4 is new
+DAY_TWO = [
+    (2, {'Empower TC Name': 'Molly Kelley', 'Closing': '2024-03-20', 'Billing Amount': '400',
+         'CTC PAID Date': '2024-03-22', 'CTC PAID Amount': '350'}),
+    (3, DAY_ONE[2][1]),
+    (4, {'Empower TC Name': 'Jenn McKinley', 'Closing': '2024-03-10', 'Billing Amount': '99'}),
+]
+
+
+@pytest.fixture(autouse=True)
+def quiet_pandas():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yield
+
+
+def transaction_source():
+    """Extracted transaction fields (raw strings, '' or None) of three transactions."""
+    return pd.DataFrame({
+        'Empower TC Name': ['Kimberly Lewis', 'Molly Kelley', 'Jenn McKinley'],
+        'Closing': ['2024-03-05', '2024-03-20', None],
+        'Billing Amount': ['400', '350', ''],
+        'Listing PAID Date': ['2024-03-10', None, None],
+        'Listing Started with Empower': ['2024-03-02', '2024-02-02', None],
+        'CTC PAID Date': [None, '2024-03-22', '2024-12-18'],
+        'Offer Prep PAID Date': [None, None, '2024-04-01'],
+        'Offer Started with Empower': [None, None, '2024-04-03'],
+        'Compliance PAID Date': [None, None, None],
+        'Compliance Started with Empower': [None, None, '2024-05-01'],
+        'Listing PAID Amount': ['150', None, '200'],
+        'CTC PAID Amount': [None, '350', '400'],
+        'Offer Prep PAID Amount': [None, None, '40'],
+        'Compliance PAID Amount': [None, None, None],
+    })
+
+
+def test_semimonthly_periods():
+    dates = pd.Series(pd.to_datetime(['2024-03-15 23:00', '2024-03-16 00:00', '2024-02-20 00:00', '2024-12-20 00:00', None,
+                                      tc_payroll.na_filler]))
+
+    start, end, label = tc_payroll.semimonthly_periods(dates)
+
+    assert start.tolist()[:4] == [pd.Timestamp('2024-03-01'), pd.Timestamp('2024-03-16'), pd.Timestamp('2024-02-16'),
+                                  pd.Timestamp('2024-12-16')]
+    assert end.tolist()[:4] == [pd.Timestamp('2024-03-15 23:59:59'), pd.Timestamp('2024-03-31 23:59:59'),
+                                pd.Timestamp('2024-02-29 23:59:59'), pd.Timestamp('2024-12-31 23:59:59')]
+    assert pd.isna(start[4]) and pd.isna(end[4])
+    assert label.tolist() == ['2024/03/01 - 2024/03/15', MARCH_16, '2024/02/16 - 2024/02/29', '2024/12/16 - 2024/12/31',
+                              None, '1990/01/01 - 1990/01/15']
+
+
+def test_semimonthly_periods_match_get_period():
+    dates = pd.Series(pd.to_datetime(['2024-01-15 12:00', '2024-01-16 00:00', '2023-12-31 00:00', '2024-11-30 00:00']))
+
+    start, end, _ = tc_payroll.semimonthly_periods(dates)
+
+    assert start.tolist() == [tc_payroll.get_period(date, 'start') for date in dates]
+    assert end.tolist() == [tc_payroll.get_period(date, 'end') for date in dates]
+
+
+def test_transform_amounts_and_projections():
+    enriched = tc_payroll.transform_transaction_source(transaction_source())
+
+    expected = {
+        'TC Commission Amount': [200.0, 175.0, np.nan],
+        # Paid amounts only count when their paid date is set
+        'Listing PAID Amount': [150.0, 0.0, 0.0],
+        'CTC PAID Amount': [0.0, 350.0, 400.0],
+        'Offer Prep PAID Amount': [0.0, 0.0, 40.0],
+        'TC Revenue': [150.0, 350.0, 440.0],
+        'Projected Amount': [200.0, 175.0, 0.0],
+        'Actual Amount': [0.0, 175.0, 220.0],
+        'TC Revenue Amount': [0.0, 350.0, 440.0],
+    }
+    for column, values in expected.items():
+        np.testing.assert_array_equal(enriched[column].to_numpy(dtype='float64'), values, err_msg=column)
+    projections = ['CTC Projection', 'Listing Projection', 'Offer Projection', 'Compliance Projection',
+                   'Projection Condition']
+    assert enriched[projections].to_numpy().tolist() == [[1, 1, 0, 0, 1], [1, 0, 0, 0, 1], [0, 0, 1, 0, 1]]
+    assert enriched['closing_periode'].tolist() == [MARCH_1, MARCH_16, '1990/01/01 - 1990/01/15']
+    assert enriched['Closing'][2] == datetime(1990, 1, 1)
+    assert enriched['Projected Amount'].dtype == 'float64'
+    assert enriched['Listing PAID Amount'].dtype == 'float32'
+
+
+def test_payroll_reports():
+    enriched = tc_payroll.transform_transaction_source(transaction_source())
+
+    assert tc_payroll.build_payroll_reports(enriched)['a'].to_dict('list') == {
+        'Empower TC Name': ['Jenn McKinley', 'Kimberly Lewis', 'Molly Kelley', 'Total Result'],
+        '1990/01/01 - 1990/01/15': [0.0, 0.0, 0.0, 0.0],
+        MARCH_16: [0.0, 0.0, 175.0, 175.0],
+        '2024/12/16 - 2024/12/31': [220.0, 0.0, 0.0, 220.0],
+        'Total Result': [220.0, 0.0, 175.0, 395.0],
+    }
+    assert tc_payroll.build_payroll_reports(enriched, latest=1)['a'].to_dict('list') == {
+        'Empower TC Name': ['Jenn McKinley', 'Total Result'],
+        '2024/12/16 - 2024/12/31': [220.0, 220.0],
+        'Total Result': [220.0, 220.0],
+    }
+    assert tc_payroll.build_payroll_reports(enriched, start_period='2024-03-20')['p'].to_dict('list') == {
+        'Empower TC Name': ['Molly Kelley', 'Total Result'],
+        MARCH_16: [175.0, 175.0],
+        'Total Result': [175.0, 175.0],
+    }
+    with pytest.raises(ValueError):
+        tc_payroll.build_payroll_reports(enriched, modes=('x',))
+
+
+def test_select_periods():
+    labels = np.array(['2024/01/01 - 2024/01/15', '2024/01/16 - 2024/01/31', '2024/02/01 - 2024/02/15',
+                       '2024/02/16 - 2024/02/29'], dtype=object)
+
+    assert tc_payroll.select_periods(labels, start_period='2024-01-20').tolist() == [False, True, True, True]
+    assert tc_payroll.select_periods(labels, end_period='2024-02-01').tolist() == [True, True, True, False]
+    assert tc_payroll.select_periods(labels, latest=2).tolist() == [False, False, True, True]
+
+
+def full_transform(rows):
+    return tc_payroll.transform_transaction_source(
+        tc_payroll.extract_fields(properties(rows)['field_values'], tc_payroll.read_transaction_schema())
+    )
+
+
+def test_ledger_reports(tmp_path):
+    ledger, _ = tc_payroll.update_payroll_ledger(properties(DAY_ONE), folder=tmp_path)
+    reports = tc_payroll.ledger_payroll_reports(ledger)
+
+    assert reports['p'].to_dict('list') == {
+        'Empower TC Name': ['Kimberly Lewis', 'Molly Kelley', 'Total Result'],
+        MARCH_1: [200.0, 0.0, 200.0],
+        MARCH_16: [0.0, 175.0, 175.0],
+        'Total Result': [200.0, 175.0, 375.0],
+    }
+    # Unpaid transactions fall in the period of the missing-date filler
+    assert reports['a'].to_dict('list') == {
+        'Empower TC Name': ['Kimberly Lewis', 'Molly Kelley', 'Total Result'],
+        '1990/01/01 - 1990/01/15': [0.0, 0.0, 0.0],
+        MARCH_16: [0.0, 175.0, 175.0],
+        'Total Result': [0.0, 175.0, 175.0],
+    }
+
+
+def test_incremental_update_only_transforms_changed_properties(tmp_path, monkeypatch):
+    tc_payroll.update_payroll_ledger(properties(DAY_ONE), folder=tmp_path)
+    parsed = []
+    extract_fields = tc_payroll.extract_fields
+    monkeypatch.setattr(tc_payroll, 'extract_fields',
+                        lambda values, fields: parsed.append(len(values)) or extract_fields(values, fields))
+
+    ledger, enriched = tc_payroll.update_payroll_ledger(properties(DAY_TWO), folder=tmp_path)
+
+    assert parsed == [2]
+    assert tc_payroll.ledger_payroll_reports(ledger)['p'].to_dict('list') == {
+        'Empower TC Name': ['Jenn McKinley', 'Molly Kelley', 'Total Result'],
+        MARCH_1: [49.5, 0.0, 49.5],
+        MARCH_16: [0.0, 200.0, 200.0],
+        'Total Result': [49.5, 200.0, 249.5],
+    }
+    rebuilt, rebuilt_enriched = tc_payroll.update_payroll_ledger(properties(DAY_TWO), folder=tmp_path / 'rebuilt',
+                                                                 full=True)
+    pd.testing.assert_frame_equal(ledger, rebuilt)
+    pd.testing.assert_frame_equal(enriched, rebuilt_enriched)
+    pd.testing.assert_frame_equal(enriched, full_transform(DAY_TWO))
+
+
+def test_unchanged_dataset_is_not_parsed(tmp_path, monkeypatch):
+    ledger, enriched = tc_payroll.update_payroll_ledger(properties(DAY_ONE), folder=tmp_path)
+    monkeypatch.setattr(tc_payroll, 'extract_fields', None)
+
+    again, again_enriched = tc_payroll.update_payroll_ledger(properties(DAY_ONE), folder=tmp_path)
+
+    pd.testing.assert_frame_equal(again, ledger)
+    pd.testing.assert_frame_equal(again_enriched, enriched)